@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Test obciążeniowy pełnej pętli mowa -> dialog -> mowa bez urządzeń audio
+
+Każdy symulowany uczeń ma własny SpeechRecognizer, DialogManager i
+TextToSpeech - tak jak w aplikacji - ale z zastępczymi backendami:
+audio z plików WAV lub cisza, rozpoznawanie ze skryptu, synteza
+zapisująca tylko czas wypowiedzi.
+
+Mierzy opóźnienie tury (od rozpoznania wypowiedzi do rozpoczęcia
+odpowiedzi TTS) oraz czas CPU na sesję.
+
+Użycie:
+    python benchmarks/load_test.py --students 200 --speed 20
+"""
+
+import argparse
+import contextlib
+import os
+import statistics
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(ROOT, 'src'))
+
+from dialog.manager import DialogManager
+from speech.fakes import RecordingSynthesisBackend, ScriptedRecognitionBackend, SilentAudioSource, WavFileAudioSource
+from speech.recognition import SpeechRecognizer
+from speech.synthesis import TextToSpeech
+from utils.log_setup import setup_logging
+from utils.metrics import METRICS, start_exporters
+from utils.profiling import PROFILER
+from utils.tracing import TRACER
+
+# Domyślny przebieg rozmowy symulowanego ucznia
+DEFAULT_SCRIPT = [
+    "mam na imię ola",
+    "jestem w siódmej klasie",
+    "równania",
+    "cztery",
+    "tak",
+    "pięć",
+    "tak",
+    "sześć",
+    "nie",
+    "procenty",
+    "trzydzieści",
+    "do widzenia",
+]
+
+
+class TimedSynthesisBackend(RecordingSynthesisBackend):
+    """Synteza zapisująca dodatkowo moment rozpoczęcia każdej wypowiedzi"""
+
+    def __init__(self, on_start, **kwargs):
+        super().__init__(**kwargs)
+        self.on_start = on_start
+
+    def say(self, text):
+        self.on_start(time.monotonic())
+        super().say(text)
+
+
+class SimulatedStudent:
+    def __init__(self, number, script, args):
+        self.number = number
+        self.turn_latencies = []
+        self.dialog_cpu = 0.0
+        self.pending_since = None
+        self.lock = threading.Lock()
+
+        self.synthesis = TimedSynthesisBackend(self.on_tts_start, speed=args.tts_speed)
+        self.tts = TextToSpeech(backend=self.synthesis)
+        self.dialog_manager = DialogManager(self.on_system_message)
+
+        # Źródło kończy się razem ze skryptem i czeka, gdy rozpoznawanie nie nadąża -
+        # inaczej przy --speed 0 zalewa kolejkę blokami, które są porzucane
+        pacing = dict(stop_when=lambda: self.recognition.exhausted,
+                      wait_while=lambda: self.recognizer.audio_queue.full())
+        if args.wav:
+            audio_source = WavFileAudioSource(args.wav, speed=args.speed, loop=True, **pacing)
+        else:
+            audio_source = SilentAudioSource(speed=args.speed, **pacing)
+        self.recognition = ScriptedRecognitionBackend(script, default_seconds=args.utterance_seconds)
+        self.recognizer = SpeechRecognizer(
+            on_result=self.on_speech_result,
+            backend=self.recognition,
+            audio_source=audio_source
+        )
+
+    def start(self):
+        self.dialog_manager.start_dialog()
+        self.recognizer.start_listening()
+
+    def on_system_message(self, message):
+        self.tts.speak(message)
+
+    def on_speech_result(self, text, alternatives=None):
+        """Rozpoznano wypowiedź - wątek rozpoznawania, jak w aplikacji"""
+        with self.lock:
+            self.pending_since = time.monotonic()
+        cpu_start = time.thread_time()
+        self.dialog_manager.process_user_input(text, alternatives)
+        self.dialog_cpu += time.thread_time() - cpu_start
+
+    def on_tts_start(self, now):
+        with self.lock:
+            if self.pending_since is not None:
+                self.turn_latencies.append(now - self.pending_since)
+                self.pending_since = None
+
+    @property
+    def finished(self):
+        return (self.recognition.exhausted and self.pending_since is None
+                and self.tts.speech_queue.empty() and not self.tts.is_speaking)
+
+    def stop(self):
+        self.recognizer.stop_listening()
+
+
+def percentile(values, fraction):
+    """Zwraca percentyl (metoda najbliższego rangi)"""
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))
+    return ordered[index]
+
+
+def run(args):
+    students = [SimulatedStudent(i, DEFAULT_SCRIPT, args) for i in range(args.students)]
+
+    wall_start = time.monotonic()
+    cpu_start = time.process_time()
+
+    for student in students:
+        student.start()
+
+    deadline = wall_start + args.timeout
+    while time.monotonic() < deadline and not all(s.finished for s in students):
+        time.sleep(0.05)
+
+    wall = time.monotonic() - wall_start
+    cpu = time.process_time() - cpu_start
+
+    for student in students:
+        student.stop()
+
+    latencies = [l * 1000 for s in students for l in s.turn_latencies]
+    finished = sum(1 for s in students if s.finished)
+    return {
+        'students': len(students),
+        'finished': finished,
+        'turns': len(latencies),
+        'wall_s': wall,
+        'cpu_s': cpu,
+        'cpu_per_session_ms': cpu / len(students) * 1000,
+        'dialog_cpu_per_session_ms': statistics.mean(s.dialog_cpu for s in students) * 1000,
+        'latency_ms': latencies,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Test obciążeniowy korepetytora bez urządzeń audio")
+    parser.add_argument('--students', type=int, default=100, help="liczba symulowanych uczniów")
+    parser.add_argument('--speed', type=float, default=10.0,
+                        help="tempo audio (1.0 - czas rzeczywisty, 0 - bez czekania)")
+    parser.add_argument('--tts-speed', type=float, default=0,
+                        help="tempo syntezy (0 - bez czekania, 1.0 - czas rzeczywisty)")
+    parser.add_argument('--utterance-seconds', type=float, default=1.5, help="długość wypowiedzi ucznia")
+    parser.add_argument('--wav', nargs='+', help="pliki WAV (mono 16-bit) jako źródło audio")
+    parser.add_argument('--timeout', type=float, default=300, help="maksymalny czas testu w sekundach")
+    parser.add_argument('--verbose', action='store_true', help="nie ukrywaj wyjścia dialogu")
+    parser.add_argument('--trace', action='store_true', help="wypisz czasy etapów tury (utils.tracing)")
+    parser.add_argument('--metrics-port', type=int, help="udostępnij metryki (utils.metrics) w trakcie testu")
+    parser.add_argument('--metrics', action='store_true', help="wypisz metryki po teście")
+    parser.add_argument('--profile', type=float, metavar='SEKUNDY',
+                        help="profiluj wątki przez podaną liczbę sekund od startu (zapis w profiles/)")
+    args = parser.parse_args()
+
+    TRACER.enable(args.trace)
+    METRICS.enable(args.metrics)
+    exporters = start_exporters(args.metrics_port)
+    profile_done = threading.Event()
+    if args.profile:
+        PROFILER.start(args.profile, on_done=lambda path: profile_done.set())
+
+    setup_logging(level='INFO' if args.verbose else 'WARNING')
+    output = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(open(os.devnull, 'w'))
+    with output:
+        result = run(args)
+
+    latencies = result['latency_ms']
+    print(f"Uczniowie: {result['students']} (zakończyło: {result['finished']}), tury: {result['turns']}")
+    print(f"Czas: {result['wall_s']:.2f} s, CPU: {result['cpu_s']:.2f} s "
+          f"({result['cpu_per_session_ms']:.1f} ms/sesję, dialog: {result['dialog_cpu_per_session_ms']:.1f} ms/sesję)")
+    if latencies:
+        print(f"Opóźnienie tury [ms]: p50={percentile(latencies, 0.5):.2f} "
+              f"p95={percentile(latencies, 0.95):.2f} p99={percentile(latencies, 0.99):.2f} "
+              f"max={max(latencies):.2f}")
+    if args.trace:
+        print(TRACER.format_summary())
+    if args.metrics:
+        print(METRICS.render_prometheus(), end="")
+    for exporter in exporters:
+        exporter.stop()
+    if args.profile:
+        profile_done.wait()
+    return 0 if result['finished'] == result['students'] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
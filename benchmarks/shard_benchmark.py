@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Przepustowość tur dialogu w zależności od liczby procesów roboczych
+
+Każda symulowana sesja przechodzi skrypt rozmowy z testu obciążeniowego
+(load_test.DEFAULT_SCRIPT) przez SessionSupervisor. Sesje wysyłają tury
+równolegle (po jednym wątku na sesję), więc przy N procesach roboczych
+oczekiwana przepustowość rośnie prawie liniowo do liczby rdzeni.
+
+Z --prefork procesy robocze powstają przez fork z procesu, który wczytał
+już model VOSK i dane dialogu - wypisywana jest wtedy pamięć unikalna (USS)
+każdego procesu, żeby potwierdzić współdzielenie.
+
+Użycie:
+    python benchmarks/shard_benchmark.py --sessions 200 --workers 1 2 4 8
+    python benchmarks/shard_benchmark.py --workers 4 --prefork --max-sessions 50
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from typing import Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(ROOT, 'src'))
+
+from dialog.supervisor import SessionSupervisor
+from load_test import DEFAULT_SCRIPT
+
+
+def run(workers: int, sessions: int, rounds: int, prefork: bool = False,
+        max_sessions: Optional[int] = None) -> dict:
+    state_dir = tempfile.mkdtemp(prefix="shard_benchmark_")
+    supervisor = SessionSupervisor(workers, state_dir=state_dir, prefork=prefork, max_sessions=max_sessions)
+    try:
+        session_ids = [f"uczen_{number}" for number in range(sessions)]
+        for session_id in session_ids:
+            supervisor.start_session(session_id).result()
+            
+        def client(session_id):
+            for _ in range(rounds):
+                for text in DEFAULT_SCRIPT:
+                    supervisor.turn(session_id, text)
+                    
+        threads = [threading.Thread(target=client, args=(session_id,)) for session_id in session_ids]
+        start = time.monotonic()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        wall = time.monotonic() - start
+        memory = supervisor.memory()
+    finally:
+        supervisor.shutdown()
+        shutil.rmtree(state_dir, ignore_errors=True)
+        
+    turns = sessions * rounds * len(DEFAULT_SCRIPT)
+    return {'workers': workers, 'turns': turns, 'wall_s': wall, 'turns_per_s': turns / wall, 'memory': memory}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Przepustowość tur przy sesjach w wielu procesach")
+    parser.add_argument('--sessions', type=int, default=100, help="liczba równoległych sesji")
+    parser.add_argument('--rounds', type=int, default=3, help="ile razy każda sesja przechodzi skrypt")
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4],
+                        help="liczby procesów roboczych do porównania")
+    parser.add_argument('--prefork', action='store_true',
+                        help="wczytaj model VOSK i dane dialogu przed fork procesów roboczych")
+    parser.add_argument('--max-sessions', type=int,
+                        help="wymieniaj proces roboczy po tylu rozpoczętych sesjach")
+    args = parser.parse_args()
+    
+    print(f"Rdzenie: {os.cpu_count()}, sesje: {args.sessions}")
+    baseline = None
+    for workers in args.workers:
+        result = run(workers, args.sessions, args.rounds, args.prefork, args.max_sessions)
+        baseline = baseline or result['turns_per_s']
+        print(f"Procesy: {workers:<3} tury: {result['turns']:<7} czas: {result['wall_s']:.2f} s  "
+              f"{result['turns_per_s']:.0f} tur/s (x{result['turns_per_s'] / baseline:.2f})")
+        for name, usage in result['memory'].items():
+            if usage:
+                print(f"  {name:<10} RSS={usage['rss'] / 1024:7.1f} MB  PSS={usage['pss'] / 1024:7.1f} MB  "
+                      f"USS={usage['uss'] / 1024:7.1f} MB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
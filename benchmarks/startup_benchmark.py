@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Benchmark czasu uruchamiania aplikacji
+
+Mierzy:
+- czas importu poszczególnych modułów (jak `python -X importtime`),
+- czas ładowania modelu VOSK,
+- czas do pierwszego komunikatu systemu (tryb bez okna, zastępcze TTS i audio).
+
+Wyniki są dopisywane do pliku JSON z historią, a różnice względem
+poprzedniego pomiaru większe niż próg są zgłaszane jako regresje.
+
+Użycie:
+    python benchmarks/startup_benchmark.py [--repeat 3] [--fail-on-regression]
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC = os.path.join(ROOT, 'src')
+MODEL_PATH = os.path.join(ROOT, "assets", "models", "vosk-model-pl")
+DEFAULT_HISTORY = os.path.join(ROOT, 'benchmarks', 'results', 'startup_history.json')
+
+# Moduły, których czas importu mierzymy
+MODULES = [
+    'gui.main_window',
+    'dialog.manager',
+    'speech.recognition',
+    'speech.synthesis',
+    'utils.report_generator',
+    'gui.statistics_window',
+]
+
+# Względny wzrost czasu uznawany za regresję
+REGRESSION_THRESHOLD = 0.2
+
+
+def _run_importtime(code):
+    """Uruchamia kod w świeżym interpreterze z -X importtime i zwraca (kod wyjścia, stderr)"""
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        capture_output=True, text=True, cwd=ROOT
+    )
+    return proc.returncode, proc.stderr
+
+
+def _last_error_line(stderr):
+    """Zwraca ostatnią niepustą linię z błędem (bez raportu -X importtime)"""
+    lines = [l for l in stderr.splitlines() if l.strip() and not l.startswith('import time:')]
+    return lines[-1] if lines else "nieznany błąd"
+
+
+def parse_importtime(stderr):
+    """
+    Parsuje wyjście `-X importtime`
+
+    Returns:
+        Słownik nazwa modułu -> (czas własny us, czas łączny us)
+    """
+    times = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        fields = line[len('import time:'):].split('|')
+        try:
+            times[fields[2].strip()] = (int(fields[0]), int(fields[1]))
+        except (IndexError, ValueError):
+            continue
+    return times
+
+
+def measure_import(module, repeat):
+    """Mierzy czas importu modułu w świeżym interpreterze"""
+    code = f"import sys; sys.path.append({SRC!r}); import {module}"
+    samples = []
+    heaviest = []
+
+    for _ in range(repeat):
+        returncode, stderr = _run_importtime(code)
+        if returncode != 0:
+            return {'ms': None, 'error': _last_error_line(stderr)}
+
+        times = parse_importtime(stderr)
+        if module not in times:
+            return {'ms': None, 'error': "brak modułu w raporcie importtime"}
+        samples.append(times[module][1] / 1000)
+
+        # Zależności z największym czasem własnym
+        heaviest = sorted(
+            ((name, self_us / 1000) for name, (self_us, _) in times.items()),
+            key=lambda item: item[1],
+            reverse=True
+        )[:5]
+
+    return {
+        'ms': round(statistics.median(samples), 2),
+        'heaviest': [[name, round(ms, 2)] for name, ms in heaviest],
+    }
+
+
+def measure_model_load(repeat):
+    """Mierzy czas ładowania modelu VOSK w świeżym interpreterze"""
+    code = (
+        "import time, vosk\n"
+        "vosk.SetLogLevel(-1)\n"
+        "t = time.perf_counter()\n"
+        f"vosk.Model({MODEL_PATH!r})\n"
+        "print((time.perf_counter() - t) * 1000)\n"
+    )
+    samples = []
+    for _ in range(repeat):
+        proc = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, cwd=ROOT)
+        if proc.returncode != 0:
+            return {'ms': None, 'error': _last_error_line(proc.stderr)}
+        samples.append(float(proc.stdout.strip().splitlines()[-1]))
+    return {'ms': round(statistics.median(samples), 2)}
+
+
+def measure_first_prompt(repeat):
+    """Mierzy czas od uruchomienia procesu do pierwszego komunikatu systemu"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        proc = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), '--child-first-prompt'],
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, cwd=ROOT
+        )
+        line = proc.stdout.readline()
+        elapsed = (time.perf_counter() - start) * 1000
+        _, stderr = proc.communicate()
+        if proc.returncode != 0 or not line.startswith('PROMPT'):
+            return {'ms': None, 'error': _last_error_line(stderr)}
+        samples.append(elapsed)
+    return {'ms': round(statistics.median(samples), 2)}
+
+
+class StandInTTS:
+    """Zastępczy syntezator - tylko zapisuje teksty, nic nie odtwarza"""
+
+    def __init__(self):
+        self.spoken = []
+
+    def speak(self, text, callback=None):
+        self.spoken.append(text)
+        if callback:
+            callback()
+
+
+def child_first_prompt():
+    """Proces potomny: uruchamia dialog bez okna i wypisuje pierwszy komunikat"""
+    sys.path.append(SRC)
+    from dialog.manager import DialogManager
+
+    tts = StandInTTS()
+
+    def on_system_message(message):
+        tts.speak(message)
+        print(f"PROMPT {message}", flush=True)
+
+    manager = DialogManager(on_system_message)
+    manager.start_dialog()
+
+
+def git_revision():
+    """Zwraca skrót bieżącego commita (jeśli dostępny)"""
+    try:
+        proc = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, cwd=ROOT)
+        return proc.stdout.strip() or None
+    except OSError:
+        return None
+
+
+def load_history(path):
+    """Wczytuje historię pomiarów"""
+    if not os.path.exists(path):
+        return []
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def flatten(result):
+    """Zwraca płaski słownik metryka -> czas w ms (tylko udane pomiary)"""
+    metrics = {f"import {name}": data['ms'] for name, data in result['imports'].items() if data['ms'] is not None}
+    for key in ('model_load', 'first_prompt'):
+        if result[key]['ms'] is not None:
+            metrics[key] = result[key]['ms']
+    return metrics
+
+
+def find_regressions(previous, current, threshold=REGRESSION_THRESHOLD):
+    """Porównuje dwa pomiary i zwraca listę metryk, które zwolniły ponad próg"""
+    before, after = flatten(previous), flatten(current)
+    regressions = []
+    for metric, value in after.items():
+        old = before.get(metric)
+        if old and value > old * (1 + threshold):
+            regressions.append((metric, old, value))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark czasu uruchamiania korepetytora")
+    parser.add_argument('--repeat', type=int, default=3, help="liczba powtórzeń każdego pomiaru (mediana)")
+    parser.add_argument('--history', default=DEFAULT_HISTORY, help="plik JSON z historią pomiarów")
+    parser.add_argument('--no-save', action='store_true', help="nie zapisuj wyniku do historii")
+    parser.add_argument('--fail-on-regression', action='store_true', help="kod wyjścia 1 przy regresji")
+    parser.add_argument('--child-first-prompt', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child_first_prompt:
+        child_first_prompt()
+        return 0
+
+    result = {
+        'timestamp': datetime.now().isoformat(),
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': args.repeat,
+        'imports': {module: measure_import(module, args.repeat) for module in MODULES},
+        'model_load': measure_model_load(args.repeat),
+        'first_prompt': measure_first_prompt(args.repeat),
+    }
+
+    print(f"Benchmark uruchamiania ({result['revision'] or 'brak git'}, Python {result['python']})")
+    for module, data in result['imports'].items():
+        value = f"{data['ms']:8.1f} ms" if data['ms'] is not None else f"  błąd: {data['error']}"
+        print(f"  import {module:<24} {value}")
+    for key, label in (('model_load', "ładowanie modelu VOSK"), ('first_prompt', "pierwszy komunikat")):
+        data = result[key]
+        value = f"{data['ms']:8.1f} ms" if data['ms'] is not None else f"  błąd: {data['error']}"
+        print(f"  {label:<31} {value}")
+
+    history = load_history(args.history)
+    regressions = find_regressions(history[-1], result) if history else []
+    for metric, old, new in regressions:
+        print(f"  ⚠️ Regresja: {metric}: {old:.1f} ms -> {new:.1f} ms")
+
+    if not args.no_save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.history)), exist_ok=True)
+        history.append(result)
+        with open(args.history, 'w', encoding='utf-8') as f:
+            json.dump(history, f, ensure_ascii=False, indent=2)
+
+    return 1 if regressions and args.fail_on_regression else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
@@ -4,23 +4,114 @@ System Dialogowy Korepetytora Matematycznego
 Główny punkt wejścia aplikacji
 """
 
+import time
+_PROCESS_START = time.perf_counter()
+
+import argparse
+import signal
 import tkinter as tk
 from tkinter import ttk
 import sys
 import os
 
-# Dodaj src do ścieżki
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+# Dodaj src do ścieżki - na końcu, żeby pakiet src/math nie przesłaniał
+# standardowego modułu math (używanego m.in. przez random)
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+
+from utils.startup_profiler import StartupProfiler
+from utils.log_setup import setup_logging
+from utils.metrics import start_exporters
+from utils.tracing import TRACER
+
 
-from gui.main_window import MathTutorApp
+def parse_args():
+    """Parsuje argumenty linii poleceń"""
+    parser = argparse.ArgumentParser(description="Korepetytor matematyczny - system dialogowy")
+    parser.add_argument(
+        '--profile-startup',
+        action='store_true',
+        help="wypisuje czas poszczególnych faz uruchamiania"
+    )
+    parser.add_argument(
+        '--trace',
+        action='store_true',
+        help="mierzy czasy etapów każdej tury (zapis do logu sesji)"
+    )
+    parser.add_argument(
+        '--log-level',
+        help="poziom logowania (DEBUG, INFO, WARNING...), nadpisuje plik konfiguracji"
+    )
+    parser.add_argument(
+        '--log-config',
+        metavar='PLIK',
+        help="plik JSON z konfiguracją logowania (domyślnie logging.json, jeśli istnieje)"
+    )
+    parser.add_argument(
+        '--metrics-port',
+        type=int,
+        help="udostępnia metryki w formacie Prometheusa na http://127.0.0.1:PORT/metrics"
+    )
+    parser.add_argument(
+        '--metrics-json',
+        metavar='PLIK',
+        help="okresowo zapisuje metryki do pliku JSON"
+    )
+    parser.add_argument(
+        '--metrics-interval',
+        type=float,
+        default=10.0,
+        help="co ile sekund zapisywać plik --metrics-json (domyślnie 10)"
+    )
+    parser.add_argument(
+        '--asr-alternatives',
+        type=int,
+        default=0,
+        metavar='N',
+        help="ocenia odpowiedzi w quizie także w N hipotezach rozpoznawania mowy (domyślnie tylko najlepsza)"
+    )
+    parser.add_argument(
+        '--resume',
+        metavar='ID_SESJI',
+        help="wznawia przerwaną sesję z katalogu session_state (ID jak w nazwie logu sesji)"
+    )
+    return parser.parse_args()
 
 
 def main():
     """Główna funkcja uruchamiająca aplikację"""
+    args = parse_args()
+    profiler = StartupProfiler(_PROCESS_START) if args.profile_startup else None
+    if profiler:
+        profiler.mark("importy bazowe")
+
+    # Okno (i Dialog Manager) importowane po argumentach - osobna faza profilu startu
+    from gui.main_window import MathTutorApp
+
+    if profiler:
+        profiler.mark("import gui.main_window")
+
+    setup_logging(args.log_config, args.log_level)
+    TRACER.enable(args.trace)
+    exporters = start_exporters(args.metrics_port, args.metrics_json, args.metrics_interval)
+
     root = tk.Tk()
-    app = MathTutorApp(root)
+    if profiler:
+        profiler.mark("tworzenie okna Tk")
+
+    app = MathTutorApp(root, profiler=profiler, asr_alternatives=args.asr_alternatives,
+                       resume_session=args.resume)
+    if hasattr(signal, 'SIGUSR1'):
+        # kill -USR1 <pid> - profilowanie działającej aplikacji bez menu
+        signal.signal(signal.SIGUSR1, lambda signum, frame: app.start_profiling())
+    if profiler:
+        # Pierwsza bezczynność pętli zdarzeń = okno narysowane
+        root.after_idle(lambda: profiler.mark("pierwsze narysowanie okna"))
+
     root.mainloop()
 
+    for exporter in exporters:
+        exporter.stop()
+
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
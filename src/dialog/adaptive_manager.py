@@ -3,97 +3,107 @@ Adaptacyjny manager trudności zadań
 """
 
 import random
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
+
+from dialog.problem_bank import SelectionIndex, UsedProblems
+from dialog.skill_model import SkillModel
+
+# Temat używany, gdy odpowiedź nie ma przypisanego tematu
+DEFAULT_TOPIC = 'ogólne'
+
+# Przedziały trudności od najłatwiejszego
+DIFFICULTY_BANDS = ('easy', 'medium', 'hard')
+
+# Docelowe prawdopodobieństwo poprawnej odpowiedzi na wybrane zadanie
+TARGET_SUCCESS = 0.7
+
+
+def skill_to_difficulty(skill: float) -> float:
+    """Przelicza umiejętność (logity) na dawną skalę trudności 0.5 - 1.5"""
+    return max(0.5, min(1.5, 1.0 + skill / 4))
+
+
+def difficulty_band(difficulty: float) -> str:
+    """Przedział trudności dla danej wartości na skali 0.5 - 1.5"""
+    if difficulty < 0.7:
+        return 'easy'
+    if difficulty < 1.2:
+        return 'medium'
+    return 'hard'
 
 
 class AdaptiveDifficultyManager:
-    def __init__(self):
+    def __init__(self, skill_model: Optional[SkillModel] = None, index: Optional[SelectionIndex] = None):
+        """
+        Args:
+            skill_model: Model umiejętności ucznia (domyślnie z pliku kalibracji, jeśli istnieje)
+            index: Indeks wyboru zadań (domyślnie cały katalog z kalibracją modelu)
+        """
         self.performance_history = []
-        self.current_difficulty = 1.0  # 0.5 (łatwe) - 1.5 (trudne)
+        self.skill_model = skill_model or SkillModel.load()
+        self.index = index or SelectionIndex(calibrated=self.skill_model.problem_difficulty)
+        self.used_problems = UsedProblems(self.index)
+        self.current_topic = DEFAULT_TOPIC
+        self.current_difficulty = skill_to_difficulty(self.skill_model.skill(self.current_topic))  # 0.5 (łatwe) - 1.5 (trudne)
         self.streak = 0  # Liczba poprawnych odpowiedzi z rzędu
         
-    def update_performance(self, is_correct: bool, time_taken: float):
-        """Aktualizuje historię i dostosowuje trudność"""
+    def update_performance(self, is_correct: bool, time_taken: float,
+                           topic: Optional[str] = None, problem: Optional[str] = None):
+        """
+        Aktualizuje umiejętność ucznia w temacie i dostosowuje trudność
+        
+        Returns:
+            "level_up" / "level_down" gdy zmienił się przedział trudności, inaczej "no_change"
+        """
+        topic = topic or self.current_topic
+        previous_band = difficulty_band(skill_to_difficulty(self.skill_model.skill(topic)))
+        
+        difficulty = self.index.difficulty(problem) if problem else None
+        skill = self.skill_model.update(topic, problem, is_correct, time_taken, difficulty)
+        self.current_topic = topic
+        self.current_difficulty = skill_to_difficulty(skill)
+        
         self.performance_history.append({
+            'topic': topic,
             'correct': is_correct,
             'time': time_taken,
+            'skill': skill,
             'difficulty': self.current_difficulty
         })
+        self.streak = self.streak + 1 if is_correct else 0
         
-        if is_correct:
-            self.streak += 1
-            # Zwiększ trudność po 3 poprawnych z rzędu
-            if self.streak >= 3:
-                self.current_difficulty = min(1.5, self.current_difficulty + 0.1)
-                self.streak = 0
-                return "level_up"
-        else:
-            self.streak = 0
-            # Zmniejsz trudność po 2 błędach w ostatnich 3 zadaniach
-            recent = self.performance_history[-3:]
-            if len(recent) >= 3 and sum(1 for r in recent if not r['correct']) >= 2:
-                self.current_difficulty = max(0.5, self.current_difficulty - 0.1)
-                return "level_down"
-                
-        return "no_change"
+        band = difficulty_band(self.current_difficulty)
+        if band == previous_band:
+            return "no_change"
+        if DIFFICULTY_BANDS.index(band) > DIFFICULTY_BANDS.index(previous_band):
+            return "level_up"
+        return "level_down"
         
-    def generate_adaptive_problem(self, topic: str, level: str) -> Tuple[str, List[str]]:
-        """Generuje zadanie dostosowane do poziomu ucznia"""
+    def generate_adaptive_problem(self, topic: str, level: str) -> Optional[Tuple[str, List[str]]]:
+        """
+        Wybiera nieużyte zadanie, które uczeń rozwiąże z prawdopodobieństwem najbliższym TARGET_SUCCESS
         
-        # Przykłady zadań o różnej trudności
-        problems_by_difficulty = {
-            'ułamki': {
-                'easy': [
-                    ("Oblicz: 1/2 + 1/2", ["1", "jeden"]),
-                    ("Oblicz: 1/4 + 1/4", ["1/2", "połowa"]),
-                ],
-                'medium': [
-                    ("Oblicz: 1/2 + 1/3", ["5/6"]),
-                    ("Oblicz: 3/4 - 1/2", ["1/4"]),
-                ],
-                'hard': [
-                    ("Oblicz: 2/3 + 3/4 - 1/2", ["11/12"]),
-                    ("Oblicz: (3/4 × 2/3) + 1/2", ["1"]),
-                ]
-            },
-            'równania': {
-                'easy': [
-                    ("Rozwiąż: x + 5 = 10", ["5"]),
-                    ("Rozwiąż: 2x = 10", ["5"]),
-                ],
-                'medium': [
-                    ("Rozwiąż: 2x + 5 = 13", ["4"]),
-                    ("Rozwiąż: 3x - 7 = 8", ["5"]),
-                ],
-                'hard': [
-                    ("Rozwiąż: 2(x + 3) = 4x - 2", ["4"]),
-                    ("Rozwiąż: x² - 5x + 6 = 0 (podaj mniejszy pierwiastek)", ["2"]),
-                ]
-            }
-        }
+        Gdy wszystkie zadania tematu zostały użyte, lista użytych jest czyszczona.
         
-        # Wybierz poziom trudności
-        if self.current_difficulty < 0.7:
-            difficulty = 'easy'
-        elif self.current_difficulty < 1.2:
-            difficulty = 'medium'
-        else:
-            difficulty = 'hard'
+        Returns:
+            (treść, poprawne odpowiedzi) albo None, gdy katalog nie ma zadań z tematu
+        """
+        target = self.skill_model.target_difficulty(topic, TARGET_SUCCESS)
+        problem = self.index.select(topic, target, self.used_problems)
+        if problem is None and self.used_problems.count(topic):
+            self.used_problems.clear(topic)
+            problem = self.index.select(topic, target, self.used_problems)
+        if problem is None:
+            return None
             
-        # Pobierz zadania dla tematu i trudności
-        available_problems = problems_by_difficulty.get(topic, {}).get(difficulty, [])
-        
-        if available_problems:
-            return random.choice(available_problems)
-        else:
-            # Fallback do podstawowego zadania
-            return ("Rozwiąż to zadanie", ["?"])
+        self.used_problems.add(problem.text)
+        return problem.text, problem.answers
             
     def get_encouragement(self, is_correct: bool) -> str:
         """Zwraca spersonalizowaną zachętę"""
         if is_correct:
             if self.streak >= 2:
-                return "🔥 Jesteś w świetnej formie! Jeszcze jedno i przejdziemy na wyższy poziom!"
+                return "🔥 Jesteś w świetnej formie! Zaraz dostaniesz trudniejsze zadania!"
             else:
                 encouragements = [
                     "💪 Świetnie! Tak trzymaj!",
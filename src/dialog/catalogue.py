@@ -0,0 +1,414 @@
+"""
+Skompilowany katalog zadań (plik binarny wczytywany przez mmap)
+
+Źródłem zadań jest edytowalny plik assets/problems.json (lista obiektów)
+albo CSV z kolumnami topic, level, difficulty, text, answers, hint
+(odpowiedzi rozdzielone znakiem |). Krok budowania sprawdza poprawność
+źródła i zapisuje plik binarny:
+
+    python src/dialog/catalogue.py assets/problems.json --out assets/problems.cat
+
+Układ pliku (liczby little-endian):
+    nagłówek    HEADER - magia, wersja, liczby i przesunięcia sekcji
+    nazwy       NAME na każdą nazwę tematu/poziomu (przesunięcie, długość)
+    rekordy     RECORD na każde zadanie - stała szerokość 32 bajty:
+                temat, poziom, trudność, (przesunięcie, długość) treści,
+                odpowiedzi (rozdzielone \\x1f) i wskazówki
+    haszowanie  tablica adresowania otwartego: crc32(treść) -> numer rekordu + 1
+    napisy      wspólna tablica napisów UTF-8 (bez powtórzeń)
+
+Catalogue mapuje plik do pamięci, przy otwarciu sprawdza sumę kontrolną
+i buduje tablicę (temat, poziom) -> numery zadań z pól rekordów - treść
+zadania jest dekodowana dopiero przy jego podaniu, a wiele procesów
+roboczych dzieli jedną kopię stron pliku. `get_catalogue` przebudowuje
+plik binarny, gdy jest starszy od źródła albo uszkodzony; bez źródła
+i pliku binarnego korzysta z zadań generowanych (`generated_problems`).
+"""
+
+import csv
+import json
+import logging
+import math
+import mmap
+import os
+import random
+import struct
+import sys
+import zlib
+from typing import Dict, Iterator, List, Optional, Tuple
+
+if __name__ == "__main__":
+    # Uruchomienie jako skrypt - pakiety z src (na końcu, jak w main.py)
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dialog.problem_bank import Problem
+from dialog.scenarios import LEVEL_KEYWORDS, TOPIC_KEYWORDS
+
+logger = logging.getLogger(__name__)
+
+# Pliki katalogu względem katalogu projektu (niezależnie od katalogu bieżącego)
+ASSETS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "assets")
+SOURCE_FILE = os.path.join(ASSETS_DIR, "problems.json")
+COMPILED_FILE = os.path.join(ASSETS_DIR, "problems.cat")
+
+MAGIC = b"MTCATLG\x00"
+FORMAT_VERSION = 1
+
+# magia, wersja, zarezerwowane, rekordy, nazwy, przesunięcia: nazw, rekordów, haszowania, napisów,
+# rozmiar tablicy haszowania, crc32 danych za nagłówkiem
+HEADER = struct.Struct('<8sHHIIIIIIII')
+NAME = struct.Struct('<II')
+RECORD = struct.Struct('<HHfIIIIII')
+SLOT = struct.Struct('<I')
+
+# Separator odpowiedzi w napisie (nie występuje w tekście zadań)
+ANSWER_SEPARATOR = "\x1f"
+
+# Poziomy od najniższego - zadanie z poziomem X jest dostępne od poziomu X wzwyż
+LEVELS = list(LEVEL_KEYWORDS)
+
+# Dopuszczalny zakres trudności (logity modelu umiejętności)
+MAX_ABS_DIFFICULTY = 5.0
+
+
+class CatalogueError(ValueError):
+    """Błędne źródło katalogu lub uszkodzony plik skompilowany"""
+
+
+def load_source(path: str) -> List[dict]:
+    """Wczytuje źródło katalogu (JSON lub CSV) jako listę słowników"""
+    if path.lower().endswith('.csv'):
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            rows = list(csv.DictReader(f))
+        for row in rows:
+            row['answers'] = [answer.strip() for answer in (row.get('answers') or '').split('|')]
+        return rows
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def validate(rows: List[dict]) -> List[Problem]:
+    """
+    Sprawdza wiersze źródła i zamienia je na zadania
+    
+    Raises:
+        CatalogueError: Ze wszystkimi znalezionymi błędami
+    """
+    errors = []
+    problems = []
+    seen: Dict[str, int] = {}
+    for number, row in enumerate(rows, 1):
+        row_errors = []
+        topic = row.get('topic')
+        level = row.get('level')
+        text = (row.get('text') or '').strip()
+        answers = row.get('answers') or []
+        hint = row.get('hint') or ''
+        
+        if topic not in TOPIC_KEYWORDS:
+            row_errors.append(f"nieznany temat {topic!r}")
+        if level not in LEVEL_KEYWORDS:
+            row_errors.append(f"nieznany poziom {level!r}")
+        try:
+            difficulty = float(row.get('difficulty'))
+            if not math.isfinite(difficulty) or abs(difficulty) > MAX_ABS_DIFFICULTY:
+                row_errors.append(f"trudność {difficulty} poza zakresem ±{MAX_ABS_DIFFICULTY}")
+        except (TypeError, ValueError):
+            row_errors.append(f"trudność {row.get('difficulty')!r} nie jest liczbą")
+            difficulty = 0.0
+        if not text:
+            row_errors.append("brak treści")
+        elif text in seen:
+            row_errors.append(f"treść powtórzona (wiersz {seen[text]})")
+        if not isinstance(answers, list) or not answers or not all(isinstance(a, str) and a.strip() for a in answers):
+            row_errors.append("brak poprawnych odpowiedzi")
+        elif any(ANSWER_SEPARATOR in answer for answer in answers):
+            row_errors.append("niedozwolony znak w odpowiedzi")
+            
+        if row_errors:
+            errors.append(f"wiersz {number}: " + ", ".join(row_errors))
+            continue
+        seen[text] = number
+        problems.append(Problem(topic, difficulty, text, [a.strip() for a in answers], hint, level))
+        
+    if errors:
+        raise CatalogueError("Błędy w źródle katalogu zadań:\n" + "\n".join(errors))
+    return problems
+
+
+def generated_problems(per_topic: int = 10, seed: int = 0) -> List[Problem]:
+    """Zadania z szablonów (odpowiedzi z dialog.solver) - zapas, gdy brak plików katalogu"""
+    from dialog.solver import solve
+    
+    rng = random.Random(seed)
+    templates = {
+        'równania': lambda a, b, c: f"Rozwiąż równanie: {a}x + {b} = {a * c + b}. Ile wynosi x?",
+        'funkcje': lambda a, b, c: f"Dla funkcji f(x) = {a}x + {b}, oblicz f({c}).",
+        'geometria': lambda a, b, c: (f"Oblicz obwód prostokąta o bokach {a} cm i {b + c} cm." if c % 2
+                                      else f"Oblicz obwód kwadratu o boku {a + b} cm."),
+        'ułamki': lambda a, b, c: f"Oblicz: 1/{a} + 1/{b + 1}",
+        'procenty': lambda a, b, c: f"Oblicz {a * 5}% z liczby {b * 20}.",
+    }
+    problems = []
+    for topic, template in templates.items():
+        texts = {template(rng.randint(2, 9), rng.randint(1, 9), rng.randint(1, 9)) for _ in range(per_topic)}
+        for text in sorted(texts):
+            solution = solve(text)
+            if solution is not None:
+                problems.append(Problem(topic, 0.0, text, list(solution.answers), "", LEVELS[0]))
+    return problems
+
+
+def build(problems: List[Problem]) -> bytes:
+    """Zwraca zawartość pliku binarnego katalogu"""
+    strings = bytearray()
+    string_offsets: Dict[str, int] = {}
+    
+    def add_string(value: str):
+        if value not in string_offsets:
+            string_offsets[value] = len(strings)
+            strings.extend(value.encode('utf-8'))
+        return string_offsets[value], len(value.encode('utf-8'))
+        
+    names = list(TOPIC_KEYWORDS) + LEVELS
+    name_ids = {name: index for index, name in enumerate(names)}
+    names_data = b"".join(NAME.pack(*add_string(name)) for name in names)
+    
+    records = bytearray()
+    for problem in problems:
+        records += RECORD.pack(name_ids[problem.topic], name_ids[problem.level], problem.difficulty,
+                               *add_string(problem.text),
+                               *add_string(ANSWER_SEPARATOR.join(problem.answers)),
+                               *add_string(problem.hint))
+                               
+    # Tablica haszowania: potęga dwójki, wypełnienie najwyżej w połowie
+    hash_size = 1
+    while hash_size < 2 * len(problems):
+        hash_size *= 2
+    slots = [0] * hash_size
+    for index, problem in enumerate(problems):
+        slot = zlib.crc32(problem.text.encode('utf-8')) & (hash_size - 1)
+        while slots[slot]:
+            slot = (slot + 1) & (hash_size - 1)
+        slots[slot] = index + 1
+    hash_data = b"".join(SLOT.pack(slot) for slot in slots)
+    
+    names_offset = HEADER.size
+    records_offset = names_offset + len(names_data)
+    hash_offset = records_offset + len(records)
+    strings_offset = hash_offset + len(hash_data)
+    body = names_data + bytes(records) + hash_data + bytes(strings)
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, 0, len(problems), len(names), names_offset, records_offset,
+                         hash_offset, strings_offset, hash_size, zlib.crc32(body))
+    return header + body
+
+
+def compile_catalogue(source: str = SOURCE_FILE, output: str = COMPILED_FILE) -> int:
+    """Kompiluje źródło do pliku binarnego (zapis atomowy); zwraca liczbę zadań"""
+    problems = validate(load_source(source))
+    data = build(problems)
+    # Plik tymczasowy per proces - kilka procesów może budować katalog naraz
+    tmp_file = f"{output}.{os.getpid()}.tmp"
+    with open(tmp_file, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_file, output)
+    return len(problems)
+
+
+class Catalogue:
+    """Katalog zadań odczytywany bezpośrednio z pliku binarnego"""
+    
+    def __init__(self, buffer):
+        """
+        Args:
+            buffer: Zawartość pliku katalogu (mmap lub bytes)
+        """
+        self.buffer = buffer
+        if len(buffer) < HEADER.size:
+            raise CatalogueError("Plik katalogu jest za krótki")
+        (magic, version, _, self.count, name_count, self.names_offset, self.records_offset,
+         self.hash_offset, self.strings_offset, self.hash_size, self.checksum) = HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC:
+            raise CatalogueError("To nie jest plik katalogu zadań")
+        if version != FORMAT_VERSION:
+            raise CatalogueError(f"Nieobsługiwana wersja katalogu: {version}")
+        if self.records_offset + self.count * RECORD.size > len(buffer) or self.strings_offset > len(buffer):
+            raise CatalogueError("Uszkodzony plik katalogu (sekcje poza plikiem)")
+        self.names = [self._string(*NAME.unpack_from(buffer, self.names_offset + i * NAME.size))
+                      for i in range(name_count)]
+        self.name_ids = {name: index for index, name in enumerate(self.names)}
+        self._cache: Dict[int, Problem] = {}
+        
+        # (temat, poziom) -> numery zadań - jedno przejście po polach rekordów
+        self._table: Dict[Tuple[int, int], List[int]] = {}
+        for index in range(self.count):
+            key = struct.unpack_from('<HH', buffer, self.records_offset + index * RECORD.size)
+            self._table.setdefault(key, []).append(index)
+        self._ids: Dict[Tuple[Optional[str], Optional[str]], List[int]] = {}
+        
+    @classmethod
+    def open(cls, path: str = COMPILED_FILE, verify: bool = True) -> "Catalogue":
+        """
+        Mapuje plik katalogu do pamięci (tylko do odczytu)
+        
+        Raises:
+            OSError: Brak pliku
+            CatalogueError: Plik uszkodzony, niepełny lub w innej wersji formatu
+        """
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                raise CatalogueError("Pusty plik katalogu")
+            catalogue = cls(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+        if verify and not catalogue.verify():
+            raise CatalogueError("Uszkodzony plik katalogu (błędna suma kontrolna)")
+        return catalogue
+            
+    def __len__(self) -> int:
+        return self.count
+        
+    def verify(self) -> bool:
+        """Sprawdza sumę kontrolną całego pliku (czyta wszystkie strony)"""
+        return zlib.crc32(self.buffer[HEADER.size:]) == self.checksum
+        
+    def _string(self, offset: int, length: int) -> str:
+        start = self.strings_offset + offset
+        return bytes(self.buffer[start:start + length]).decode('utf-8')
+        
+    def _record(self, index: int) -> tuple:
+        if not 0 <= index < self.count:
+            raise IndexError(index)
+        return RECORD.unpack_from(self.buffer, self.records_offset + index * RECORD.size)
+        
+    def topic(self, index: int) -> str:
+        return self.names[self._record(index)[0]]
+        
+    def level(self, index: int) -> str:
+        return self.names[self._record(index)[1]]
+        
+    def difficulty(self, index: int) -> float:
+        return round(self._record(index)[2], 4)
+        
+    def text(self, index: int) -> str:
+        record = self._record(index)
+        return self._string(record[3], record[4])
+        
+    def problem(self, index: int) -> Problem:
+        """Dekoduje zadanie (raz - kolejne wywołania z pamięci podręcznej)"""
+        problem = self._cache.get(index)
+        if problem is None:
+            topic, level, difficulty, *strings = self._record(index)
+            text = self._string(strings[0], strings[1])
+            answers = self._string(strings[2], strings[3]).split(ANSWER_SEPARATOR)
+            hint = self._string(strings[4], strings[5])
+            problem = self._cache[index] = Problem(self.names[topic], round(difficulty, 4), text, answers, hint,
+                                                   self.names[level])
+        return problem
+        
+    def find(self, text: str) -> Optional[int]:
+        """Numer zadania o danej treści (tablica haszowania - dekoduje tylko kandydatów)"""
+        if not self.count:
+            return None
+        encoded = text.encode('utf-8')
+        slot = zlib.crc32(encoded) & (self.hash_size - 1)
+        while True:
+            (entry,) = SLOT.unpack_from(self.buffer, self.hash_offset + slot * SLOT.size)
+            if not entry:
+                return None
+            record = self._record(entry - 1)
+            start = self.strings_offset + record[3]
+            if record[4] == len(encoded) and self.buffer[start:start + record[4]] == encoded:
+                return entry - 1
+            slot = (slot + 1) & (self.hash_size - 1)
+            
+    def ids(self, topic: Optional[str] = None, level: Optional[str] = None) -> List[int]:
+        """
+        Numery zadań tematu dostępnych na danym poziomie (bez dekodowania napisów)
+        
+        Wynik jest zapamiętywany - zwracana lista jest wspólna i tylko do odczytu.
+        
+        Args:
+            topic: Temat (None - wszystkie)
+            level: Poziom ucznia - zadania z poziomów wyższych są pomijane (None - wszystkie)
+        """
+        result = self._ids.get((topic, level))
+        if result is None:
+            topic_id = self.name_ids.get(topic, -1) if topic is not None else None
+            allowed = None
+            if level in LEVELS:
+                allowed = {self.name_ids[name] for name in LEVELS[:LEVELS.index(level) + 1] if name in self.name_ids}
+            result = sorted(index for (record_topic, record_level), indices in self._table.items()
+                            if (topic_id is None or record_topic == topic_id)
+                            and (allowed is None or record_level in allowed)
+                            for index in indices)
+            self._ids[(topic, level)] = result
+        return result
+        
+    def problems(self) -> Iterator[Problem]:
+        """Wszystkie zadania (dekoduje cały katalog)"""
+        return (self.problem(index) for index in range(self.count))
+
+
+_catalogue: Optional[Catalogue] = None
+
+
+def get_catalogue(source: str = SOURCE_FILE, compiled: str = COMPILED_FILE) -> Catalogue:
+    """
+    Wspólny katalog zadań procesu
+    
+    Plik binarny jest budowany, gdy go brak, jest starszy od źródła albo
+    uszkodzony. Gdy nie da się go zapisać (np. katalog tylko do odczytu),
+    katalog jest budowany w pamięci, a bez źródła i pliku binarnego -
+    z zadań generowanych.
+    """
+    global _catalogue
+    if _catalogue is None:
+        _catalogue = _load_catalogue(source, compiled)
+    return _catalogue
+
+
+def _load_catalogue(source: str, compiled: str) -> Catalogue:
+    """Plik binarny (przebudowany w razie potrzeby), katalog w pamięci albo zadania generowane"""
+    if not os.path.exists(source):
+        try:
+            return Catalogue.open(compiled)
+        except (OSError, CatalogueError) as e:
+            logger.error("Brak katalogu zadań (%s) - zadania generowane", e)
+            return Catalogue(build(generated_problems()))
+            
+    try:
+        if os.path.exists(compiled) and os.path.getmtime(compiled) >= os.path.getmtime(source):
+            try:
+                return Catalogue.open(compiled)
+            except CatalogueError as e:
+                logger.warning("Katalog %s nieprawidłowy (%s) - budowanie od nowa", compiled, e)
+        count = compile_catalogue(source, compiled)
+        logger.info("Skompilowano katalog zadań: %s (%d zadań)", compiled, count)
+        return Catalogue.open(compiled)
+    except OSError as e:
+        logger.warning("Nie można zapisać katalogu %s (%s) - katalog w pamięci", compiled, e)
+        return Catalogue(build(validate(load_source(source))))
+
+
+def main():
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Kompilacja katalogu zadań do pliku binarnego")
+    parser.add_argument('source', nargs='?', default=SOURCE_FILE, help="źródło katalogu (JSON lub CSV)")
+    parser.add_argument('--out', default=COMPILED_FILE, help="plik wynikowy")
+    parser.add_argument('--check', action='store_true', help="tylko sprawdź źródło, bez zapisu")
+    args = parser.parse_args()
+    
+    try:
+        if args.check:
+            print(f"Źródło poprawne: {len(validate(load_source(args.source)))} zadań")
+            return 0
+        count = compile_catalogue(args.source, args.out)
+    except CatalogueError as e:
+        print(e)
+        return 1
+    print(f"Zadania: {count} -> {args.out} ({os.path.getsize(args.out)} B)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
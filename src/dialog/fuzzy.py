@@ -0,0 +1,211 @@
+"""
+Poprawianie błędów rozpoznawania mowy w słowach ze znanego słownika
+
+VOSK często zwraca słowa "prawie dobre": "piec" zamiast "pięć",
+"dwanascie", "czteri". FuzzyVocabulary poprawia pojedyncze słowa
+wypowiedzi do najbliższego słowa ze słownika (liczebniki, operatory,
+tematy, poziomy...).
+
+Wyszukiwanie to indeks usunięć w stylu SymSpell: dla każdego słowa
+słownika (po usunięciu polskich znaków) zapamiętujemy wszystkie warianty
+z usuniętymi do MAX_DISTANCE literami. Dla słowa z wypowiedzi generujemy
+jego warianty i sprawdzamy je w słowniku - koszt zależy od długości
+słowa, a nie od rozmiaru słownika. Kandydaci są weryfikowani odległością
+Damerau-Levenshteina.
+
+Poprawka literówkowa łatwo psuje poprawne polskie słowa, zwłaszcza krótkie
+i różniące się od słowa ze słownika końcówką ("pole" -> "pół", "zera" ->
+"zero"). Dlatego w krótkich słowach po poprawianej literze musi zostać co
+najmniej MIN_AGREEING_SUFFIX zgodnych liter, a `correct` z podanymi
+kotwicami poprawia literówki tylko w słowach sąsiadujących z kotwicą
+(np. liczebnikiem lub operatorem). Brakujące polskie znaki są poprawiane
+zawsze.
+"""
+
+import re
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+# Polskie znaki -> litery bez ogonków (ASR często gubi ogonki)
+_FOLD = str.maketrans('ąćęłńóśźż', 'acelnoszz')
+
+# Maksymalna odległość edycyjna (dla słów krótszych niż LONG_WORD - 1)
+MAX_DISTANCE = 2
+LONG_WORD = 8
+
+# Słowa krótsze nie są poprawiane literówkowo (tylko ogonki) - za dużo trafień przypadkowych
+MIN_FUZZY_LENGTH = 4
+
+# W słowach krótszych niż SHORT_WORD po poprawianej literze musi zostać tyle zgodnych liter
+# (różnica w samej końcówce to zwykle inna forma poprawnego słowa)
+SHORT_WORD = 6
+MIN_AGREEING_SUFFIX = 2
+
+# Minimalna pewność, przy której poprawka jest stosowana
+MIN_CONFIDENCE = 0.7
+
+# Pewność poprawki różniącej się tylko polskimi znakami
+FOLDED_CONFIDENCE = 0.95
+
+
+def fold(text: str) -> str:
+    """Małe litery bez polskich znaków"""
+    return text.lower().translate(_FOLD)
+
+
+def _deletes(word: str, distance: int) -> Set[str]:
+    """Wszystkie warianty słowa z usuniętymi co najwyżej `distance` literami"""
+    variants = {word}
+    frontier = {word}
+    for _ in range(distance):
+        frontier = {variant[:i] + variant[i + 1:] for variant in frontier for i in range(len(variant))}
+        variants |= frontier
+    return variants
+
+
+def common_suffix(a: str, b: str) -> int:
+    """Liczba zgodnych liter na końcu obu słów"""
+    length = 0
+    for x, y in zip(reversed(a), reversed(b)):
+        if x != y:
+            break
+        length += 1
+    return length
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Odległość Damerau-Levenshteina (z transpozycją sąsiednich liter), obcięta do limit + 1"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if (previous2 is not None and i > 1 and j > 1
+                    and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]):
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+class Correction(NamedTuple):
+    original: str
+    corrected: str
+    confidence: float
+    start: int
+    end: int
+
+
+class FuzzyVocabulary:
+    def __init__(self, words: Iterable[str], min_confidence: float = MIN_CONFIDENCE):
+        """
+        Args:
+            words: Słowa słownika w poprawnej pisowni
+            min_confidence: Minimalna pewność stosowanej poprawki
+        """
+        self.min_confidence = min_confidence
+        # słowo bez ogonków -> poprawna pisownia
+        self.words: Dict[str, str] = {}
+        # wariant z usuniętymi literami -> słowa (bez ogonków), z których powstał
+        self.index: Dict[str, Set[str]] = {}
+
+        for word in words:
+            word = word.lower()
+            folded = fold(word)
+            if folded in self.words:
+                continue
+            self.words[folded] = word
+            for variant in _deletes(folded, MAX_DISTANCE):
+                self.index.setdefault(variant, set()).add(folded)
+
+    def lookup(self, token: str) -> Optional[Tuple[str, float]]:
+        """
+        Zwraca (słowo ze słownika, pewność) dla słowa z wypowiedzi
+
+        None gdy brak kandydata lub najbliżsi kandydaci są niejednoznaczni.
+        """
+        folded = fold(token)
+        if folded in self.words:
+            word = self.words[folded]
+            return word, (1.0 if word == token.lower() else FOLDED_CONFIDENCE)
+
+        if len(folded) < MIN_FUZZY_LENGTH:
+            return None
+        limit = MAX_DISTANCE if len(folded) >= LONG_WORD else 1
+
+        candidates = set()
+        for variant in _deletes(folded, limit):
+            candidates |= self.index.get(variant, set())
+
+        best_distance = limit + 1
+        best: List[str] = []
+        for candidate in candidates:
+            distance = edit_distance(folded, candidate, limit)
+            if distance < best_distance:
+                best_distance, best = distance, [candidate]
+            elif distance == best_distance:
+                best.append(candidate)
+
+        if best_distance > limit or len(best) != 1:
+            return None
+        if len(folded) < SHORT_WORD and common_suffix(folded, best[0]) < MIN_AGREEING_SUFFIX:
+            return None
+        confidence = 1.0 - best_distance / max(len(folded), len(best[0]))
+        return self.words[best[0]], confidence
+
+    @staticmethod
+    def _anchored(tokens: List[re.Match], i: int, anchors: Set[str]) -> bool:
+        """Czy słowo sąsiaduje z kotwicą lub liczbą (albo jest jedynym słowem wypowiedzi)"""
+        if len(tokens) == 1:
+            return True
+        neighbours = [match.group() for match in tokens[max(i - 1, 0):i] + tokens[i + 1:i + 2]]
+        return any(fold(word) in anchors or any(char.isdigit() for char in word) for word in neighbours)
+
+    def correct(self, text: str, anchors: Optional[Set[str]] = None,
+                fuzzy: bool = True) -> Tuple[str, List[Correction]]:
+        """
+        Poprawia słowa wypowiedzi
+
+        Args:
+            text: Wypowiedź
+            anchors: Słowa (po `fold`), obok których poprawiane są literówki - słowo musi
+                     sąsiadować z kotwicą lub liczbą albo być całą wypowiedzią;
+                     None - literówki poprawiane wszędzie
+            fuzzy: False - poprawiane są tylko brakujące polskie znaki
+
+        Returns:
+            (poprawiony tekst, lista zastosowanych poprawek)
+        """
+        corrections = []
+        parts = []
+        position = 0
+        tokens = list(re.finditer(r'[^\W_]+|[^\w\s]', text))
+        for i, match in enumerate(tokens):
+            token = match.group()
+            if not token.isalpha():
+                continue
+            found = self.lookup(token)
+            if found is None:
+                continue
+            word, confidence = found
+            if word == token.lower() or confidence < self.min_confidence:
+                continue
+            if fold(token) != fold(word):
+                # Literówka, nie tylko brak polskich znaków
+                if not fuzzy:
+                    continue
+                if anchors is not None and not self._anchored(tokens, i, anchors):
+                    continue
+            corrections.append(Correction(token, word, round(confidence, 3), match.start(), match.end()))
+            parts.append(text[position:match.start()])
+            parts.append(word)
+            position = match.end()
+
+        if not corrections:
+            return text, corrections
+        parts.append(text[position:])
+        return "".join(parts), corrections
\ No newline at end of file
@@ -0,0 +1,84 @@
+"""
+Rozpoznawanie intencji w wypowiedzi ucznia
+
+Wszystkie tablice słów kluczowych (pożegnanie, poziom, temat, pomoc,
+pochwała, powitanie) są kompilowane przy imporcie w jedno wyrażenie
+regularne z nazwaną grupą dla każdego wzorca. Jedno przejście finditer
+po wypowiedzi zwraca wszystkie intencje razem z pozycjami.
+
+Wzorce dopasowują się tylko do całych słów (a wzorce z gwiazdką - do
+początku słowa), więc np. "v" nie pasuje już do "vosk", a "lo" do "lody".
+"""
+
+import re
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+from dialog.scenarios import FAREWELL_PATTERNS, LEVEL_KEYWORDS, RESPONSES, TOPIC_KEYWORDS
+
+
+class IntentMatch(NamedTuple):
+    intent: str            # 'farewell', 'level', 'topic', 'help', 'praise', 'greeting'
+    value: Optional[str]   # np. 'klasa_7' dla poziomu, 'ułamki' dla tematu
+    start: int
+    end: int
+    text: str
+
+
+def _pattern_regex(pattern: str) -> str:
+    """Wzorzec z tablicy -> wyrażenie dopasowane do granic słów"""
+    stem = pattern.endswith('*')
+    word = pattern[:-1] if stem else pattern
+    # Granice słów mają sens tylko na znakach słowa (np. "%" pasuje też w "50%")
+    regex = re.escape(word)
+    if re.match(r'\w', word):
+        regex = r'(?<!\w)' + regex
+    if stem:
+        regex += r'\w*'
+    elif re.search(r'\w$', word):
+        regex += r'(?!\w)'
+    return regex
+
+
+class IntentEngine:
+    def __init__(self, tables: Dict[str, Dict[Optional[str], Iterable[str]]]):
+        """
+        Args:
+            tables: intencja -> (wartość -> wzorce); intencje bez wartości używają klucza None
+        """
+        # Ten sam wzorzec może należeć do kilku intencji
+        targets: Dict[str, List[tuple]] = {}
+        for intent, values in tables.items():
+            for value, patterns in values.items():
+                for pattern in patterns:
+                    targets.setdefault(pattern.lower(), []).append((intent, value))
+
+        # Dłuższe wzorce najpierw - z alternatyw wygrywa pierwsza pasująca
+        patterns = sorted(targets, key=len, reverse=True)
+        self.groups = {f"p{number}": targets[pattern] for number, pattern in enumerate(patterns)}
+        self.regex = re.compile("|".join(
+            f"(?P<p{number}>{_pattern_regex(pattern)})" for number, pattern in enumerate(patterns)
+        ))
+
+    def find_all(self, text: str) -> List[IntentMatch]:
+        """Zwraca wszystkie intencje w kolejności występowania"""
+        matches = []
+        for match in self.regex.finditer(text.lower()):
+            for intent, value in self.groups[match.lastgroup]:
+                matches.append(IntentMatch(intent, value, match.start(), match.end(), match.group()))
+        return matches
+
+
+def first(matches: Iterable[IntentMatch], intent: str) -> Optional[IntentMatch]:
+    """Pierwsze (najbardziej na lewo) wystąpienie intencji"""
+    return next((match for match in matches if match.intent == intent), None)
+
+
+# Silnik ze wszystkimi tablicami dialogu - kompilowany raz przy imporcie
+INTENTS = IntentEngine({
+    'farewell': {None: FAREWELL_PATTERNS},
+    'level': LEVEL_KEYWORDS,
+    'topic': TOPIC_KEYWORDS,
+    'help': {None: RESPONSES['help_requests']['patterns']},
+    'praise': {None: RESPONSES['praise']['patterns']},
+    'greeting': {None: RESPONSES['greetings']['patterns']},
+})
\ No newline at end of file
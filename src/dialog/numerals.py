@@ -0,0 +1,370 @@
+"""
+Zamiana liczebników wypowiedzianych słownie na zapis matematyczny
+
+    "czterdzieści osiem"          -> 48
+    "dwa tysiące sto dwadzieścia" -> 2120
+    "trzy przecinek zero pięć"    -> 3.05
+    "przecinek pięć"              -> 0.5
+    "trzy i pół", "półtora"       -> 3.5, 1.5
+    "pięć szóstych"               -> 5/6   (mianownik to liczebnik porządkowy
+    "jedna dwudziesta piąta"      -> 1/25   w dowolnym przypadku)
+    "trzech czwartych"            -> 3/4   (liczebniki główne także
+    "dwunastu"                    -> 12     w przypadkach zależnych)
+    "dwa i jedna czwarta"         -> 9/4   (liczba mieszana jako ułamek niewłaściwy)
+    "x równa się minus dwa"       -> x = -2
+
+Liczebniki są składane przez mały automat stanów na tokenach wypowiedzi:
+każde słowo to jedno wyszukanie w słowniku i jedno przejście automatu
+(z podglądem co najwyżej jednego następnego tokenu), więc czas jest
+liniowy względem długości wypowiedzi niezależnie od rozmiaru słownika.
+
+Kolejne słowa łączą się w jedną liczbę, gdy rząd wielkości maleje
+(setki, dziesiątki, jedności - "sto dwadzieścia trzy"), inaczej zaczyna
+się nowa liczba ("pięć sześć" -> "5 6"). "minus" przed liczbą, gdy nie
+stoi za inną liczbą, jest znakiem liczby, a nie odejmowaniem.
+"""
+
+import re
+from fractions import Fraction
+from typing import List, Optional, Tuple
+
+UNITS = {
+    'zero': 0, 'jeden': 1, 'jedna': 1, 'jedno': 1, 'dwa': 2, 'dwie': 2, 'trzy': 3, 'cztery': 4,
+    'pięć': 5, 'sześć': 6, 'siedem': 7, 'osiem': 8, 'dziewięć': 9,
+}
+TEENS = {
+    'dziesięć': 10, 'jedenaście': 11, 'dwanaście': 12, 'trzynaście': 13, 'czternaście': 14,
+    'piętnaście': 15, 'szesnaście': 16, 'siedemnaście': 17, 'osiemnaście': 18, 'dziewiętnaście': 19,
+}
+TENS = {
+    'dwadzieścia': 20, 'trzydzieści': 30, 'czterdzieści': 40, 'pięćdziesiąt': 50,
+    'sześćdziesiąt': 60, 'siedemdziesiąt': 70, 'osiemdziesiąt': 80, 'dziewięćdziesiąt': 90,
+}
+HUNDREDS = {
+    'sto': 100, 'dwieście': 200, 'trzysta': 300, 'czterysta': 400, 'pięćset': 500,
+    'sześćset': 600, 'siedemset': 700, 'osiemset': 800, 'dziewięćset': 900,
+}
+THOUSANDS = ('tysiąc', 'tysiące', 'tysięcy', 'tysiąca', 'tysiącu', 'tysiącem', 'tysiącom', 'tysiącami',
+             'tysiącach')
+
+# Liczebniki od pięciu: dopełniacz, celownik i miejscownik mają jedną formę, narzędnik -oma
+_GENITIVES = {
+    'pięć': 'pięciu', 'sześć': 'sześciu', 'siedem': 'siedmiu', 'osiem': 'ośmiu', 'dziewięć': 'dziewięciu',
+    'dziesięć': 'dziesięciu', 'jedenaście': 'jedenastu', 'dwanaście': 'dwunastu', 'trzynaście': 'trzynastu',
+    'czternaście': 'czternastu', 'piętnaście': 'piętnastu', 'szesnaście': 'szesnastu',
+    'siedemnaście': 'siedemnastu', 'osiemnaście': 'osiemnastu', 'dziewiętnaście': 'dziewiętnastu',
+    'dwadzieścia': 'dwudziestu', 'trzydzieści': 'trzydziestu', 'czterdzieści': 'czterdziestu',
+    'pięćdziesiąt': 'pięćdziesięciu', 'sześćdziesiąt': 'sześćdziesięciu', 'siedemdziesiąt': 'siedemdziesięciu',
+    'osiemdziesiąt': 'osiemdziesięciu', 'dziewięćdziesiąt': 'dziewięćdziesięciu',
+}
+# Formy przypadków zależnych liczebników głównych: mianownik -> formy
+CASE_FORMS = {
+    'jeden': ('jednego', 'jednemu', 'jednym', 'jednej', 'jedną'),
+    'dwa': ('dwóch', 'dwu', 'dwom', 'dwóm', 'dwoma', 'dwiema'),
+    'trzy': ('trzech', 'trzem', 'trzema'),
+    'cztery': ('czterech', 'czterem', 'czterema'),
+    **{word: (genitive, genitive[:-1] + 'oma') for word, genitive in _GENITIVES.items()},
+    'sto': ('stu',), 'dwieście': ('dwustu',), 'trzysta': ('trzystu',), 'czterysta': ('czterystu',),
+    'pięćset': ('pięciuset',), 'sześćset': ('sześciuset',), 'siedemset': ('siedmiuset',),
+    'osiemset': ('ośmiuset',), 'dziewięćset': ('dziewięciuset',),
+}
+
+# Liczebniki porządkowe (mianowniki ułamków): temat -> wartość
+# Odmiana przez przypadki i liczby: końcówki zależne od rodzaju tematu
+_ORDINAL_STEMS = {
+    'hard': {'pierwsz': 1, 'czwart': 4, 'piąt': 5, 'szóst': 6, 'siódm': 7, 'ósm': 8, 'dziewiąt': 9,
+             'dziesiąt': 10, 'jedenast': 11, 'dwunast': 12, 'trzynast': 13, 'czternast': 14, 'piętnast': 15,
+             'szesnast': 16, 'siedemnast': 17, 'osiemnast': 18, 'dziewiętnast': 19, 'dwudziest': 20,
+             'trzydziest': 30, 'czterdziest': 40, 'pięćdziesiąt': 50, 'sześćdziesiąt': 60,
+             'siedemdziesiąt': 70, 'osiemdziesiąt': 80, 'dziewięćdziesiąt': 90, 'setn': 100,
+             'tysięczn': 1000},
+    'velar': {'drug': 2},
+    'soft': {'trzeci': 3},
+}
+_ORDINAL_ENDINGS = {
+    'hard': ('a', 'ej', 'ą', 'e', 'ych', 'ym', 'ymi', 'y', 'ego', 'emu'),
+    'velar': ('a', 'iej', 'ą', 'ie', 'ich', 'im', 'imi', 'i', 'iego', 'iemu'),
+    'soft': ('a', 'ej', 'ą', 'e', 'ch', 'm', 'mi', '', 'ego', 'emu'),
+}
+ORDINALS = {stem + ending: value
+            for declension, stems in _ORDINAL_STEMS.items() for stem, value in stems.items()
+            for ending in _ORDINAL_ENDINGS[declension]}
+
+# Części całości wypowiadane jednym słowem
+HALVES = {
+    'pół': Fraction(1, 2), 'połowa': Fraction(1, 2), 'połowy': Fraction(1, 2), 'połowę': Fraction(1, 2),
+    'połową': Fraction(1, 2), 'połówka': Fraction(1, 2), 'ćwierć': Fraction(1, 4),
+}
+ONE_AND_HALF = ('półtora', 'półtorej')
+
+DECIMAL_POINT = ('przecinek', 'kropka')
+MINUS = 'minus'
+
+# Operatory i inne słowa zamieniane na zapis matematyczny
+WORDS = {
+    'plus': '+', 'dodać': '+', MINUS: '-', 'odjąć': '-',
+    'razy': '×', 'pomnożyć': '×', 'podzielić': '÷', 'przez': '÷',
+    'równe': '=', 'x': 'x', 'iks': 'x', 'igrek': 'y',
+}
+PAIRS = {
+    ('równa', 'się'): '=', ('pomnożyć', 'przez'): '×', ('podzielić', 'przez'): '÷',
+}
+
+# Rząd wielkości słowa w liczbie - kolejne słowa liczby mają malejący rząd
+_RANKS = {**{word: 1 for word in UNITS}, **{word: 1 for word in TEENS},
+          **{word: 2 for word in TENS}, **{word: 3 for word in HUNDREDS}}
+_CARDINALS = {**UNITS, **TEENS, **TENS, **HUNDREDS}
+_OBLIQUE = {form: word for word, forms in CASE_FORMS.items() for form in forms}  # forma -> mianownik
+_RANKS.update({form: _RANKS[word] for form, word in _OBLIQUE.items()})
+_CARDINALS.update({form: _CARDINALS[word] for form, word in _OBLIQUE.items()})
+_EMPTY = 5  # rząd pustej liczby - dołączyć można dowolne słowo
+_THOUSAND_RANK = 4
+
+# Wszystkie słowa rozpoznawane przez parser (słownik poprawiania błędów rozpoznawania mowy)
+VOCABULARY = sorted(set(_CARDINALS) | set(THOUSANDS) | set(ORDINALS) | set(HALVES) | set(ONE_AND_HALF)
+                    | set(DECIMAL_POINT) | set(WORDS) | {word for pair in PAIRS for word in pair})
+
+_TOKEN = re.compile(r'[^\W\d_]+|\d+(?:[.,]\d+)?|\S')
+
+# Stany automatu
+_IDLE = 'idle'
+_INTEGER = 'integer'
+_DECIMAL = 'decimal'
+_DENOMINATOR = 'denominator'
+
+
+class _Group:
+    """Składana liczba całkowita (do 999 999)"""
+    
+    def __init__(self):
+        self.total = 0
+        self.value = 0
+        self.rank = _EMPTY
+        self.words = 0
+        
+    def join(self, word: str) -> bool:
+        """Dołącza liczebnik główny; False gdy nie pasuje (zaczyna się nowa liczba)"""
+        value, rank = _CARDINALS[word], _RANKS[word]
+        if self.words and (value == 0 or self.rank == 0 or rank >= self.rank
+                           or (10 <= value < 20 and self.value % 100)):
+            return False
+        self.value += value
+        self.rank = 0 if value == 0 else rank
+        self.words += 1
+        return True
+        
+    def thousands(self) -> bool:
+        """Mnoży dotychczasową liczbę przez tysiąc ("dwa tysiące", samo "tysiąc")"""
+        if self.total or self.rank == 0:
+            return False
+        self.total = (self.value or 1) * 1000
+        self.value = 0
+        self.rank = _THOUSAND_RANK
+        self.words += 1
+        return True
+        
+    @property
+    def number(self) -> int:
+        return self.total + self.value
+
+
+def _format(value: Fraction) -> str:
+    """Liczba całkowita lub dziesiętna (dla wartości z "i pół", "półtora")"""
+    if value.denominator == 1:
+        return str(value.numerator)
+    return format(value.numerator / value.denominator, '.10g')
+
+
+class _NumeralReader:
+    """Automat zamieniający liczebniki w ciągu tokenów na zmiany tekstu (początek, koniec, zapis)"""
+    
+    def __init__(self, tokens: List[Tuple[str, int, int]]):
+        self.tokens = tokens
+        self.edits: List[Tuple[int, int, str]] = []
+        self.state = _IDLE
+        self.after_number = False  # czy ostatni token to liczba ("minus" jest wtedy odejmowaniem)
+        # Część całkowita przed "i" czekająca na ułamek: (początek, koniec, znak, wartość)
+        self.mixed: Optional[Tuple[int, int, str, int]] = None
+        self._reset()
+        
+    def _reset(self):
+        self.sign = ''
+        self.start = self.end = 0
+        self.group = _Group()
+        self.digits = ''  # cyfry po przecinku
+        self.fraction_group: Optional[_Group] = None  # liczba czytana po przecinku
+        self.denominator: Optional[_Group] = None
+        
+    def _mixed_whole(self):
+        """Zapisuje część całkowitą liczby mieszanej, gdy po "i" nie padł ułamek"""
+        if self.mixed is not None:
+            start, end, sign, whole = self.mixed
+            self.mixed = None
+            self._emit(start, end, sign + str(whole), number=True)
+        
+    def _begin(self, start: int):
+        """Zaczyna nową liczbę (kończąc poprzednią); znak "minus" przed nią zostaje"""
+        if self.state != _IDLE:
+            self.flush()
+        if not self.sign:
+            self.start = start
+        self.state = _INTEGER
+        
+    def _emit(self, start: int, end: int, text: str, number: bool = False):
+        self.edits.append((start, end, text))
+        self.after_number = number
+        
+    def flush(self):
+        """Kończy bieżącą liczbę i zapisuje jej zapis"""
+        if self.state == _IDLE:
+            self._mixed_whole()
+            if self.sign:
+                self._emit(self.start, self.end, '-')
+            self._reset()
+            return
+        if self.mixed is not None and self.state == _DENOMINATOR and not self.sign:
+            # "dwa i jedna czwarta" -> 9/4
+            start, _, sign, whole = self.mixed
+            self.mixed = None
+            value = whole + Fraction(self.group.number, self.denominator.number)
+            self._emit(start, self.end, sign + str(value), number=True)
+            self.state = _IDLE
+            self._reset()
+            return
+        self._mixed_whole()
+        if self.state == _DECIMAL:
+            digits = self.digits + (str(self.fraction_group.number) if self.fraction_group.words else '')
+            text = f"{self.group.number}.{digits}"
+        elif self.state == _DENOMINATOR:
+            text = f"{self.group.number}/{self.denominator.number}"
+        else:
+            text = str(self.group.number)
+        self._emit(self.start, self.end, self.sign + text, number=True)
+        self.state = _IDLE
+        self._reset()
+        
+    def _cardinal(self, word: str, start: int, end: int):
+        if self.state == _DECIMAL:
+            if not self.fraction_group.join(word):
+                # Cyfry po przecinku mówione osobno: "zero pięć" -> 05
+                self.digits += str(self.fraction_group.number)
+                self.fraction_group = _Group()
+                self.fraction_group.join(word)
+        elif self.state != _INTEGER or not self.group.join(word):
+            self._begin(start)
+            self.group.join(word)
+        self.end = end
+        
+    def _next_word(self, index: int) -> Optional[str]:
+        return self.tokens[index + 1][0] if index + 1 < len(self.tokens) else None
+        
+    def _starts_number(self, word: Optional[str]) -> bool:
+        return (word in _CARDINALS or word in THOUSANDS or word in HALVES or word in ONE_AND_HALF
+                or word in DECIMAL_POINT)
+        
+    def run(self) -> List[Tuple[int, int, str]]:
+        index = 0
+        while index < len(self.tokens):
+            word, start, end = self.tokens[index]
+            following = self._next_word(index)
+            
+            if word in _CARDINALS:
+                self._cardinal(word, start, end)
+            elif word in THOUSANDS:
+                if self.state != _INTEGER or not self.group.thousands():
+                    self._begin(start)
+                    self.group.thousands()
+                self.end = end
+            elif word in ORDINALS and self.state in (_INTEGER, _DENOMINATOR) and self.group.words:
+                if self.state == _INTEGER:
+                    self.state = _DENOMINATOR
+                    self.denominator = _Group()
+                if self._join_ordinal(word):
+                    self.end = end
+                else:
+                    if not self.denominator.words:
+                        self.state = _INTEGER
+                    self.flush()
+                    self.after_number = False
+            elif word in DECIMAL_POINT and self.state in (_IDLE, _INTEGER) and following in _CARDINALS:
+                if self.state == _IDLE:
+                    # "przecinek pięć" bez części całkowitej -> 0.5
+                    self._begin(start)
+                self.state = _DECIMAL
+                self.fraction_group = _Group()
+                self.end = end
+            elif word == 'i' and self.state == _INTEGER and following in HALVES:
+                self._mixed_whole()
+                value = self.group.number + HALVES[following]
+                self._emit(self.start, self.tokens[index + 1][2], self.sign + _format(value), number=True)
+                self.state = _IDLE
+                self._reset()
+                index += 1
+            elif word == 'i' and self.state == _INTEGER and following in _CARDINALS:
+                # Może to liczba mieszana - rozstrzyga się po następnej liczbie
+                self._mixed_whole()
+                self.mixed = (self.start, self.end, self.sign, self.group.number)
+                self.state = _IDLE
+                self._reset()
+            elif word in HALVES or word in ONE_AND_HALF:
+                if self.state != _IDLE:
+                    self.flush()
+                value = HALVES[word] if word in HALVES else Fraction(3, 2)
+                text = f"{value.numerator}/{value.denominator}" if word in HALVES else _format(value)
+                self._emit(self.start if self.sign else start, end, self.sign + text, number=True)
+                self._reset()
+            elif word == MINUS and not self.after_number and self.state == _IDLE and not self.sign \
+                    and self._starts_number(following):
+                self.sign = '-'
+                self.start, self.end = start, end
+            else:
+                self.flush()
+                self._other(index, word, start, end, following)
+                if (word, following) in PAIRS:
+                    index += 1
+            index += 1
+        self.flush()
+        return self.edits
+        
+    def _join_ordinal(self, word: str) -> bool:
+        """Dołącza liczebnik porządkowy do mianownika ("dwudziestej piątej" -> 25)"""
+        value = ORDINALS[word]
+        rank = 1 if value < 20 else 2 if value < 100 else 3 if value < 1000 else _THOUSAND_RANK
+        denominator = self.denominator
+        if denominator.words and (rank >= denominator.rank or (value >= 10 and rank == 1)):
+            return False
+        if value == 1 and not denominator.words:
+            return False  # "jedna pierwsza" nie jest ułamkiem
+        denominator.value += value
+        denominator.rank = rank
+        denominator.words += 1
+        return True
+        
+    def _other(self, index: int, word: str, start: int, end: int, following: Optional[str]):
+        """Słowo spoza liczby: operator albo bez zmian"""
+        if (word, following) in PAIRS:
+            self._emit(start, self.tokens[index + 1][2], PAIRS[(word, following)])
+        elif word in DECIMAL_POINT:
+            self._emit(start, end, '.')
+        elif word in WORDS:
+            self._emit(start, end, WORDS[word])
+        else:
+            self.after_number = word[0].isdigit()
+
+
+def words_to_math(text: str) -> str:
+    """
+    Zamienia liczebniki i operatory wypowiedziane słownie na zapis matematyczny
+    
+    Pozostałe słowa i znaki zostają bez zmian (poza zbędnymi spacjami).
+    """
+    text = text.lower()
+    tokens = [(match.group(), match.start(), match.end()) for match in _TOKEN.finditer(text)]
+    parts = []
+    position = 0
+    for start, end, replacement in _NumeralReader(tokens).run():
+        parts.append(text[position:start])
+        parts.append(replacement)
+        position = end
+    parts.append(text[position:])
+    return ' '.join("".join(parts).split())
\ No newline at end of file
@@ -0,0 +1,157 @@
+"""
+Katalog zadań z trudnością i indeks wyboru zadania dla trybu adaptacyjnego
+
+Zadania pochodzą ze skompilowanego katalogu (dialog.catalogue, źródło
+assets/problems.json). Trudność zadań jest w skali logitów modelu
+umiejętności (dialog.skill_model): 0 - zadanie, które przeciętny uczeń
+rozwiązuje z prawdopodobieństwem 50%. Wartości w katalogu to oszacowania
+wstępne - kalibracja z pliku skill_params.json (fit_from_stats) ma
+pierwszeństwo.
+
+SelectionIndex trzyma zadania każdego tematu posortowane po trudności,
+więc zadanie najbliższe docelowej trudności to bisect i wybór bliższego
+z dwóch sąsiednich nieużytych zadań (UsedProblems przeskakuje użyte).
+"""
+
+import bisect
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set
+
+
+class Problem(NamedTuple):
+    topic: str
+    difficulty: float
+    text: str
+    answers: List[str]
+    hint: str = ""
+    level: str = ""
+
+
+class SelectionIndex:
+    """Zadania posortowane po trudności w każdym temacie"""
+
+    def __init__(self, problems: Optional[Iterable[Problem]] = None,
+                 calibrated: Optional[Dict[str, float]] = None):
+        """
+        Args:
+            problems: Zadania (domyślnie cały katalog z dialog.catalogue)
+            calibrated: Skalibrowane trudności (treść zadania -> logit), nadpisują wstępne
+        """
+        if problems is None:
+            from dialog.catalogue import get_catalogue
+            problems = get_catalogue().problems()
+        calibrated = calibrated or {}
+        self.problems: Dict[str, Problem] = {}
+        self.positions: Dict[str, int] = {}
+        self.keys: Dict[str, List[float]] = {}
+        self.texts: Dict[str, List[str]] = {}
+
+        by_topic: Dict[str, List[Problem]] = {}
+        for problem in problems:
+            if problem.text in calibrated:
+                problem = problem._replace(difficulty=calibrated[problem.text])
+            self.problems[problem.text] = problem
+            by_topic.setdefault(problem.topic, []).append(problem)
+
+        for topic, topic_problems in by_topic.items():
+            topic_problems.sort(key=lambda problem: (problem.difficulty, problem.text))
+            self.keys[topic] = [problem.difficulty for problem in topic_problems]
+            self.texts[topic] = [problem.text for problem in topic_problems]
+            for position, problem in enumerate(topic_problems):
+                self.positions[problem.text] = position
+
+    def topics(self) -> List[str]:
+        return list(self.keys)
+
+    def difficulty(self, text: str, default: float = 0.0) -> float:
+        """Trudność zadania (lub wartość domyślna dla zadania spoza katalogu)"""
+        problem = self.problems.get(text)
+        return problem.difficulty if problem else default
+
+    def size(self, topic: str) -> int:
+        return len(self.keys.get(topic, ()))
+
+    def position(self, text: str) -> int:
+        """Pozycja zadania na posortowanej liście jego tematu"""
+        return self.positions[text]
+
+    def select(self, topic: str, target: float, used: Optional["UsedProblems"] = None) -> Optional[Problem]:
+        """
+        Zwraca nieużyte zadanie o trudności najbliższej docelowej
+
+        Po bisect wybierane jest bliższe z dwóch najbliższych nieużytych
+        zadań - po lewej i po prawej stronie celu. UsedProblems przeskakuje
+        całe ciągi użytych zadań, więc koszt nie rośnie z ich liczbą.
+
+        Returns:
+            None gdy temat nie ma zadań albo wszystkie zostały użyte
+        """
+        keys = self.keys.get(topic)
+        if not keys:
+            return None
+
+        position = bisect.bisect_left(keys, target)
+        right, left = position, position - 1
+        if used is not None:
+            right = used.next_free(topic, right, 1)
+            left = used.next_free(topic, left, -1)
+
+        if right >= len(keys):
+            right = None
+        if left < 0:
+            left = None
+        if right is None and left is None:
+            return None
+        if right is None or (left is not None and target - keys[left] <= keys[right] - target):
+            return self.problems[self.texts[topic][left]]
+        return self.problems[self.texts[topic][right]]
+
+
+class UsedProblems:
+    """
+    Zadania użyte przez ucznia, z przeskakiwaniem ciągów użytych pozycji
+
+    Dla każdej użytej pozycji pamiętamy wskaźnik do sąsiada w lewo i w prawo
+    (union-find z kompresją ścieżek), więc znalezienie najbliższej wolnej
+    pozycji kosztuje praktycznie O(1) niezależnie od liczby użytych zadań.
+    """
+
+    def __init__(self, index: SelectionIndex):
+        self.index = index
+        self.used: Dict[str, Set[str]] = {}
+        self.links: Dict[tuple, Dict[int, int]] = {}
+
+    def __contains__(self, text: str) -> bool:
+        problem = self.index.problems.get(text)
+        return problem is not None and text in self.used.get(problem.topic, ())
+
+    def count(self, topic: str) -> int:
+        return len(self.used.get(topic, ()))
+
+    def add(self, text: str):
+        """Oznacza zadanie z katalogu jako użyte"""
+        problem = self.index.problems.get(text)
+        if problem is None or text in self.used.get(problem.topic, ()):
+            return
+        position = self.index.position(text)
+        self.used.setdefault(problem.topic, set()).add(text)
+        for direction in (1, -1):
+            self.links.setdefault((problem.topic, direction), {})[position] = position + direction
+
+    def clear(self, topic: str):
+        """Zwalnia wszystkie zadania tematu"""
+        self.used.pop(topic, None)
+        self.links.pop((topic, 1), None)
+        self.links.pop((topic, -1), None)
+
+    def next_free(self, topic: str, position: int, direction: int) -> int:
+        """Najbliższa nieużyta pozycja od `position` w kierunku `direction` (może wyjść poza listę)"""
+        links = self.links.get((topic, direction))
+        if not links:
+            return position
+        root = position
+        while root in links:
+            root = links[root]
+        # Kompresja ścieżki
+        while position in links and links[position] != root:
+            links[position], position = root, links[position]
+        return root
@@ -0,0 +1,228 @@
+"""
+Powtórki błędnie rozwiązanych zadań (harmonogram w stylu SM-2)
+
+Zadanie, na które uczeń odpowiedział błędnie, trafia do harmonogramu
+i wraca po RELEARN_DELAY (jeszcze w tej samej sesji). Każda kolejna
+odpowiedź przesuwa termin powtórki według SM-2:
+
+    poprawna:  odstęp 1 dzień, potem 6 dni, potem odstęp × łatwość
+    błędna:    powrót na początek (RELEARN_DELAY), łatwość maleje
+
+Jakość odpowiedzi (0-5) wynika z `skill_model.answer_score` - poprawna,
+ale powolna odpowiedź wydłuża odstęp mniej. Zadanie, którego odstęp
+przekroczył GRADUATE_INTERVAL dni, opuszcza harmonogram.
+
+Terminy to sekundy epoki. Każdy temat ma własny kopiec (termin, zadanie),
+więc sprawdzenie, czy jest zaległa powtórka, to zajrzenie na szczyt
+kopca - O(log n) z usuwaniem nieaktualnych wpisów (leniwe usuwanie:
+wpis jest nieaktualny, gdy termin zadania się zmienił).
+
+Harmonogram jest zapisywany w statystykach ucznia (klucz 'review') jako
+lista posortowana po terminie - po wczytaniu listy tematów są od razu
+kopcami, a zadanie wsadowe liczy jutrzejsze powtórki całej klasy jednym
+przejściem, czytając z każdej listy tylko początek do końca dnia:
+
+    python src/dialog/review.py stats_*.json --date 2024-05-01
+"""
+
+import heapq
+import json
+import time
+from datetime import date, datetime, time as day_time, timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+if __name__ == "__main__":
+    # Uruchomienie jako skrypt - pakiety z src (na końcu, jak w main.py)
+    import os
+    import sys
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dialog.skill_model import SLOW_PENALTY, answer_score
+
+# Klucz harmonogramu w pliku statystyk
+STATS_KEY = 'review'
+
+# Po ilu sekundach wraca błędnie rozwiązane zadanie
+RELEARN_DELAY = 10 * 60
+
+# Pierwsze odstępy po poprawnych odpowiedziach (dni), dalej odstęp × łatwość
+FIRST_INTERVALS = (1, 6)
+
+# Łatwość początkowa i minimalna (SM-2)
+DEFAULT_EASE = 2.5
+MIN_EASE = 1.3
+
+# Odstęp (dni), po którym zadanie uznaje się za opanowane
+GRADUATE_INTERVAL = 60
+
+# Jakość poniżej tej wartości to pomyłka (SM-2)
+PASSING_QUALITY = 3
+
+DAY = 24 * 60 * 60
+
+
+def answer_quality(is_correct: bool, time_taken: Optional[float] = None) -> int:
+    """Jakość odpowiedzi w skali SM-2: błędna 1, poprawna 3-5 zależnie od czasu"""
+    if not is_correct:
+        return 1
+    score = answer_score(True, time_taken)
+    return PASSING_QUALITY + round(2 * (score - (1 - SLOW_PENALTY)) / SLOW_PENALTY)
+
+
+class ReviewScheduler:
+    """Harmonogram powtórek jednego ucznia"""
+    
+    def __init__(self, items: Optional[List[dict]] = None, clock: Callable[[], float] = time.time):
+        """
+        Args:
+            items: Zapisany harmonogram (lista z `to_list`)
+            clock: Źródło bieżącego czasu (sekundy epoki)
+        """
+        self.clock = clock
+        # zadanie -> {'topic', 'due', 'interval', 'ease', 'repetitions', 'lapses'}
+        self.items: Dict[str, dict] = {}
+        # temat -> kopiec (termin, zadanie)
+        self.queues: Dict[str, List[Tuple[float, str]]] = {}
+        
+        entries = sorted(items or [], key=lambda item: item['due'])
+        for entry in entries:
+            item = dict(entry)
+            problem = item.pop('problem')
+            self.items[problem] = item
+            # Lista posortowana po terminie jest już kopcem
+            self.queues.setdefault(item['topic'], []).append((item['due'], problem))
+            
+    @classmethod
+    def from_stats(cls, all_stats: dict, clock: Callable[[], float] = time.time) -> "ReviewScheduler":
+        """Harmonogram zapisany w statystykach ucznia"""
+        return cls(all_stats.get(STATS_KEY), clock)
+        
+    def to_list(self) -> List[dict]:
+        """Harmonogram do zapisu (posortowany po terminie)"""
+        entries = [dict(item, problem=problem) for problem, item in self.items.items()]
+        entries.sort(key=lambda item: item['due'])
+        return entries
+        
+    def __len__(self) -> int:
+        return len(self.items)
+        
+    def __contains__(self, problem: str) -> bool:
+        return problem in self.items
+        
+    def record(self, topic: str, problem: str, is_correct: bool, time_taken: Optional[float] = None,
+               now: Optional[float] = None) -> Optional[float]:
+        """
+        Uwzględnia odpowiedź ucznia
+        
+        Błędna odpowiedź dodaje zadanie do harmonogramu, poprawna odpowiedź
+        na zadanie spoza harmonogramu niczego nie zmienia.
+        
+        Returns:
+            Termin następnej powtórki lub None, gdy zadania nie ma w harmonogramie
+        """
+        item = self.items.get(problem)
+        if item is None:
+            if is_correct:
+                return None
+            item = self.items[problem] = {'topic': topic, 'due': 0.0, 'interval': 0, 'ease': DEFAULT_EASE,
+                                          'repetitions': 0, 'lapses': 0}
+                                          
+        now = self.clock() if now is None else now
+        quality = answer_quality(is_correct, time_taken)
+        item['ease'] = round(max(MIN_EASE, item['ease'] + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02)), 3)
+        if quality < PASSING_QUALITY:
+            item['repetitions'] = 0
+            item['interval'] = 0
+            item['lapses'] += 1
+            item['due'] = now + RELEARN_DELAY
+        else:
+            item['repetitions'] += 1
+            if item['repetitions'] <= len(FIRST_INTERVALS):
+                item['interval'] = FIRST_INTERVALS[item['repetitions'] - 1]
+            else:
+                item['interval'] = round(item['interval'] * item['ease'])
+            if item['interval'] > GRADUATE_INTERVAL:
+                # Opanowane - wpis w kopcu zostaje i zostanie pominięty jako nieaktualny
+                del self.items[problem]
+                return None
+            item['due'] = now + item['interval'] * DAY
+            
+        heapq.heappush(self.queues.setdefault(item['topic'], []), (item['due'], problem))
+        return item['due']
+        
+    def _top(self, topic: str) -> Optional[Tuple[float, str]]:
+        """Najwcześniejszy aktualny wpis kopca tematu (nieaktualne są usuwane)"""
+        queue = self.queues.get(topic)
+        while queue:
+            due, problem = queue[0]
+            item = self.items.get(problem)
+            if item is not None and item['due'] == due and item['topic'] == topic:
+                return due, problem
+            heapq.heappop(queue)
+        return None
+        
+    def next_due(self, topic: str, now: Optional[float] = None) -> Optional[str]:
+        """
+        Zaległa powtórka w temacie (najdawniej zaległa) albo None - wtedy nowe zadanie
+        
+        Zadanie zostaje w harmonogramie do czasu odpowiedzi (`record`).
+        """
+        top = self._top(topic)
+        if top is None:
+            return None
+        now = self.clock() if now is None else now
+        return top[1] if top[0] <= now else None
+        
+    def due_count(self, until: Optional[float] = None) -> int:
+        """Liczba powtórek zaległych do podanej chwili (domyślnie teraz)"""
+        until = self.clock() if until is None else until
+        return sum(1 for item in self.items.values() if item['due'] <= until)
+
+
+def end_of_day(day: date) -> float:
+    """Koniec dnia (czas lokalny) w sekundach epoki"""
+    return datetime.combine(day + timedelta(days=1), day_time.min).timestamp()
+
+
+def review_load(all_stats: Iterable[dict], day: Optional[date] = None) -> Dict[str, Dict[str, int]]:
+    """
+    Liczba powtórek do zrobienia do końca danego dnia (domyślnie jutro)
+    dla każdego ucznia i tematu - łącznie z zaległymi
+    
+    Harmonogramy w statystykach są posortowane po terminie, więc dla ucznia
+    wystarczy przejść zadania do pierwszego terminu po końcu dnia.
+    """
+    day = day or date.today() + timedelta(days=1)
+    until = end_of_day(day)
+    load: Dict[str, Dict[str, int]] = {}
+    for stats in all_stats:
+        topics = load.setdefault(stats.get('student', '').lower(), {})
+        for item in stats.get(STATS_KEY) or []:
+            if item['due'] > until:
+                break
+            topics[item['topic']] = topics.get(item['topic'], 0) + 1
+    return load
+
+
+def main():
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Liczba powtórek klasy na dany dzień")
+    parser.add_argument('stats_files', nargs='+', help="pliki stats_*.json")
+    parser.add_argument('--date', type=date.fromisoformat, help="dzień (RRRR-MM-DD, domyślnie jutro)")
+    args = parser.parse_args()
+    
+    all_stats = []
+    for path in args.stats_files:
+        with open(path, 'r', encoding='utf-8') as f:
+            all_stats.append(json.load(f))
+            
+    load = review_load(all_stats, args.date)
+    for student, topics in sorted(load.items()):
+        details = ", ".join(f"{topic}: {count}" for topic, count in sorted(topics.items()))
+        print(f"{student:<20} {sum(topics.values()):>4}  {details}")
+    print(f"Razem: {sum(sum(topics.values()) for topics in load.values())} powtórek, uczniowie: {len(load)}")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -45,6 +45,44 @@ RESPONSES = {
     }
 }
 
+# Słowa kluczowe intencji rozpoznawanych przez dialog.intents.
+# Wzorzec pasuje do całego słowa (lub frazy); gwiazdka na końcu oznacza
+# początek słowa - "równan*" pasuje do "równania", "równaniami" itd.
+# Złożenia potrzebują własnego wzorca: "kąt*" nie pasuje do "prostokąta".
+FAREWELL_PATTERNS = ['do widzenia', 'papa', 'koniec', 'exit', 'quit', 'żegnaj*']
+
+LEVEL_KEYWORDS = {
+    'klasa_4': ['4', 'czwart*', 'iv'],
+    'klasa_5': ['5', 'piąt*', 'v'],
+    'klasa_6': ['6', 'szóst*', 'vi'],
+    'klasa_7': ['7', 'siódm*', 'vii'],
+    'klasa_8': ['8', 'ósm*', 'viii'],
+    'liceum': ['liceum', 'średni*', 'lo'],
+    'matura': ['matur*', 'egzamin*']
+}
+
+TOPIC_KEYWORDS = {
+    'równania': ['równan*', 'niewiadom*'],
+    'funkcje': ['funkcj*', 'wykres*'],
+    'geometria': ['geometr*', 'figur*', 'kąt*', 'trójkąt*', 'prostokąt*', 'czworokąt*', 'wielokąt*',
+                  'pięciokąt*', 'sześciokąt*', 'ośmiokąt*'],
+    'ułamki': ['ułam*', 'dzielen*', 'mnożen*'],
+    'procenty': ['procent*', '%']
+}
+
+# Dodatkowe słowa słownika poprawiania błędów rozpoznawania mowy (dialog.fuzzy) -
+# odmiany tematów i poziomów oraz częste słowa odpowiedzi, żeby nie były
+# "poprawiane" na podobne liczebniki
+ASR_VOCABULARY = [
+    'równanie', 'równania', 'równaniami', 'funkcja', 'funkcje', 'funkcjami',
+    'geometria', 'geometrią', 'ułamek', 'ułamki', 'ułamkami',
+    'procent', 'procenty', 'procentami', 'procentach',
+    'klasa', 'klasie', 'czwartej', 'piątej', 'szóstej', 'siódmej', 'ósmej',
+    'liceum', 'matura', 'maturę', 'maturą',
+    'tak', 'nie', 'dalej', 'stop', 'jestem', 'chcę', 'proszę', 'wynik', 'wynosi',
+    'równa', 'się', 'pierwiastek', 'kwadrat', 'ile', 'wiem',
+]
+
 # Poziomy trudności zadań
 DIFFICULTY_LEVELS = {
     'klasa_4': {
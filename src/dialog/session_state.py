@@ -0,0 +1,257 @@
+"""
+Zapis i odtwarzanie stanu sesji dialogu (migawka + dziennik tur)
+
+Stan sesji to `DialogManager.export_state()` (stan dialogu, poziom, temat,
+kontekst, użyte zadania) i opcjonalnie `StudentStatistics.current_session`.
+Format to zwarty JSON w UTF-8 z numerem wersji:
+
+    {"v":1,"seq":12,"session":"20240101_120000","dialog":{...},"stats":{...}}
+
+SessionJournal trzyma dla sesji dwa pliki w katalogu SESSION_STATE_DIR:
+    <sesja>.snap     - ostatnia migawka (zapis atomowy przez plik tymczasowy),
+    <sesja>.journal  - dopisywane linie z różnicami stanu po kolejnych turach:
+                       {"seq":13,"t":1700000000.0,"in":"cztery","d":{...}}
+
+Tura trafia do dziennika przed wysłaniem odpowiedzi. Co SNAPSHOT_INTERVAL
+tur zapisywana jest nowa migawka, a dziennik skracany. Odtworzenie to
+wczytanie migawki i nałożenie różnic z ogona dziennika - bez ponownego
+przetwarzania wypowiedzi (wybór zadań jest losowy, więc powtórzenie tur
+dałoby inny stan). Niedopisana ostatnia linia (awaria w trakcie zapisu)
+jest pomijana.
+
+Przekazanie sesji innemu procesowi: `hand_off` zwraca migawkę jako bajty
+(np. do wysłania przez potok), `take_over` wczytuje ją do nowego managera.
+"""
+
+import json
+import logging
+import os
+import time
+from typing import Optional
+
+from utils.metrics import METRICS
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 1
+
+# Katalog migawek i dzienników sesji
+SESSION_STATE_DIR = "session_state"
+
+# Co ile tur zapisywać migawkę i skracać dziennik
+SNAPSHOT_INTERVAL = 20
+
+# Operacje w różnicach stanu
+_SET = "="
+_APPEND = "+"
+_NESTED = "d"
+_DELETE = "-"
+
+
+def encode(state: dict) -> bytes:
+    """Koduje stan jako zwarty JSON z numerem wersji"""
+    return json.dumps(dict(state, v=SNAPSHOT_VERSION), ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def decode(data: bytes) -> dict:
+    """Dekoduje stan zapisany przez encode"""
+    state = json.loads(data.decode('utf-8'))
+    if state.get('v') != SNAPSHOT_VERSION:
+        raise ValueError(f"Nieobsługiwana wersja migawki sesji: {state.get('v')}")
+    return state
+
+
+def diff(old: dict, new: dict) -> dict:
+    """
+    Różnica między dwoma stanami
+    
+    Słowniki są porównywane rekurencyjnie, listy będące przedłużeniem
+    poprzedniej wartości zapisywane są jako dopisane elementy.
+    """
+    changes = {}
+    for key, value in new.items():
+        if key in old:
+            previous = old[key]
+            if previous == value:
+                continue
+            if isinstance(previous, dict) and isinstance(value, dict):
+                changes[key] = [_NESTED, diff(previous, value)]
+                continue
+            if isinstance(previous, list) and isinstance(value, list) and value[:len(previous)] == previous:
+                changes[key] = [_APPEND, value[len(previous):]]
+                continue
+        changes[key] = [_SET, value]
+    for key in old.keys() - new.keys():
+        changes[key] = [_DELETE]
+    return changes
+
+
+def patch(state: dict, changes: dict) -> dict:
+    """Nakłada różnicę z `diff` na stan (w miejscu) i zwraca go"""
+    for key, change in changes.items():
+        operation = change[0]
+        if operation == _SET:
+            state[key] = change[1]
+        elif operation == _APPEND:
+            state[key] = state.get(key, []) + change[1]
+        elif operation == _NESTED:
+            state[key] = patch(state.get(key) or {}, change[1])
+        elif operation == _DELETE:
+            state.pop(key, None)
+        else:
+            raise ValueError(f"Nieznana operacja w dzienniku sesji: {operation}")
+    return state
+
+
+def capture(manager, statistics=None) -> dict:
+    """Zwraca stan sesji managera (i bieżącej sesji statystyk)"""
+    state = {'dialog': manager.export_state()}
+    if statistics is not None:
+        state['stats'] = statistics.current_session
+    return state
+
+
+def apply(manager, state: dict, statistics=None):
+    """Wczytuje stan z `capture` do managera (i statystyk)"""
+    manager.import_state(state.get('dialog', {}))
+    if statistics is not None and state.get('stats') is not None:
+        statistics.current_session = state['stats']
+        statistics._answer_index = None
+
+
+def hand_off(manager, statistics=None) -> bytes:
+    """Zwraca migawkę sesji do przekazania innemu procesowi"""
+    return encode(capture(manager, statistics))
+
+
+def take_over(data: bytes, manager, statistics=None):
+    """Przejmuje sesję z migawki `hand_off`"""
+    apply(manager, decode(data), statistics)
+
+
+class SessionJournal:
+    def __init__(self, session_id: str, directory: str = SESSION_STATE_DIR, statistics=None,
+                 snapshot_interval: int = SNAPSHOT_INTERVAL, fsync: bool = False):
+        """
+        Args:
+            session_id: Identyfikator sesji (nazwa plików)
+            directory: Katalog migawek i dzienników
+            statistics: Opcjonalne StudentStatistics, których bieżąca sesja jest zapisywana
+            snapshot_interval: Co ile tur zapisywać migawkę
+            fsync: Czy wymuszać zapis na dysk po każdej turze (odporność na utratę zasilania)
+        """
+        self.session_id = session_id
+        self.statistics = statistics
+        self.snapshot_interval = snapshot_interval
+        self.fsync = fsync
+        os.makedirs(directory, exist_ok=True)
+        self.snapshot_file = os.path.join(directory, f"{session_id}.snap")
+        self.journal_file = os.path.join(directory, f"{session_id}.journal")
+        self.seq = 0
+        self.since_snapshot = 0
+        self.last_state: Optional[dict] = None
+        self.file = None
+        
+    def attach(self, manager):
+        """Podłącza dziennik do managera i zapisuje migawkę jego bieżącego stanu"""
+        manager.journal = self
+        self.snapshot(manager)
+        
+    def detach(self, manager):
+        """Odłącza dziennik (np. przed przekazaniem sesji innemu procesowi)"""
+        if manager.journal is self:
+            manager.journal = None
+        self.close()
+        
+    def record(self, manager, user_input: Optional[str] = None):
+        """Dopisuje turę (zmiany stanu od poprzedniej tury) do dziennika"""
+        state = capture(manager, self.statistics)
+        self.seq += 1
+        if self.last_state is None or self.since_snapshot + 1 >= self.snapshot_interval:
+            self._write_snapshot(state)
+            return
+            
+        entry = {'seq': self.seq, 't': round(time.time(), 3), 'in': user_input, 'd': diff(self.last_state, state)}
+        line = json.dumps(entry, ensure_ascii=False, separators=(',', ':')) + "\n"
+        with METRICS.timer('tutor_storage_write_seconds', store='session_journal'):
+            if self.file is None:
+                self.file = open(self.journal_file, 'a', encoding='utf-8')
+            self.file.write(line)
+            self.file.flush()
+            if self.fsync:
+                os.fsync(self.file.fileno())
+        # Kopia przez JSON - kolejne tury nie mogą zmieniać zapamiętanego stanu
+        self.last_state = json.loads(json.dumps(state))
+        self.since_snapshot += 1
+        
+    def snapshot(self, manager):
+        """Zapisuje migawkę stanu i skraca dziennik"""
+        self._write_snapshot(capture(manager, self.statistics))
+        
+    def _write_snapshot(self, state: dict):
+        data = encode(dict(state, seq=self.seq, session=self.session_id))
+        tmp_file = self.snapshot_file + '.tmp'
+        with METRICS.timer('tutor_storage_write_seconds', store='session_snapshot'):
+            with open(tmp_file, 'wb') as f:
+                f.write(data)
+                if self.fsync:
+                    f.flush()
+                    os.fsync(f.fileno())
+            os.replace(tmp_file, self.snapshot_file)
+            # Dziennik od nowa - wpisy sprzed migawki są już w niej zawarte
+            self.close()
+            self.file = open(self.journal_file, 'w', encoding='utf-8')
+        self.last_state = json.loads(json.dumps(state))
+        self.since_snapshot = 0
+        
+    def load(self) -> Optional[dict]:
+        """
+        Wczytuje stan z migawki i ogona dziennika
+        
+        Returns:
+            Stan w formacie `capture` (z polami seq i session) lub None, gdy brak migawki
+        """
+        if not os.path.exists(self.snapshot_file):
+            return None
+        with open(self.snapshot_file, 'rb') as f:
+            state = decode(f.read())
+            
+        replayed = 0
+        if os.path.exists(self.journal_file):
+            with open(self.journal_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        logger.warning("Pominięto niedopisany wpis dziennika sesji %s", self.session_id)
+                        break
+                    # Wpisy sprzed migawki (awaria między migawką a skróceniem dziennika)
+                    if entry['seq'] <= state['seq']:
+                        continue
+                    patch(state, entry['d'])
+                    state['seq'] = entry['seq']
+                    replayed += 1
+        logger.info("Wczytano stan sesji %s (tura %d, z dziennika: %d)", self.session_id, state['seq'], replayed)
+        return state
+        
+    def restore(self, manager) -> bool:
+        """
+        Przywraca sesję w managerze i podłącza do niego dziennik
+        
+        Returns:
+            False jeśli sesja nie ma zapisanego stanu
+        """
+        state = self.load()
+        if state is None:
+            return False
+        apply(manager, state, self.statistics)
+        self.seq = state['seq']
+        manager.journal = self
+        # Nowa migawka - dalsze wpisy dopisywane są do pustego dziennika
+        self._write_snapshot(capture(manager, self.statistics))
+        return True
+        
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
\ No newline at end of file
@@ -0,0 +1,260 @@
+"""
+Model umiejętności ucznia (IRT/Elo) dla trybu adaptacyjnego
+
+Prawdopodobieństwo poprawnej odpowiedzi to model Rascha:
+
+    P(poprawna) = 1 / (1 + exp(-(umiejętność[temat] - trudność[zadanie])))
+
+Umiejętność i trudność są w tej samej skali (logity). Wynik odpowiedzi
+uwzględnia czas - poprawna, ale wyraźnie wolniejsza od oczekiwanej
+odpowiedź liczy się jako częściowy sukces (patrz `answer_score`).
+
+- W trakcie sesji `SkillModel.update` to aktualizacja Elo w O(1)
+  z krokiem malejącym wraz z liczbą odpowiedzi w temacie.
+- Zadanie wsadowe `fit_responses` dopasowuje umiejętności wszystkich
+  par (uczeń, temat) i trudności wszystkich zadań naraz (regularyzowana
+  metoda Newtona na tablicach NumPy). `fit_from_stats` buduje tablice
+  z plików stats_*.json, a wynik zapisuje się jako plik kalibracji:
+
+    python src/dialog/skill_model.py stats_*.json --out skill_params.json
+"""
+
+import json
+import math
+import os
+from typing import Dict, Iterable, List, Optional
+
+# Plik z kalibracją (trudności zadań, umiejętności uczniów) z zadania wsadowego
+CALIBRATION_FILE = "skill_params.json"
+
+# Oczekiwany czas odpowiedzi, gdy zadanie nie ma kalibracji (sekundy)
+DEFAULT_EXPECTED_TIME = 30.0
+
+# O ile maksymalnie obniżyć wynik poprawnej, ale powolnej odpowiedzi
+# (pełna kara przy czasie >= 4x oczekiwany)
+SLOW_PENALTY = 0.3
+
+# Krok aktualizacji online: K = max(K_MIN, K_BASE / sqrt(1 + liczba odpowiedzi))
+K_BASE = 0.6
+K_MIN = 0.1
+
+# Siła regularyzacji (prior N(0, 1/REGULARIZATION)) w dopasowaniu wsadowym
+REGULARIZATION = 0.5
+
+
+def sigmoid(x: float) -> float:
+    """Funkcja logistyczna (stabilna numerycznie)"""
+    if x >= 0:
+        return 1.0 / (1.0 + math.exp(-x))
+    z = math.exp(x)
+    return z / (1.0 + z)
+
+
+def answer_score(is_correct: bool, time_taken: Optional[float], expected_time: float = DEFAULT_EXPECTED_TIME) -> float:
+    """
+    Zamienia odpowiedź na wynik w [0, 1]
+
+    Błędna odpowiedź to 0. Poprawna w oczekiwanym czasie to 1, a każde
+    podwojenie czasu ponad oczekiwany odejmuje SLOW_PENALTY / 2.
+    """
+    if not is_correct:
+        return 0.0
+    if not time_taken or time_taken <= expected_time:
+        return 1.0
+    slowness = min(2.0, math.log2(time_taken / expected_time))
+    return 1.0 - SLOW_PENALTY * slowness / 2
+
+
+class SkillModel:
+    """Umiejętności jednego ucznia w poszczególnych tematach"""
+
+    def __init__(self, problem_difficulty: Optional[Dict[str, float]] = None,
+                 expected_time: Optional[Dict[str, float]] = None,
+                 skills: Optional[Dict[str, float]] = None):
+        """
+        Args:
+            problem_difficulty: Skalibrowane trudności zadań (tekst zadania -> logit)
+            expected_time: Oczekiwany czas odpowiedzi na zadanie (tekst -> sekundy)
+            skills: Początkowe umiejętności w tematach (temat -> logit)
+        """
+        self.problem_difficulty = problem_difficulty or {}
+        self.expected_time = expected_time or {}
+        self.skills: Dict[str, float] = dict(skills or {})
+        self.answer_counts: Dict[str, int] = {}
+
+    @classmethod
+    def load(cls, student: Optional[str] = None, path: str = CALIBRATION_FILE) -> "SkillModel":
+        """Tworzy model z pliku kalibracji (brak pliku = model bez kalibracji)"""
+        if not os.path.exists(path):
+            return cls()
+        with open(path, 'r', encoding='utf-8') as f:
+            params = json.load(f)
+        skills = params.get('students', {}).get(student.lower(), {}) if student else {}
+        return cls(params.get('problems', {}), params.get('expected_time', {}), skills)
+
+    def skill(self, topic: str) -> float:
+        return self.skills.get(topic, 0.0)
+
+    def difficulty(self, problem: Optional[str], default: float = 0.0) -> float:
+        return self.problem_difficulty.get(problem, default) if problem else default
+
+    def probability(self, topic: str, difficulty: float) -> float:
+        """Prawdopodobieństwo poprawnej odpowiedzi na zadanie o danej trudności"""
+        return sigmoid(self.skill(topic) - difficulty)
+
+    def target_difficulty(self, topic: str, success_probability: float) -> float:
+        """Trudność, przy której uczeń odpowiada poprawnie z zadanym prawdopodobieństwem"""
+        return self.skill(topic) - math.log(success_probability / (1 - success_probability))
+
+    def update(self, topic: str, problem: Optional[str], is_correct: bool,
+               time_taken: Optional[float] = None, difficulty: Optional[float] = None) -> float:
+        """
+        Aktualizuje umiejętność w temacie po odpowiedzi (Elo, O(1))
+
+        Returns:
+            Nowa umiejętność w temacie
+        """
+        if difficulty is None:
+            difficulty = self.difficulty(problem)
+        expected = self.expected_time.get(problem, DEFAULT_EXPECTED_TIME) if problem else DEFAULT_EXPECTED_TIME
+        score = answer_score(is_correct, time_taken, expected)
+
+        count = self.answer_counts.get(topic, 0)
+        k = max(K_MIN, K_BASE / math.sqrt(1 + count))
+        skill = self.skill(topic) + k * (score - self.probability(topic, difficulty))
+
+        self.skills[topic] = skill
+        self.answer_counts[topic] = count + 1
+        return skill
+
+
+def fit_responses(groups, problems, scores, n_groups: int, n_problems: int,
+                  iterations: int = 30, regularization: float = REGULARIZATION):
+    """
+    Dopasowuje model Rascha do wszystkich odpowiedzi naraz
+
+    Args:
+        groups: Indeks pary (uczeń, temat) dla każdej odpowiedzi
+        problems: Indeks zadania dla każdej odpowiedzi
+        scores: Wynik odpowiedzi w [0, 1] (answer_scores)
+        n_groups: Liczba par (uczeń, temat)
+        n_problems: Liczba zadań
+
+    Returns:
+        (umiejętności par, trudności zadań) jako tablice NumPy
+    """
+    import numpy as np
+
+    groups = np.asarray(groups, dtype=np.int64)
+    problems = np.asarray(problems, dtype=np.int64)
+    scores = np.asarray(scores, dtype=np.float64)
+
+    theta = np.zeros(n_groups)
+    beta = np.zeros(n_problems)
+
+    for _ in range(iterations):
+        # Krok Newtona (diagonalny hesjan) dla umiejętności, potem dla trudności
+        p = 1.0 / (1.0 + np.exp(beta[problems] - theta[groups]))
+        gradient = np.bincount(groups, scores - p, n_groups) - regularization * theta
+        curvature = np.bincount(groups, p * (1 - p), n_groups) + regularization
+        theta += gradient / curvature
+
+        p = 1.0 / (1.0 + np.exp(beta[problems] - theta[groups]))
+        gradient = np.bincount(problems, p - scores, n_problems) - regularization * beta
+        curvature = np.bincount(problems, p * (1 - p), n_problems) + regularization
+        beta += gradient / curvature
+
+    return theta, beta
+
+
+def answer_scores(correct, times, expected):
+    """Wektorowa wersja answer_score"""
+    import numpy as np
+
+    correct = np.asarray(correct, dtype=bool)
+    times = np.asarray(times, dtype=np.float64)
+    expected = np.asarray(expected, dtype=np.float64)
+    slowness = np.clip(np.log2(np.maximum(times, 1e-9) / expected), 0.0, 2.0)
+    return np.where(correct, 1.0 - SLOW_PENALTY * slowness / 2, 0.0)
+
+
+def fit_from_stats(all_stats: Iterable[dict], iterations: int = 30) -> dict:
+    """
+    Kalibruje model na statystykach wielu uczniów (zawartość plików stats_*.json)
+
+    Returns:
+        Parametry w formacie pliku kalibracji
+    """
+    import numpy as np
+
+    group_ids: Dict[tuple, int] = {}
+    problem_ids: Dict[str, int] = {}
+    groups: List[int] = []
+    problems: List[int] = []
+    correct: List[bool] = []
+    times: List[float] = []
+
+    for stats in all_stats:
+        student = stats.get('student', '').lower()
+        for session in stats.get('sessions', []):
+            for answer in session.get('answers', []):
+                group = group_ids.setdefault((student, answer['topic']), len(group_ids))
+                problem = problem_ids.setdefault(answer['question'], len(problem_ids))
+                groups.append(group)
+                problems.append(problem)
+                correct.append(bool(answer['correct']))
+                times.append(float(answer.get('time_seconds') or 0.0))
+
+    if not groups:
+        return {'problems': {}, 'expected_time': {}, 'students': {}}
+
+    problems_arr = np.asarray(problems)
+    correct_arr = np.asarray(correct)
+    times_arr = np.asarray(times)
+
+    # Oczekiwany czas zadania = mediana czasu poprawnych odpowiedzi
+    expected = np.full(len(problem_ids), DEFAULT_EXPECTED_TIME)
+    order = np.lexsort((times_arr, problems_arr))
+    valid = correct_arr[order] & (times_arr[order] > 0)
+    sorted_problems = problems_arr[order][valid]
+    sorted_times = times_arr[order][valid]
+    if len(sorted_problems):
+        starts = np.flatnonzero(np.r_[True, sorted_problems[1:] != sorted_problems[:-1]])
+        counts = np.diff(np.r_[starts, len(sorted_problems)])
+        expected[sorted_problems[starts]] = sorted_times[starts + counts // 2]
+
+    scores = answer_scores(correct_arr, times_arr, expected[problems_arr])
+    theta, beta = fit_responses(groups, problems, scores, len(group_ids), len(problem_ids), iterations)
+
+    students: Dict[str, Dict[str, float]] = {}
+    for (student, topic), index in group_ids.items():
+        students.setdefault(student, {})[topic] = round(float(theta[index]), 4)
+    return {
+        'problems': {problem: round(float(beta[index]), 4) for problem, index in problem_ids.items()},
+        'expected_time': {problem: float(expected[index]) for problem, index in problem_ids.items()},
+        'students': students,
+    }
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Kalibracja modelu umiejętności na plikach statystyk")
+    parser.add_argument('stats_files', nargs='+', help="pliki stats_*.json")
+    parser.add_argument('--out', default=CALIBRATION_FILE, help="plik wynikowy kalibracji")
+    parser.add_argument('--iterations', type=int, default=30)
+    args = parser.parse_args()
+
+    all_stats = []
+    for path in args.stats_files:
+        with open(path, 'r', encoding='utf-8') as f:
+            all_stats.append(json.load(f))
+
+    params = fit_from_stats(all_stats, args.iterations)
+    with open(args.out, 'w', encoding='utf-8') as f:
+        json.dump(params, f, ensure_ascii=False, indent=2)
+    print(f"Zadania: {len(params['problems'])}, uczniowie: {len(params['students'])} -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,542 @@
+"""
+Rozwiązywanie zadań krok po kroku - wskazówki dla zadań bez ręcznie
+napisanej podpowiedzi
+
+Obsługiwane rodzaje zadań:
+    równania liniowe     "Rozwiąż równanie: 2x + 5 = 13", "2(x + 3) = 4x - 2"
+    wartość funkcji      "Dla funkcji f(x) = x² - 1, oblicz f(3)."
+    działania na ułamkach "Oblicz: 2/3 + 3/4 - 1/2", "(3/4 × 2/3) + 1/2"
+    procenty             "Oblicz 20% z liczby 150."
+    pole i obwód         kwadrat, prostokąt, trójkąt, koło
+
+Obliczenia są dokładne (fractions.Fraction). Wyrażenia są parsowane do
+drzewa, z którego powstaje wielomian zmiennej x (równania, funkcje) albo
+lista kroków działań na ułamkach.
+
+`solve` zapamiętuje rozwiązania według treści zadania (treść jest
+identyfikatorem zadania w katalogu i w used_problems), więc rozwiązanie
+wyznaczane przy losowaniu zadania jest przy sprawdzaniu odpowiedzi tylko
+odczytywane z pamięci podręcznej.
+"""
+
+import re
+from fractions import Fraction
+from functools import lru_cache
+from math import gcd
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+# Ile rozwiązań trzymać w pamięci podręcznej (katalog ma kilkadziesiąt zadań)
+CACHE_SIZE = 1024
+
+# Przybliżenie π, gdy zadanie nie podaje własnego
+DEFAULT_PI = Fraction('3.14')
+
+_TOKEN = re.compile(r'\s*(\d+(?:[.,]\d+)?(?:/\d+(?![.,]\d))?|x|[-+*/×÷·:()²^])')
+_NUMBER = r'(\d+(?:[.,]\d+)?)'
+_UNIT = r'\s*(mm|cm|dm|km|m)?'
+
+_MULTIPLY = ('*', '×', '·')
+_DIVIDE = ('/', '÷', ':')
+
+
+class Solution(NamedTuple):
+    kind: str
+    steps: Tuple[str, ...]
+    value: Fraction
+    answers: Tuple[str, ...]
+    
+    @property
+    def hint(self) -> str:
+        """Kroki rozwiązania jako jedna wskazówka"""
+        return ". ".join(self.steps)
+
+
+class SolverError(ValueError):
+    """Wyrażenie, którego solver nie potrafi sparsować lub obliczyć"""
+
+
+# ========== WYRAŻENIA ==========
+
+def _tokenize(text: str) -> List[str]:
+    tokens = []
+    position = 0
+    text = text.strip()
+    while position < len(text):
+        match = _TOKEN.match(text, position)
+        if not match:
+            raise SolverError(f"Nieoczekiwany znak: {text[position:]!r}")
+        tokens.append(match.group(1))
+        position = match.end()
+    return tokens
+
+
+def _number(token: str) -> Fraction:
+    return Fraction(token.replace(',', '.'))
+
+
+class _Parser:
+    """
+    Parser wyrażeń do drzewa z krotek:
+        ('num', wartość, tekst), ('x',), ('neg', a), ('pow', a, wykładnik),
+        ('op', znak, a, b)
+    Literał "a/b" jest jednym liczbowym węzłem (ułamek), mnożenie może być
+    niejawne ("2x", "2(x + 3)").
+    """
+    
+    def __init__(self, text: str):
+        self.tokens = _tokenize(text)
+        self.position = 0
+        
+    def parse(self) -> tuple:
+        node = self._expression()
+        if self.position != len(self.tokens):
+            raise SolverError(f"Nadmiarowe symbole: {' '.join(self.tokens[self.position:])}")
+        return node
+        
+    def _peek(self) -> Optional[str]:
+        return self.tokens[self.position] if self.position < len(self.tokens) else None
+        
+    def _next(self) -> str:
+        token = self._peek()
+        if token is None:
+            raise SolverError("Niepełne wyrażenie")
+        self.position += 1
+        return token
+        
+    def _expression(self) -> tuple:
+        node = self._term()
+        while self._peek() in ('+', '-'):
+            operator = self._next()
+            node = ('op', operator, node, self._term())
+        return node
+        
+    def _term(self) -> tuple:
+        node = self._factor()
+        while True:
+            token = self._peek()
+            if token in _MULTIPLY or token in _DIVIDE:
+                self._next()
+                node = ('op', '×' if token in _MULTIPLY else '÷', node, self._factor())
+            elif token == 'x' or token == '(':
+                node = ('op', '×', node, self._factor())
+            else:
+                return node
+                
+    def _factor(self) -> tuple:
+        if self._peek() == '-':
+            self._next()
+            return ('neg', self._factor())
+        node = self._primary()
+        token = self._peek()
+        if token == '²':
+            self._next()
+            return ('pow', node, 2)
+        if token == '^':
+            self._next()
+            exponent = _number(self._next())
+            if exponent.denominator != 1 or exponent < 0:
+                raise SolverError("Obsługiwane są tylko naturalne wykładniki")
+            return ('pow', node, int(exponent))
+        return node
+        
+    def _primary(self) -> tuple:
+        token = self._next()
+        if token == 'x':
+            return ('x',)
+        if token == '(':
+            node = self._expression()
+            if self._next() != ')':
+                raise SolverError("Brak nawiasu zamykającego")
+            return node
+        if token[0].isdigit():
+            value = Fraction(*map(int, token.split('/'))) if '/' in token else _number(token)
+            return ('num', value, token)
+        raise SolverError(f"Nieoczekiwany symbol: {token}")
+
+
+def parse(text: str) -> tuple:
+    """Drzewo wyrażenia (zob. _Parser)"""
+    return _Parser(text).parse()
+
+
+# Wielomian zmiennej x: potęga -> współczynnik
+Polynomial = Dict[int, Fraction]
+
+
+def _add(a: Polynomial, b: Polynomial, sign: int = 1) -> Polynomial:
+    result = dict(a)
+    for power, coefficient in b.items():
+        result[power] = result.get(power, Fraction(0)) + sign * coefficient
+    return {power: value for power, value in result.items() if value}
+
+
+def _multiply(a: Polynomial, b: Polynomial) -> Polynomial:
+    result: Polynomial = {}
+    for power_a, value_a in a.items():
+        for power_b, value_b in b.items():
+            power = power_a + power_b
+            result[power] = result.get(power, Fraction(0)) + value_a * value_b
+    return {power: value for power, value in result.items() if value}
+
+
+def polynomial(node: tuple) -> Polynomial:
+    """Wielomian zmiennej x dla drzewa wyrażenia (dzielić można tylko przez stałą)"""
+    kind = node[0]
+    if kind == 'num':
+        return {0: node[1]} if node[1] else {}
+    if kind == 'x':
+        return {1: Fraction(1)}
+    if kind == 'neg':
+        return {power: -value for power, value in polynomial(node[1]).items()}
+    if kind == 'pow':
+        result: Polynomial = {0: Fraction(1)}
+        base = polynomial(node[1])
+        for _ in range(node[2]):
+            result = _multiply(result, base)
+        return result
+    operator, left, right = node[1], polynomial(node[2]), polynomial(node[3])
+    if operator == '+':
+        return _add(left, right)
+    if operator == '-':
+        return _add(left, right, -1)
+    if operator == '×':
+        return _multiply(left, right)
+    if set(right) - {0} or not right.get(0):
+        raise SolverError("Dzielenie przez wyrażenie z x lub przez zero")
+    return {power: value / right[0] for power, value in left.items()}
+
+
+# ========== FORMATOWANIE ==========
+
+def _is_decimal(value: Fraction) -> bool:
+    """Czy ułamek ma skończone rozwinięcie dziesiętne"""
+    denominator = value.denominator
+    for factor in (2, 5):
+        while denominator % factor == 0:
+            denominator //= factor
+    return denominator == 1
+
+
+def fmt(value: Fraction, decimal: bool = False) -> str:
+    """Liczba jako całkowita, ułamek zwykły lub (decimal=True) dziesiętny"""
+    if value.denominator == 1:
+        return str(value.numerator)
+    if decimal and _is_decimal(value):
+        return format(value.numerator / value.denominator, '.10g')
+    return f"{value.numerator}/{value.denominator}"
+
+
+def _operand(value: Fraction, decimal: bool = False) -> str:
+    """Liczba jako argument działania (ujemne w nawiasie)"""
+    text = fmt(value, decimal)
+    return f"({text})" if value < 0 else text
+
+
+def fmt_polynomial(value: Polynomial) -> str:
+    """Wielomian w zapisie szkolnym: "2x + 6", "x/2 - 1", "x² - 5x + 6" """
+    parts = []
+    for power in sorted(value, reverse=True):
+        coefficient = value[power]
+        magnitude = abs(coefficient)
+        variable = {0: '', 1: 'x', 2: 'x²'}.get(power, f'x^{power}')
+        if not variable:
+            term = fmt(magnitude)
+        elif magnitude.denominator != 1:
+            numerator = '' if magnitude.numerator == 1 else str(magnitude.numerator)
+            term = f"{numerator}{variable}/{magnitude.denominator}"
+        else:
+            term = variable if magnitude == 1 else f"{magnitude.numerator}{variable}"
+        if not parts:
+            parts.append(f"-{term}" if coefficient < 0 else term)
+        else:
+            parts.append(f"{'-' if coefficient < 0 else '+'} {term}")
+    return " ".join(parts) or "0"
+
+
+def answer_forms(value: Fraction, raw: Optional[Tuple[int, int]] = None, unit: str = "") -> Tuple[str, ...]:
+    """
+    Akceptowane zapisy wyniku: liczba, ułamek nieskrócony, ułamek dziesiętny
+    z kropką i przecinkiem (niedziesiętne - w przybliżeniu do 2 miejsc)
+    """
+    forms = [fmt(value)]
+    if raw is not None and raw[1] != 1 and f"{raw[0]}/{raw[1]}" not in forms:
+        forms.append(f"{raw[0]}/{raw[1]}")
+    if value.denominator != 1:
+        if _is_decimal(value):
+            decimal = fmt(value, decimal=True)
+        else:
+            decimal = format(value.numerator / value.denominator, '.2f')
+        forms += [decimal, decimal.replace('.', ',')]
+    if unit:
+        forms.append(f"{forms[0]} {unit}")
+    return tuple(dict.fromkeys(forms))
+
+
+# ========== RÓWNANIA ==========
+
+_EQUATION = re.compile(r'([-\dx(][-\dx\s+*/×÷·:²^().,]*=[-\dx\s+*/×÷·:²^().,]*)')
+
+
+def _solve_equation(text: str) -> Optional[Solution]:
+    match = _EQUATION.search(text)
+    if not match:
+        return None
+    equation = match.group(1).strip().rstrip('.(').strip()
+    left_text, _, right_text = equation.partition('=')
+    left, right = polynomial(parse(left_text)), polynomial(parse(right_text))
+    if set(left) - {0, 1} or set(right) - {0, 1}:
+        return None  # tylko równania liniowe
+        
+    steps = []
+    if '(' in equation:
+        steps.append(f"Wymnóż nawiasy: {fmt_polynomial(left)} = {fmt_polynomial(right)}")
+        
+    left_x, left_c = left.get(1, Fraction(0)), left.get(0, Fraction(0))
+    right_x, right_c = right.get(1, Fraction(0)), right.get(0, Fraction(0))
+    a, b = left_x - right_x, right_c - left_c
+    if not a:
+        return None  # brak rozwiązań lub nieskończenie wiele
+    ax = fmt_polynomial({1: a})
+    
+    if right_x:
+        moved = f"{fmt_polynomial({1: left_x})} {'-' if right_x > 0 else '+'} {fmt_polynomial({1: abs(right_x)})}"
+        constants = f"{fmt(right_c)} {'-' if left_c >= 0 else '+'} {fmt(abs(left_c))}"
+        steps.append(f"Przenieś wyrazy z x na lewą stronę, a liczby na prawą: {moved} = {constants}, "
+                     f"czyli {ax} = {fmt(b)}")
+    elif left_c:
+        constants = f"{fmt(right_c)} {'-' if left_c > 0 else '+'} {fmt(abs(left_c))}"
+        steps.append(f"Przenieś {fmt(left_c)} na drugą stronę: {ax} = {constants} = {fmt(b)}")
+        
+    x = b / a
+    if a == 1:
+        if not steps:
+            steps.append(f"x = {fmt(x)}")
+    elif a.numerator == 1:
+        steps.append(f"Pomnóż obie strony przez {a.denominator}: x = {_operand(b)} × {a.denominator} = {fmt(x)}")
+    elif a.denominator == 1:
+        steps.append(f"Podziel obie strony przez {_operand(a)}: x = {fmt(b)}/{_operand(a)} = {fmt(x)}")
+    else:
+        inverse = 1 / a
+        steps.append(f"Pomnóż obie strony przez {_operand(inverse)}: x = {_operand(b)} × {_operand(inverse)} = {fmt(x)}")
+        
+    answers = answer_forms(x)
+    answers += tuple(f"x{separator}{answers[0]}" for separator in ('=', ' = '))
+    return Solution('równanie', tuple(steps), x, answers)
+
+
+# ========== FUNKCJE ==========
+
+_FUNCTION = re.compile(r'f\(x\)\s*=\s*(.+?),\s*oblicz\s+f\(\s*(-?' + _NUMBER[1:-1] + r')\s*\)', re.IGNORECASE)
+
+
+def _solve_function(text: str) -> Optional[Solution]:
+    match = _FUNCTION.search(text)
+    if not match:
+        return None
+    formula, argument = match.group(1).strip(), match.group(2)
+    x = _number(argument)
+    value = polynomial(parse(formula))
+    
+    shown = _operand(x, decimal=True)
+    substituted = re.sub(r'(?<=[\d)])x', f" × {shown}", formula)
+    substituted = substituted.replace('x', shown)
+    terms = []
+    for power in sorted(value, reverse=True):
+        term = value[power] * x ** power
+        terms.append(fmt(term, True) if not terms else f"{'-' if term < 0 else '+'} {fmt(abs(term), True)}")
+    result = sum((coefficient * x ** power for power, coefficient in value.items()), Fraction(0))
+    
+    chain = [f"f({fmt(x, True)})", substituted, " ".join(terms) or "0", fmt(result, True)]
+    chain = [part for index, part in enumerate(chain) if index == 0 or part != chain[index - 1]]
+    steps = (f"Podstaw x = {fmt(x, True)} do wzoru funkcji: {' = '.join(chain)}",)
+    return Solution('funkcja', steps, result, answer_forms(result))
+
+
+# ========== UŁAMKI ==========
+
+_FRACTION_EXPRESSION = re.compile(r'Oblicz:\s*([\d\s+\-*/×÷·:()]+?)\s*\.?$')
+
+
+def _raw(node: tuple, value: Fraction) -> Tuple[int, int]:
+    """Licznik i mianownik w zapisie z treści zadania (np. nieskrócone 4/8)"""
+    if node[0] == 'num' and '/' in node[2]:
+        numerator, denominator = node[2].split('/')
+        return int(numerator), int(denominator)
+    return value.numerator, value.denominator
+
+
+def _fraction_steps(node: tuple, steps: List[str]) -> Tuple[Fraction, Tuple[int, int]]:
+    """Oblicza drzewo działań na ułamkach, dopisując kroki; zwraca (wartość, zapis nieskrócony)"""
+    kind = node[0]
+    if kind == 'num':
+        return node[1], _raw(node, node[1])
+    if kind == 'neg':
+        value, (numerator, denominator) = _fraction_steps(node[1], steps)
+        return -value, (-numerator, denominator)
+    if kind != 'op':
+        raise SolverError("Nieobsługiwane wyrażenie z ułamkami")
+        
+    operator = node[1]
+    _, (a_num, a_den) = _fraction_steps(node[2], steps)
+    _, (b_num, b_den) = _fraction_steps(node[3], steps)
+    a_text, b_text = _ratio(a_num, a_den), _ratio(b_num, b_den)
+    
+    if operator in ('+', '-'):
+        sign = 1 if operator == '+' else -1
+        if a_den == b_den:
+            raw = (a_num + sign * b_num, a_den)
+            step = f"Ten sam mianownik: {a_text} {operator} {b_text} = {_ratio(*raw)}"
+        else:
+            common = a_den * b_den // gcd(a_den, b_den)
+            a_scaled, b_scaled = a_num * (common // a_den), b_num * (common // b_den)
+            conversions = [f"{text} = {_ratio(scaled, common)}"
+                           for text, scaled, denominator in ((a_text, a_scaled, a_den), (b_text, b_scaled, b_den))
+                           if denominator != common]
+            raw = (a_scaled + sign * b_scaled, common)
+            step = (f"Wspólny mianownik to {common}. {', '.join(conversions)}. "
+                    f"Więc {_ratio(a_scaled, common)} {operator} {_ratio(b_scaled, common)} = {_ratio(*raw)}")
+    elif operator == '×':
+        raw = (a_num * b_num, a_den * b_den)
+        step = f"Mnożenie ułamków: ({a_num}×{b_num})/({a_den}×{b_den}) = {_ratio(*raw)}"
+    else:
+        if not b_num:
+            raise SolverError("Dzielenie przez zero")
+        raw = (a_num * b_den, a_den * b_num)
+        step = (f"Dzielenie to mnożenie przez odwrotność: {a_text} × {b_den}/{b_num} = {_ratio(*raw)}")
+        
+    value = Fraction(*raw)
+    if _ratio(*raw) != fmt(value):
+        step += f" = {fmt(value)}"
+    steps.append(step)
+    return value, raw
+
+
+def _ratio(numerator: int, denominator: int) -> str:
+    if denominator < 0:
+        numerator, denominator = -numerator, -denominator
+    return str(numerator) if denominator == 1 else f"{numerator}/{denominator}"
+
+
+def _solve_fractions(text: str) -> Optional[Solution]:
+    match = _FRACTION_EXPRESSION.search(text.strip())
+    if not match or '/' not in match.group(1):
+        return None
+    steps: List[str] = []
+    value, raw = _fraction_steps(parse(match.group(1)), steps)
+    return Solution('ułamki', tuple(steps), value, answer_forms(value, raw))
+
+
+# ========== PROCENTY ==========
+
+_PERCENT = re.compile(_NUMBER + r'\s*%\s*(?:z|ze)\s*(?:liczby\s*)?' + _NUMBER, re.IGNORECASE)
+
+
+def _solve_percent(text: str) -> Optional[Solution]:
+    match = _PERCENT.search(text)
+    if not match:
+        return None
+    percent, base = _number(match.group(1)), _number(match.group(2))
+    rate = percent / 100
+    value = rate * base
+    steps = (f"{match.group(1)}% = {fmt(percent, True)}/100 = {fmt(rate, True)}",
+             f"Więc {fmt(rate, True)} × {fmt(base, True)} = {fmt(value, True)}")
+    return Solution('procenty', steps, value, answer_forms(value))
+
+
+# ========== GEOMETRIA ==========
+
+def _pi(text: str) -> Fraction:
+    match = re.search(r'π\s*≈\s*' + _NUMBER, text)
+    return _number(match.group(1)) if match else DEFAULT_PI
+
+
+def _measure(pattern: str, text: str) -> Optional[Tuple[List[Fraction], List[str], str]]:
+    """Liczby z treści (wartości, zapis) i jednostka pierwszej z nich"""
+    match = re.search(pattern, text, re.IGNORECASE)
+    if not match:
+        return None
+    numbers = [group for group in match.groups() if group and group[0].isdigit()]
+    units = [group for group in match.groups() if group and not group[0].isdigit()]
+    return [_number(number) for number in numbers], numbers, units[0] if units else ""
+
+
+# (wzorzec treści, rodzaj, pole czy obwód, wzór, funkcja kroków obliczenia)
+_SHAPES = [
+    (r'pole kwadratu o boku ' + _NUMBER + _UNIT, 'kwadrat', True, "a × a",
+     lambda v, s: [f"{s[0]} × {s[0]}"]),
+    (r'obwód kwadratu o boku ' + _NUMBER + _UNIT, 'kwadrat', False, "4 × a",
+     lambda v, s: [f"4 × {s[0]}"]),
+    (r'pole prostokąta o bokach ' + _NUMBER + _UNIT + r'\s*i\s*' + _NUMBER, 'prostokąt', True, "a × b",
+     lambda v, s: [f"{s[0]} × {s[1]}"]),
+    (r'obwód prostokąta o bokach ' + _NUMBER + _UNIT + r'\s*i\s*' + _NUMBER, 'prostokąt', False, "2 × (a + b)",
+     lambda v, s: [f"2 × ({s[0]} + {s[1]})", f"2 × {fmt(v[0] + v[1], True)}"]),
+    (r'pole trójkąta o podstawie ' + _NUMBER + _UNIT + r'\s*i\s*wysokości\s*' + _NUMBER, 'trójkąt', True, "a × h / 2",
+     lambda v, s: [f"{s[0]} × {s[1]} / 2", f"{fmt(v[0] * v[1], True)} / 2"]),
+    (r'obwód trójkąta o bokach ' + _NUMBER + _UNIT + r',\s*' + _NUMBER + r'\s*\w*\s*i\s*' + _NUMBER, 'trójkąt', False,
+     "a + b + c", lambda v, s: [f"{s[0]} + {s[1]} + {s[2]}"]),
+]
+
+
+def _solve_geometry(text: str) -> Optional[Solution]:
+    for pattern, shape, area, formula, calculation in _SHAPES:
+        measured = _measure(pattern, text)
+        if measured is None:
+            continue
+        values, shown, unit = measured
+        value = _shape_value(shape, area, values)
+        chain = calculation(values, shown) + [fmt(value, True)]
+        return _geometry_solution(shape, area, formula, chain, value, unit)
+        
+    measured = _measure(r'(?:pole|obwód) koła o promieniu ' + _NUMBER + _UNIT, text)
+    if measured is not None:
+        (radius,), (shown,), unit = measured
+        area = 'pole koła' in text.lower()
+        pi = _pi(text)
+        if area:
+            value = pi * radius ** 2
+            chain = [f"{fmt(pi, True)} × {shown}²", f"{fmt(pi, True)} × {fmt(radius ** 2, True)}", fmt(value, True)]
+            return _geometry_solution('koło', True, "π × r²", chain, value, unit)
+        value = 2 * pi * radius
+        chain = [f"2 × {fmt(pi, True)} × {shown}", fmt(value, True)]
+        return _geometry_solution('koło', False, "2 × π × r", chain, value, unit)
+    return None
+
+
+def _shape_value(shape: str, area: bool, values: List[Fraction]) -> Fraction:
+    if shape == 'kwadrat':
+        return values[0] ** 2 if area else 4 * values[0]
+    if shape == 'prostokąt':
+        return values[0] * values[1] if area else 2 * (values[0] + values[1])
+    return values[0] * values[1] / 2 if area else sum(values, Fraction(0))
+
+
+def _geometry_solution(shape: str, area: bool, formula: str, chain: List[str], value: Fraction,
+                       unit: str) -> Solution:
+    name = 'Pole' if area else 'Obwód'
+    genitive = {'kwadrat': 'kwadratu', 'prostokąt': 'prostokąta', 'trójkąt': 'trójkąta', 'koło': 'koła'}[shape]
+    unit = f"{unit}²" if unit and area else unit
+    result = f"{' = '.join(chain)}{' ' + unit if unit else ''}"
+    steps = (f"{name} {genitive} = {formula}", result)
+    return Solution('geometria', steps, value, answer_forms(value))
+
+
+# Kolejność ma znaczenie: "f(x) = ..." zawiera znak równości, a "Oblicz:" - ułamki
+_SOLVERS = [_solve_function, _solve_percent, _solve_geometry, _solve_fractions, _solve_equation]
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def solve(text: str) -> Optional[Solution]:
+    """
+    Rozwiązanie zadania krok po kroku (zapamiętywane według treści zadania)
+    
+    Returns:
+        Solution lub None, gdy zadanie nie jest obsługiwane
+    """
+    for solver in _SOLVERS:
+        try:
+            solution = solver(text)
+        except (SolverError, ZeroDivisionError):
+            continue
+        if solution is not None:
+            return solution
+    return None
\ No newline at end of file
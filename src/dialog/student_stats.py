@@ -0,0 +1,259 @@
+"""
+System statystyk i oceniania postępów ucznia
+"""
+
+import bisect
+import json
+import os
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from dialog.review import STATS_KEY, ReviewScheduler
+from utils.metrics import METRICS
+
+
+class AnswerIndex:
+    """
+    Indeks odpowiedzi ucznia do szybkiego stronicowania i filtrowania
+    
+    Odpowiedzi są trzymane w kolejności chronologicznej, a dla każdego tematu
+    przechowywana jest osobna lista pozycji. Filtrowanie po dacie to bisect
+    po znacznikach czasu (ISO 8601 sortuje się leksykograficznie).
+    """
+    
+    def __init__(self, sessions: List[dict]):
+        self.records: List[Tuple[int, dict]] = []
+        self.timestamps: List[str] = []
+        self.by_topic: Dict[str, List[int]] = {}
+        self.topic_timestamps: Dict[str, List[str]] = {}
+        
+        for session_number, session in enumerate(sessions, 1):
+            for answer in session.get('answers', []):
+                position = len(self.records)
+                timestamp = answer.get('timestamp', '')
+                self.records.append((session_number, answer))
+                self.timestamps.append(timestamp)
+                
+                topic = answer.get('topic', '')
+                self.by_topic.setdefault(topic, []).append(position)
+                self.topic_timestamps.setdefault(topic, []).append(timestamp)
+                
+        # Odpowiedzi zapisane w złej kolejności (np. ręcznie edytowany plik)
+        if self.timestamps != sorted(self.timestamps):
+            order = sorted(range(len(self.records)), key=lambda i: self.timestamps[i])
+            self.records = [self.records[i] for i in order]
+            self.timestamps = [self.timestamps[i] for i in order]
+            self.by_topic, self.topic_timestamps = {}, {}
+            for position, (_, answer) in enumerate(self.records):
+                topic = answer.get('topic', '')
+                self.by_topic.setdefault(topic, []).append(position)
+                self.topic_timestamps.setdefault(topic, []).append(self.timestamps[position])
+                
+    def topics(self) -> List[str]:
+        """Zwraca listę tematów występujących w historii"""
+        return sorted(self.by_topic)
+        
+    def _range(self, topic: Optional[str], date_from: Optional[str], date_to: Optional[str]):
+        """Zwraca (lista pozycji lub None, początek, koniec) dla filtra"""
+        if topic:
+            positions = self.by_topic.get(topic, [])
+            timestamps = self.topic_timestamps.get(topic, [])
+        else:
+            positions = None
+            timestamps = self.timestamps
+            
+        start = bisect.bisect_left(timestamps, date_from) if date_from else 0
+        # date_to jest włącznie - cały dzień, więc porównujemy z "YYYY-MM-DD\uffff"
+        end = bisect.bisect_right(timestamps, date_to + '\uffff') if date_to else len(timestamps)
+        return positions, start, max(start, end)
+        
+    def count(self, topic: Optional[str] = None, date_from: Optional[str] = None,
+              date_to: Optional[str] = None) -> int:
+        """Zwraca liczbę odpowiedzi pasujących do filtra"""
+        _, start, end = self._range(topic, date_from, date_to)
+        return end - start
+        
+    def query(self, topic: Optional[str] = None, date_from: Optional[str] = None,
+              date_to: Optional[str] = None, offset: int = 0, limit: int = 50,
+              newest_first: bool = True) -> List[Tuple[int, dict]]:
+        """
+        Zwraca jedną stronę odpowiedzi pasujących do filtra
+        
+        Args:
+            topic: Temat (None - wszystkie)
+            date_from: Data początkowa w formacie YYYY-MM-DD (włącznie)
+            date_to: Data końcowa w formacie YYYY-MM-DD (włącznie)
+            offset: Liczba pominiętych rekordów
+            limit: Maksymalna liczba zwróconych rekordów
+            newest_first: Czy zaczynać od najnowszych odpowiedzi
+            
+        Returns:
+            Lista krotek (numer sesji, odpowiedź)
+        """
+        positions, start, end = self._range(topic, date_from, date_to)
+        
+        if newest_first:
+            page_end = max(start, end - offset)
+            page_start = max(start, page_end - limit)
+            indices = range(page_end - 1, page_start - 1, -1)
+        else:
+            page_start = min(end, start + offset)
+            page_end = min(end, page_start + limit)
+            indices = range(page_start, page_end)
+            
+        if positions is None:
+            return [self.records[i] for i in indices]
+        return [self.records[positions[i]] for i in indices]
+
+
+class StudentStatistics:
+    def __init__(self, student_name: str):
+        self.student_name = student_name
+        self.stats_file = f"stats_{student_name.lower()}.json"
+        self.current_session = {
+            'start_time': datetime.now().isoformat(),
+            'answers': [],
+            'topics': {}
+        }
+        self._answer_index = None
+        self.load_stats()
+        
+    def load_stats(self):
+        """Wczytuje statystyki z pliku"""
+        if os.path.exists(self.stats_file):
+            with open(self.stats_file, 'r', encoding='utf-8') as f:
+                self.all_stats = json.load(f)
+        else:
+            self.all_stats = {
+                'student': self.student_name,
+                'total_sessions': 0,
+                'total_correct': 0,
+                'total_questions': 0,
+                'topics_performance': {},
+                'sessions': []
+            }
+        self._answer_index = None
+        # Harmonogram powtórek błędnie rozwiązanych zadań
+        self.review = ReviewScheduler.from_stats(self.all_stats)
+            
+    def save_stats(self):
+        """Zapisuje statystyki do pliku"""
+        self.all_stats[STATS_KEY] = self.review.to_list()
+        with METRICS.timer('tutor_storage_write_seconds', store='statistics'):
+            with open(self.stats_file, 'w', encoding='utf-8') as f:
+                json.dump(self.all_stats, f, ensure_ascii=False, indent=2)
+            
+    def record_answer(self, topic: str, question: str, answer: str, is_correct: bool, time_taken: float):
+        """Zapisuje odpowiedź ucznia"""
+        answer_data = {
+            'timestamp': datetime.now().isoformat(),
+            'topic': topic,
+            'question': question,
+            'answer': answer,
+            'correct': is_correct,
+            'time_seconds': time_taken
+        }
+        
+        self.current_session['answers'].append(answer_data)
+        self._answer_index = None
+        self.review.record(topic, question, is_correct, time_taken)
+        
+        # Aktualizuj statystyki tematu
+        if topic not in self.current_session['topics']:
+            self.current_session['topics'][topic] = {'correct': 0, 'total': 0}
+            
+        self.current_session['topics'][topic]['total'] += 1
+        if is_correct:
+            self.current_session['topics'][topic]['correct'] += 1
+            
+    def end_session(self):
+        """Kończy sesję i zapisuje statystyki"""
+        self.current_session['end_time'] = datetime.now().isoformat()
+        
+        # Oblicz statystyki sesji
+        total_correct = sum(1 for a in self.current_session['answers'] if a['correct'])
+        total_questions = len(self.current_session['answers'])
+        
+        if total_questions > 0:
+            self.current_session['accuracy'] = round(total_correct / total_questions * 100, 2)
+        else:
+            self.current_session['accuracy'] = 0
+            
+        # Aktualizuj globalne statystyki
+        self.all_stats['total_sessions'] += 1
+        self.all_stats['total_correct'] += total_correct
+        self.all_stats['total_questions'] += total_questions
+        
+        # Aktualizuj statystyki tematów
+        for topic, stats in self.current_session['topics'].items():
+            if topic not in self.all_stats['topics_performance']:
+                self.all_stats['topics_performance'][topic] = {'correct': 0, 'total': 0}
+                
+            self.all_stats['topics_performance'][topic]['correct'] += stats['correct']
+            self.all_stats['topics_performance'][topic]['total'] += stats['total']
+            
+        # Dodaj sesję do historii
+        self.all_stats['sessions'].append(self.current_session)
+        self._answer_index = None
+        
+        # Zapisz
+        self.save_stats()
+        
+    def get_answer_index(self) -> AnswerIndex:
+        """Zwraca indeks wszystkich odpowiedzi (łącznie z bieżącą sesją)"""
+        if self._answer_index is None:
+            sessions = list(self.all_stats['sessions'])
+            already_saved = sessions and sessions[-1] is self.current_session
+            if not already_saved and self.current_session['answers']:
+                sessions.append(self.current_session)
+            self._answer_index = AnswerIndex(sessions)
+        return self._answer_index
+        
+    def get_performance_summary(self) -> str:
+        """Zwraca podsumowanie wyników"""
+        if self.all_stats['total_questions'] == 0:
+            return "Brak danych do analizy. Rozwiąż kilka zadań!"
+            
+        overall_accuracy = round(
+            self.all_stats['total_correct'] / self.all_stats['total_questions'] * 100, 2
+        )
+        
+        summary = f"📊 **Twoje statystyki, {self.student_name}:**\n\n"
+        summary += f"📚 Sesji nauki: {self.all_stats['total_sessions']}\n"
+        summary += f"✅ Poprawnych odpowiedzi: {self.all_stats['total_correct']}/{self.all_stats['total_questions']}\n"
+        summary += f"📈 Skuteczność: {overall_accuracy}%\n\n"
+        
+        if self.all_stats['topics_performance']:
+            summary += "**Wyniki według tematów:**\n"
+            for topic, stats in self.all_stats['topics_performance'].items():
+                if stats['total'] > 0:
+                    accuracy = round(stats['correct'] / stats['total'] * 100, 2)
+                    summary += f"- {topic.capitalize()}: {accuracy}% ({stats['correct']}/{stats['total']})\n"
+                    
+        return summary
+        
+    def get_recommendations(self) -> str:
+        """Generuje rekomendacje dla ucznia"""
+        recommendations = []
+        
+        # Znajdź najsłabsze tematy
+        weak_topics = []
+        for topic, stats in self.all_stats['topics_performance'].items():
+            if stats['total'] >= 3:  # Minimum 3 zadania
+                accuracy = stats['correct'] / stats['total'] * 100
+                if accuracy < 70:
+                    weak_topics.append((topic, accuracy))
+                    
+        if weak_topics:
+            weak_topics.sort(key=lambda x: x[1])
+            recommendations.append(
+                f"🎯 Skup się na: {', '.join([t[0] for t in weak_topics[:2]])}"
+            )
+            
+        # Ogólna rada
+        if self.all_stats['total_questions'] < 20:
+            recommendations.append("💪 Rozwiąż więcej zadań, żeby lepiej ocenić postępy!")
+        elif self.all_stats['total_correct'] / self.all_stats['total_questions'] > 0.8:
+            recommendations.append("🌟 Świetnie ci idzie! Może czas na trudniejszy poziom?")
+            
+        return "\n".join(recommendations) if recommendations else "Kontynuuj naukę! 📚"
\ No newline at end of file
@@ -0,0 +1,451 @@
+"""
+Sesje dialogu w wielu procesach roboczych (sharding po identyfikatorze sesji)
+
+Jeden proces z wieloma DialogManagerami jest ograniczony przez GIL.
+SessionSupervisor uruchamia N procesów roboczych - każdy ma własne
+DialogManagery dla swojej części sesji:
+
+    proces roboczy sesji = crc32(id sesji) % N
+
+Tury są przesyłane do właściciela sesji przez potok (multiprocessing.Pipe).
+Żądania do jednego procesu są wysyłane bez czekania na odpowiedzi
+poprzednich (wątek czytający przypisuje odpowiedzi do Future po numerze
+żądania), więc procesy robocze nie czekają na klienta między turami.
+
+Stan każdej sesji jest zapisywany w dzienniku (dialog.session_state),
+więc po awarii procesu roboczego nowy proces wznawia sesje z dysku przy
+ich następnej turze. Zmiana liczby procesów (`resize`) przenosi sesje,
+które zmieniają właściciela, przez migawki hand_off/take_over.
+
+Tryb pre-fork (`prefork=True`, tylko Linux/macOS): proces nadrzędny raz
+wczytuje model VOSK i moduły dialogu (słowniki, katalog zadań), zamraża
+je przed GC (`gc.freeze` - bez tego zbieranie śmieci dotyka liczników
+referencji i kopiuje strony) i tworzy procesy robocze przez fork - dzielą
+one te dane w trybie copy-on-write. Wtedy procesy robocze mogą też
+rozpoznawać mowę sesji (`submit_audio`) współdzielonym modelem. Pamięć
+unikalną procesów (USS) zwraca `memory()`, a proces roboczy, który obsłużył
+`max_sessions` sesji, jest wymieniany na nowy (sesje przechodzą przez
+migawki), co ogranicza narastanie prywatnych kopii stron.
+
+Bez pre-fork rozpoznawanie mowy zostaje w procesie wywołującym
+(dekodowanie VOSK działa w kodzie natywnym) - do procesów roboczych trafia
+tekst i hipotezy.
+"""
+
+import gc
+import logging
+import multiprocessing
+import os
+import threading
+import zlib
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from dialog.session_state import SESSION_STATE_DIR
+
+logger = logging.getLogger(__name__)
+
+# Dane wczytane przed fork (dziedziczone przez procesy robocze)
+_shared = {'model': None}
+
+# Ścieżka modelu VOSK (jak w speech.recognition)
+DEFAULT_MODEL_PATH = os.path.join("assets", "models", "vosk-model-pl")
+
+# Limit czasu (s) jednej migawki przy wymianie procesu roboczego - wymiana trzyma
+# blokadę supervisora, więc zawieszony proces nie może jej zablokować na zawsze
+RECYCLE_TIMEOUT = 5.0
+
+
+class WorkerError(RuntimeError):
+    """Operacja w procesie roboczym zakończyła się błędem lub proces przestał działać"""
+
+
+def shard_for(session_id: str, workers: int) -> int:
+    """Numer procesu roboczego sesji - stały między uruchomieniami (w przeciwieństwie do hash())"""
+    return zlib.crc32(session_id.encode('utf-8')) % workers
+
+
+def preload(model_path: Optional[str] = DEFAULT_MODEL_PATH):
+    """Wczytuje w procesie nadrzędnym dane współdzielone z procesami roboczymi"""
+    # Import buduje słownik poprawek ASR i tablice intencji; katalog zadań to singleton
+    # modułu (mmap) - otwarty tutaj, jest dziedziczony przez procesy robocze
+    import dialog.manager
+    from dialog.catalogue import get_catalogue
+    get_catalogue()
+    
+    if model_path and _shared['model'] is None:
+        try:
+            if not os.path.exists(model_path):
+                raise FileNotFoundError(f"Model VOSK nie znaleziony w: {model_path}")
+            import vosk
+            logger.info("Ładowanie modelu VOSK (współdzielonego) z: %s", model_path)
+            _shared['model'] = vosk.Model(model_path)
+        except Exception as e:
+            logger.error("Błąd podczas ładowania modelu VOSK: %s - procesy robocze bez rozpoznawania mowy", e)
+            
+    # Obiekty wczytane do tej pory nie będą przeglądane przez GC w procesach potomnych
+    gc.freeze()
+
+
+def memory_usage(pid: int) -> Optional[Dict[str, int]]:
+    """
+    Pamięć procesu w kB z /proc/<pid>/smaps_rollup (Linux)
+    
+    Returns:
+        {'rss', 'pss', 'uss'} - USS to strony prywatne (czyste i brudne), czyli
+        pamięć zwolniona po zakończeniu procesu; None gdy niedostępne
+    """
+    try:
+        with open(f"/proc/{pid}/smaps_rollup", 'r') as f:
+            fields = {}
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 2 and parts[0].endswith(':') and parts[1].isdigit():
+                    fields[parts[0][:-1]] = int(parts[1])
+    except OSError:
+        return None
+    return {
+        'rss': fields.get('Rss', 0),
+        'pss': fields.get('Pss', 0),
+        'uss': fields.get('Private_Clean', 0) + fields.get('Private_Dirty', 0),
+    }
+
+
+class _WorkerSessions:
+    """Sesje jednego procesu roboczego"""
+    
+    def __init__(self, state_dir: str):
+        self.state_dir = state_dir
+        self.sessions = {}
+        self.recognizers = {}
+        
+    def _session(self, session_id: str, create: bool = False):
+        from dialog.manager import DialogManager
+        from dialog.session_state import SessionJournal
+        
+        session = self.sessions.get(session_id)
+        if session is not None:
+            return session
+            
+        messages: List[str] = []
+        manager = DialogManager(messages.append)
+        journal = SessionJournal(session_id, self.state_dir)
+        if not journal.restore(manager):
+            if not create:
+                raise KeyError(f"Nieznana sesja: {session_id}")
+            journal.attach(manager)
+        session = self.sessions[session_id] = (manager, journal, messages)
+        return session
+        
+    def start(self, session_id: str) -> List[str]:
+        manager, _, messages = self._session(session_id, create=True)
+        manager.start_dialog()
+        return self._take(messages)
+        
+    def turn(self, session_id: str, text: str, alternatives=None) -> List[str]:
+        manager, _, messages = self._session(session_id)
+        manager.process_user_input(text, alternatives)
+        return self._take(messages)
+        
+    def audio(self, session_id: str, data: bytes, max_alternatives: int = 0):
+        """
+        Rozpoznaje blok audio sesji współdzielonym modelem VOSK
+        
+        Returns:
+            (rozpoznany tekst, wiadomości systemu) po zakończonej wypowiedzi, inaczej (None, [])
+        """
+        recognizer = self.recognizers.get(session_id)
+        if recognizer is None:
+            from speech.backends import VoskRecognitionBackend
+            
+            if _shared['model'] is None:
+                raise RuntimeError("Brak współdzielonego modelu VOSK (tryb pre-fork)")
+            recognizer = self.recognizers[session_id] = VoskRecognitionBackend(
+                None, max_alternatives=max_alternatives, model=_shared['model'])
+                
+        if not recognizer.accept_waveform(data):
+            return None, []
+        hypotheses = recognizer.results()
+        if not hypotheses:
+            return None, []
+        return hypotheses[0].text, self.turn(session_id, hypotheses[0].text, hypotheses)
+        
+    def hand_off(self, session_id: str) -> bytes:
+        from dialog.session_state import hand_off
+        
+        manager, journal, _ = self._session(session_id)
+        data = hand_off(manager)
+        journal.detach(manager)
+        del self.sessions[session_id]
+        self.recognizers.pop(session_id, None)
+        return data
+        
+    def take_over(self, session_id: str, data: bytes):
+        from dialog.manager import DialogManager
+        from dialog.session_state import SessionJournal, take_over
+        
+        messages: List[str] = []
+        manager = DialogManager(messages.append)
+        take_over(data, manager)
+        journal = SessionJournal(session_id, self.state_dir)
+        journal.attach(manager)
+        self.sessions[session_id] = (manager, journal, messages)
+        
+    def end(self, session_id: str):
+        self.recognizers.pop(session_id, None)
+        session = self.sessions.pop(session_id, None)
+        if session is not None:
+            manager, journal, _ = session
+            journal.detach(manager)
+            
+    @staticmethod
+    def _take(messages: List[str]) -> List[str]:
+        result = list(messages)
+        messages.clear()
+        return result
+
+
+def _worker_main(conn, state_dir: str):
+    """Pętla procesu roboczego: (numer żądania, operacja, argumenty) -> (numer, ok, wynik)"""
+    sessions = _WorkerSessions(state_dir)
+    while True:
+        try:
+            request_id, operation, args = conn.recv()
+        except (EOFError, KeyboardInterrupt):
+            break
+        if operation == 'stop':
+            conn.send((request_id, True, None))
+            break
+        try:
+            result = getattr(sessions, operation)(*args)
+            conn.send((request_id, True, result))
+        except Exception as e:
+            logger.exception("Błąd operacji %s w procesie roboczym", operation)
+            conn.send((request_id, False, f"{type(e).__name__}: {e}"))
+    conn.close()
+
+
+class _Worker:
+    """Proces roboczy widziany od strony supervisora"""
+    
+    def __init__(self, index: int, state_dir: str, context):
+        self.index = index
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_conn, state_dir),
+                                       name=f"dialog-worker-{index}", daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.lock = threading.Lock()
+        self.pending: Dict[int, Future] = {}
+        self.next_id = 0
+        self.alive = True
+        self.reader = threading.Thread(target=self._read, name=f"dialog-worker-{index}-reader", daemon=True)
+        self.reader.start()
+        
+    def submit(self, operation: str, *args) -> Future:
+        future = Future()
+        with self.lock:
+            if not self.alive:
+                future.set_exception(WorkerError(f"Proces roboczy {self.index} nie działa"))
+                return future
+            self.next_id += 1
+            self.pending[self.next_id] = future
+            try:
+                self.conn.send((self.next_id, operation, args))
+            except (BrokenPipeError, OSError) as e:
+                del self.pending[self.next_id]
+                future.set_exception(WorkerError(f"Proces roboczy {self.index}: {e}"))
+        return future
+        
+    def _read(self):
+        while True:
+            try:
+                request_id, ok, result = self.conn.recv()
+            except (EOFError, OSError):
+                break
+            with self.lock:
+                future = self.pending.pop(request_id, None)
+            if future is None:
+                continue
+            if ok:
+                future.set_result(result)
+            else:
+                future.set_exception(WorkerError(result))
+                
+        with self.lock:
+            self.alive = False
+            pending, self.pending = self.pending, {}
+        for future in pending.values():
+            future.set_exception(WorkerError(f"Proces roboczy {self.index} zakończył działanie"))
+            
+    def stop(self, timeout: float = 5.0):
+        if self.alive:
+            try:
+                self.submit('stop').result(timeout)
+            except Exception:
+                pass
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.terminate()
+        self.conn.close()
+
+
+class SessionSupervisor:
+    def __init__(self, workers: Optional[int] = None, state_dir: str = SESSION_STATE_DIR,
+                 start_method: Optional[str] = None, prefork: bool = False,
+                 model_path: Optional[str] = DEFAULT_MODEL_PATH, max_sessions: Optional[int] = None):
+        """
+        Args:
+            workers: Liczba procesów roboczych (domyślnie liczba rdzeni)
+            state_dir: Katalog migawek i dzienników sesji (wspólny dla procesów)
+            start_method: Sposób uruchamiania procesów multiprocessing (fork, spawn...)
+            prefork: Wczytaj model VOSK i dane dialogu przed utworzeniem procesów (wymusza fork)
+            model_path: Model VOSK wczytywany w trybie pre-fork (None - bez rozpoznawania mowy)
+            max_sessions: Po ilu rozpoczętych sesjach wymienić proces roboczy na nowy (None - nigdy)
+        """
+        self.state_dir = state_dir
+        if prefork:
+            preload(model_path)
+            start_method = 'fork'
+        self.context = multiprocessing.get_context(start_method)
+        self.max_sessions = max_sessions
+        self.lock = threading.Lock()
+        self.sessions: Dict[str, int] = {}  # sesja -> numer procesu roboczego
+        self.workers = [_Worker(index, state_dir, self.context) for index in range(workers or os.cpu_count() or 1)]
+        self.served = [0] * len(self.workers)  # sesje rozpoczęte w bieżącym procesie roboczym
+        logger.info("Uruchomiono %d procesów roboczych dialogu", len(self.workers))
+        
+    def _worker(self, session_id: str) -> _Worker:
+        with self.lock:
+            index = shard_for(session_id, len(self.workers))
+            worker = self.workers[index]
+            if not worker.alive:
+                # Proces roboczy padł - nowy wznowi jego sesje z dzienników przy następnej turze
+                logger.warning("Restart procesu roboczego %d", index)
+                worker.stop(timeout=0)
+                worker = self.workers[index] = _Worker(index, self.state_dir, self.context)
+                self.served[index] = 0
+            self.sessions[session_id] = index
+            return worker
+            
+    def start_session(self, session_id: str) -> Future:
+        """Rozpoczyna dialog sesji; Future z listą wiadomości systemu"""
+        retired = None
+        with self.lock:
+            index = shard_for(session_id, len(self.workers))
+            if self.max_sessions and self.served[index] >= self.max_sessions:
+                retired = self._recycle(index)
+            self.served[index] += 1
+        # Zatrzymanie procesu (do kilku sekund) już poza blokadą
+        if retired is not None:
+            retired.stop()
+        return self._worker(session_id).submit('start', session_id)
+        
+    def _recycle(self, index: int) -> _Worker:
+        """
+        Wymienia proces roboczy na nowy, przenosząc jego sesje przez migawki (pod self.lock)
+        
+        Gdy nowy proces nie przejmie sesji, zostaje stary - sesje, które zdążyły go
+        opuścić, wznowi z dzienników przy następnej turze.
+        
+        Returns:
+            Proces do zatrzymania przez wywołującego (stary albo nieudany nowy)
+        """
+        old = self.workers[index]
+        new = _Worker(index, self.state_dir, self.context)
+        self.served[index] = 0
+        moved = 0
+        try:
+            for session_id, owner in self.sessions.items():
+                if owner != index:
+                    continue
+                try:
+                    data = old.submit('hand_off', session_id).result(RECYCLE_TIMEOUT)
+                except (WorkerError, FutureTimeout) as e:
+                    # Sesja zakończona albo proces nie działa - nowy wznowi ją z dziennika
+                    logger.debug("Sesja %s bez migawki przy wymianie procesu %d: %s", session_id, index, e)
+                    continue
+                try:
+                    new.submit('take_over', session_id, data).result(RECYCLE_TIMEOUT)
+                except (WorkerError, FutureTimeout) as e:
+                    # Zawieszony albo martwy nowy proces - wymiana się nie udała
+                    if isinstance(e, FutureTimeout) or not new.alive:
+                        raise
+                    # Stan sesji jest w dzienniku - nowy proces wznowi ją przy następnej turze
+                    logger.warning("Sesja %s nie przejęta przy wymianie procesu %d: %s", session_id, index, e)
+                    continue
+                moved += 1
+        except (WorkerError, FutureTimeout) as e:
+            logger.error("Nie udało się wymienić procesu roboczego %d: %s", index, e)
+            return new
+        self.workers[index] = new
+        logger.info("Wymieniono proces roboczy %d (przeniesione sesje: %d)", index, moved)
+        return old
+        
+    def submit_turn(self, session_id: str, text: str,
+                    alternatives: Optional[Sequence[Tuple[str, float]]] = None) -> Future:
+        """Wysyła turę do procesu roboczego sesji; Future z listą wiadomości systemu"""
+        return self._worker(session_id).submit(
+            'turn', session_id, text, [tuple(alt) for alt in alternatives] if alternatives else None)
+            
+    def turn(self, session_id: str, text: str,
+             alternatives: Optional[Sequence[Tuple[str, float]]] = None) -> List[str]:
+        """Przetwarza turę i czeka na odpowiedź"""
+        return self.submit_turn(session_id, text, alternatives).result()
+        
+    def submit_audio(self, session_id: str, data: bytes, max_alternatives: int = 0) -> Future:
+        """
+        Wysyła blok audio do rozpoznania w procesie roboczym sesji (tryb pre-fork)
+        
+        Returns:
+            Future z (rozpoznany tekst, wiadomości systemu) lub (None, []) w trakcie wypowiedzi
+        """
+        return self._worker(session_id).submit('audio', session_id, data, max_alternatives)
+        
+    def memory(self) -> Dict[str, Optional[Dict[str, int]]]:
+        """Pamięć (rss, pss, uss w kB) procesu nadrzędnego i procesów roboczych"""
+        with self.lock:
+            pids = {f"worker-{worker.index}": worker.process.pid for worker in self.workers}
+        usage = {'parent': memory_usage(os.getpid())}
+        usage.update({name: memory_usage(pid) for name, pid in pids.items()})
+        return usage
+        
+    def end_session(self, session_id: str):
+        """Zamyka sesję w procesie roboczym (stan zostaje w dzienniku)"""
+        worker = self._worker(session_id)
+        with self.lock:
+            self.sessions.pop(session_id, None)
+        worker.submit('end', session_id).result()
+        
+    def resize(self, workers: int):
+        """Zmienia liczbę procesów roboczych, przenosząc sesje przez migawki"""
+        with self.lock:
+            old_count = len(self.workers)
+            if workers > old_count:
+                self.workers += [_Worker(index, self.state_dir, self.context)
+                                 for index in range(old_count, workers)]
+            moves = [(session_id, index, shard_for(session_id, workers))
+                     for session_id, index in self.sessions.items()
+                     if shard_for(session_id, workers) != index]
+                     
+            for session_id, source, target in moves:
+                try:
+                    data = self.workers[source].submit('hand_off', session_id).result(RECYCLE_TIMEOUT)
+                    self.workers[target].submit('take_over', session_id, data).result(RECYCLE_TIMEOUT)
+                except (WorkerError, FutureTimeout) as e:
+                    # Nowy właściciel wznowi sesję z dziennika
+                    logger.warning("Sesja %s nie przeniesiona z procesu %d do %d: %s", session_id, source, target, e)
+                self.sessions[session_id] = target
+                
+            removed, self.workers = self.workers[workers:], self.workers[:workers]
+            self.served = (self.served + [0] * workers)[:workers]
+        for worker in removed:
+            worker.stop()
+        logger.info("Procesy robocze: %d -> %d, przeniesione sesje: %d", old_count, workers, len(moves))
+        
+    def shutdown(self):
+        """Zatrzymuje wszystkie procesy robocze"""
+        with self.lock:
+            workers, self.workers = self.workers, []
+        for worker in workers:
+            worker.stop()
\ No newline at end of file
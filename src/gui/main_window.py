@@ -2,20 +2,45 @@
 Główne okno aplikacji korepetytora matematycznego
 """
 
+import logging
 import tkinter as tk
 from tkinter import ttk, scrolledtext
 import threading
+import queue
+from collections import deque
 from datetime import datetime
 
-# Importy dla TTS i Dialog Manager
-from speech.synthesis import get_tts
+# Moduły mowy (pyttsx3, vosk, sounddevice) są importowane w wątkach startowych,
+# żeby okno pojawiło się od razu
 from dialog.manager import DialogManager
-from speech.recognition import SpeechRecognizer, test_microphone
+from dialog.session_state import SessionJournal
+from utils.profiling import DEFAULT_DURATION, PROFILER
+from utils.session_logger import SessionLogger
+from utils.tracing import TRACER
+
+logger = logging.getLogger(__name__)
+
+# Co ile ms wątek Tk wykonuje zaległe aktualizacje interfejsu (~30 klatek/s)
+UI_PUMP_INTERVAL_MS = 33
+
+# Maksymalna liczba linii w oknie rozmowy (pełna historia jest w logu sesji)
+TRANSCRIPT_MAX_LINES = 500
+
+# Ile linii ponad limit usuwamy naraz, żeby nie przycinać przy każdej wiadomości
+TRANSCRIPT_TRIM_BATCH = 100
+
+# Liczba starszych wiadomości wczytywanych przyciskiem "Wczytaj starsze"
+TRANSCRIPT_PAGE_SIZE = 50
+
+# Co ile zapisywać czasy tur i ich podsumowanie do logu sesji (gdy śledzenie włączone)
+TRACE_FLUSH_INTERVAL_MS = 60000
 
 
 class MathTutorApp:
-    def __init__(self, root):
+    def __init__(self, root, profiler=None, asr_alternatives=0, resume_session=None):
         self.root = root
+        self.profiler = profiler
+        self.asr_alternatives = asr_alternatives
         self.root.title("Korepetytor Matematyczny - System Dialogowy")
         self.root.geometry("800x600")
         
@@ -26,22 +51,114 @@ class MathTutorApp:
         # Zmienne dla menu
         self.adaptive_mode = tk.BooleanVar(value=False)
         
-        # Inicjalizacja TTS i Dialog Manager
-        self.tts = get_tts()
-        self.dialog_manager = DialogManager(self.on_system_message)
+        # Kolejka aktualizacji UI - Tk nie jest bezpieczny wątkowo, więc callbacki
+        # z wątków mowy tylko dodają tu zadania, a wykonuje je _pump_ui w wątku Tk
+        self.ui_queue = queue.Queue()
+        self._activity_reset_id = None
+        
+        # Log sesji trzyma pełną historię, okno rozmowy tylko ostatnie wiadomości
+        self.session_logger = SessionLogger()
+        self.transcript_first = 0  # indeks (w logu) pierwszej widocznej wiadomości
+        self.transcript_lines = deque()  # liczba linii każdej widocznej wiadomości
+        self.transcript_line_count = 0
+        self.transcript_max_lines = TRANSCRIPT_MAX_LINES
+        
+        # Dialog Manager jest lekki - TTS i rozpoznawanie mowy ładują się w tle
+        self.tts = None
+        self.speech_recognizer = None
+        self.dialog_manager = DialogManager(self.on_system_message, on_corrections=self.on_corrections,
+                                            on_answer=self.on_answer)
+        
+        # Statystyki ucznia (dialog.student_stats) - otwierane, gdy znamy już imię
+        self.statistics = None
+        self.statistics_lock = threading.Lock()
+        
+        # Stan dialogu zapisywany po każdej turze - po awarii sesję można wznowić (--resume)
+        self.session_journal = SessionJournal(resume_session or self.session_logger.session_id)
+        if resume_session:
+            # Migawka zawiera też bieżącą sesję statystyk - otwieramy je przed przywróceniem
+            saved = self.session_journal.load()
+            name = saved and saved['dialog'].get('context', {}).get('user_name')
+            if name:
+                self._open_statistics(name)
+        self.resumed = bool(resume_session) and self.session_journal.restore(self.dialog_manager)
+        if resume_session and not self.resumed:
+            self.add_message("System", f"⚠️ Brak zapisanego stanu sesji {resume_session} - zaczynamy od nowa")
+        if not self.resumed:
+            self.session_journal.attach(self.dialog_manager)
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
 
-        # Inicjalizacja rozpoznawania mowy
+        self.setup_ui()
+        self._pump_ui()
+        if TRACER.enabled:
+            self.root.after(TRACE_FLUSH_INTERVAL_MS, self._flush_traces)
+        if self.profiler:
+            self.profiler.mark("interfejs")
+            
+        self.start_background_init()
+        
+    def start_background_init(self):
+        """Uruchamia ładowanie TTS, modelu VOSK i test mikrofonu w wątkach w tle"""
+        self.startup_pending = {
+            'tts': "syntezator mowy",
+            'vosk': "model VOSK",
+            'mic': "mikrofon",
+        }
+        self.startup_lock = threading.Lock()
+        self._update_startup_status()
+        
+        for name, target in (('tts', self._init_tts),
+                             ('vosk', self._init_recognizer),
+                             ('mic', self._check_microphone)):
+            threading.Thread(target=self._run_startup_task, args=(name, target),
+                             name=f"startup-{name}", daemon=True).start()
+                             
+    def _run_startup_task(self, name, target):
+        """Wykonuje jedno zadanie startowe i raportuje postęp"""
+        try:
+            if self.profiler:
+                with self.profiler.phase(self.startup_pending[name]):
+                    target()
+            else:
+                target()
+        except Exception as e:
+            self.add_message("System", f"❌ Błąd inicjalizacji ({self.startup_pending[name]}): {e}")
+        finally:
+            with self.startup_lock:
+                del self.startup_pending[name]
+                done = not self.startup_pending
+            self._update_startup_status()
+            if done and self.profiler:
+                print(self.profiler.report())
+                
+    def _update_startup_status(self):
+        """Pokazuje na pasku statusu, co jeszcze się ładuje"""
+        with self.startup_lock:
+            pending = list(self.startup_pending.values())
+        if pending:
+            self.update_status(f"Ładowanie: {', '.join(pending)}...")
+        else:
+            self.update_status("System gotowy do pracy")
+            
+    def _init_tts(self):
+        """Inicjalizacja syntezatora mowy (wątek w tle)"""
+        from speech.synthesis import get_tts
+        self.tts = get_tts()
+        
+    def _init_recognizer(self):
+        """Ładowanie modelu VOSK (wątek w tle)"""
+        from speech.recognition import SpeechRecognizer
         self.speech_recognizer = SpeechRecognizer(
             on_result=self.on_speech_result,
-            on_partial=self.on_speech_partial
+            on_partial=self.on_speech_partial,
+            max_alternatives=self.asr_alternatives
         )
 
-        # Test mikrofonu przy starcie
+    def _check_microphone(self):
+        """Test mikrofonu przy starcie (wątek w tle)"""
+        from speech.recognition import test_microphone
         if not test_microphone():
             self.add_message("System", "⚠️ Uwaga: Nie wykryto mikrofonu lub wystąpił problem z audio!")
-                
-        self.setup_ui()
-        self.update_status("System gotowy do pracy")
         
     def setup_ui(self):
         """Konfiguracja interfejsu użytkownika"""
@@ -85,6 +202,14 @@ class MathTutorApp:
         dialog_frame.columnconfigure(0, weight=1)
         dialog_frame.rowconfigure(0, weight=1)
         
+        self.load_older_button = ttk.Button(
+            dialog_frame,
+            text="⬆ Wczytaj starsze",
+            command=self.load_older_messages,
+            state=tk.DISABLED
+        )
+        self.load_older_button.grid(row=1, column=0, sticky=tk.W, pady=(5, 0))
+        
         # Tagi dla różnych typów wiadomości
         self.dialog_area.tag_config("user", foreground="blue")
         self.dialog_area.tag_config("system", foreground="green")
@@ -163,6 +288,8 @@ class MathTutorApp:
         file_menu = tk.Menu(menubar, tearoff=0)
         menubar.add_cascade(label="Plik", menu=file_menu)
         file_menu.add_command(label="Eksportuj raport PDF", command=self.export_report)
+        file_menu.add_command(label="Eksportuj raport HTML", command=lambda: self.export_report('html'))
+        file_menu.add_command(label="Eksportuj raport CSV", command=lambda: self.export_report('csv'))
         file_menu.add_separator()
         file_menu.add_command(label="Zakończ", command=self.root.quit)
 
@@ -182,6 +309,27 @@ class MathTutorApp:
         )
         settings_menu.add_command(label="Zmień głos", command=self.change_voice)
 
+        # Menu Narzędzia
+        tools_menu = tk.Menu(menubar, tearoff=0)
+        menubar.add_cascade(label="Narzędzia", menu=tools_menu)
+        tools_menu.add_command(
+            label=f"Profiluj przez {DEFAULT_DURATION} s",
+            command=self.start_profiling
+        )
+        
+    def start_profiling(self, duration=DEFAULT_DURATION):
+        """Uruchamia sesję profilowania wątków dialogu i rozpoznawania mowy"""
+        def on_done(path):
+            if path:
+                self.add_message("System", f"📊 Profil zapisany: {path}.pstats / .collapsed / .txt")
+            else:
+                self.add_message("System", "❌ Nie udało się zapisać profilu")
+                
+        if PROFILER.start(duration, on_done=on_done):
+            self.add_message("System", f"📊 Profilowanie przez {duration} s...")
+        else:
+            self.add_message("System", "Profilowanie już trwa")
+            
     def toggle_adaptive_mode(self):
         """Przełącza tryb adaptacyjny"""
         if self.adaptive_mode.get():
@@ -189,16 +337,18 @@ class MathTutorApp:
         else:
             self.add_message("System", "❌ Tryb adaptacyjny wyłączony")
 
-    def export_report(self):
-        """Eksportuje raport do PDF"""
+    def export_report(self, report_format='pdf'):
+        """Eksportuje raport (PDF, HTML lub CSV)"""
         try:
             # Sprawdź czy mamy statystyki
-            if hasattr(self, 'statistics') and self.statistics:
+            statistics = self.get_statistics()
+            if statistics and statistics.all_stats['total_questions']:
                 from utils.report_generator import ReportGenerator
                 
                 generator = ReportGenerator(
-                    self.dialog_manager.context.get('user_name', 'Uczeń'),
-                    self.statistics.all_stats
+                    statistics.student_name,
+                    statistics.all_stats,
+                    report_format
                 )
                 filename = generator.generate_report()
                 
@@ -209,13 +359,58 @@ class MathTutorApp:
         except Exception as e:
             self.add_message("System", f"❌ Błąd podczas generowania raportu: {str(e)}")
 
+    def get_statistics(self):
+        """Zwraca statystyki ucznia (None, dopóki nie podał imienia)"""
+        if self.statistics is None:
+            name = self.dialog_manager.context.get('user_name')
+            if not name:
+                return None
+            self._open_statistics(name)
+        return self.statistics
+        
+    def _open_statistics(self, name):
+        """Wczytuje statystyki ucznia i dołącza je do dziennika sesji"""
+        from dialog.student_stats import StudentStatistics
+        
+        with self.statistics_lock:
+            if self.statistics is None:
+                self.statistics = StudentStatistics(name)
+                self.session_journal.statistics = self.statistics
+                # Powtórki wybiera dialog, odpowiedzi zapisują w harmonogramie statystyki (on_answer)
+                self.dialog_manager.review = self.statistics.review
+                
+    def on_answer(self, topic, question, answer, is_correct, time_taken):
+        """Callback po ocenie odpowiedzi w quizie - zapis do statystyk ucznia"""
+        statistics = self.get_statistics()
+        if statistics:
+            statistics.record_answer(topic, question, answer, is_correct, time_taken)
+            
     def show_statistics(self):
         """Pokazuje okno statystyk"""
-        self.add_message("System", "📊 Funkcja statystyk będzie dostępna w następnej wersji!")
+        statistics = self.get_statistics()
+        if statistics:
+            from gui.statistics_window import StatisticsWindow
+            
+            StatisticsWindow(self.root, statistics)
+        else:
+            self.add_message("System", "📊 Brak statystyk. Przedstaw się i rozwiąż kilka zadań!")
         
     def show_history(self):
         """Pokazuje historię sesji"""
-        self.add_message("System", "📜 Funkcja historii będzie dostępna w następnej wersji!")
+        statistics = self.get_statistics()
+        if statistics and statistics.get_answer_index().count():
+            from gui.statistics_window import StatisticsWindow
+            
+            window = StatisticsWindow(self.root, statistics)
+            window.show_history_tab()
+        else:
+            self.add_message("System", "📜 Brak zapisanej historii. Rozwiąż najpierw kilka zadań!")
+            
+    def on_close(self):
+        """Zamyka okno - zapisuje statystyki zakończonej sesji"""
+        if self.statistics and self.statistics.current_session['answers']:
+            self.statistics.end_session()
+        self.root.destroy()
         
     def change_voice(self):
         """Zmienia głos TTS"""
@@ -236,15 +431,24 @@ class MathTutorApp:
             
     def start_listening(self):
         """Rozpoczyna nasłuchiwanie"""
+        if self.speech_recognizer is None:
+            self.update_status("Model rozpoznawania mowy jeszcze się ładuje - spróbuj za chwilę")
+            return
+            
         self.is_listening = True
         self.start_button.config(text="⏸ Stop", style="Stop.TButton")
-        self.activity_label.config(text="🔴", foreground="red")
+        self.set_activity("🔴", "red")
         
         # Rozpocznij rozpoznawanie mowy
         if self.speech_recognizer.start_listening():
             self.update_status("Nasłuchiwanie aktywne... Mów do mikrofonu!")
-            # Rozpocznij dialog
-            self.dialog_manager.start_dialog()
+            if self.resumed:
+                # Wznowiona sesja - dialog toczy się dalej od zapisanego stanu
+                self.resumed = False
+                self.add_message("System", "Wznawiam przerwaną sesję - możemy kontynuować.")
+            else:
+                # Rozpocznij dialog
+                self.dialog_manager.start_dialog()
         else:
             self.update_status("Błąd uruchamiania rozpoznawania mowy!")
             self.stop_listening()
@@ -253,50 +457,205 @@ class MathTutorApp:
         """Zatrzymuje nasłuchiwanie"""
         self.is_listening = False
         self.start_button.config(text="▶ Start", style="Start.TButton")
-        self.activity_label.config(text="⭕")
+        self.set_activity("⭕", "")
         
         # Zatrzymaj rozpoznawanie mowy
-        self.speech_recognizer.stop_listening()
+        if self.speech_recognizer:
+            self.speech_recognizer.stop_listening()
         
         self.update_status("Nasłuchiwanie zatrzymane")
         self.add_message("System", "Nasłuchiwanie zatrzymane.")
         
     def add_message(self, sender, message):
-        """Dodaje wiadomość do obszaru dialogu"""
+        """Dodaje wiadomość do obszaru dialogu (można wywołać z dowolnego wątku)"""
         timestamp = datetime.now().strftime("%H:%M:%S")
+        self.ui_queue.put(('message', (timestamp, sender, message)))
+        
+    def clear_dialog(self):
+        """Czyści obszar dialogu"""
+        self.ui_queue.put(('clear', None))
+        self.update_status("Historia wyczyszczona")
+        
+    def update_status(self, message):
+        """Aktualizuje pasek statusu (można wywołać z dowolnego wątku)"""
+        self.ui_queue.put(('status', message))
+        
+    def set_activity(self, text, color, reset_after=None):
+        """Ustawia wskaźnik aktywności (można wywołać z dowolnego wątku)"""
+        self.ui_queue.put(('activity', (text, color, reset_after)))
+        
+    def _pump_ui(self):
+        """Wykonuje zaległe aktualizacje UI - jedna aktualizacja widżetów na klatkę"""
+        try:
+            PROFILER.checkpoint()
+            self._apply_ui_updates()
+        except Exception:
+            logger.exception("Błąd podczas aktualizacji interfejsu")
+        finally:
+            # Bez ponownego zaplanowania żadna kolejna aktualizacja z wątków mowy nie trafi do okna
+            self.root.after(UI_PUMP_INTERVAL_MS, self._pump_ui)
+            
+    def _apply_ui_updates(self):
+        """Zbiera aktualizacje z kolejki UI i nanosi je na widżety"""
+        messages = []
+        clear = False
+        status = None
+        activity = None
+        corrections = []
+        
+        # Zbierz wszystko co przyszło od ostatniej klatki
+        while True:
+            try:
+                kind, payload = self.ui_queue.get_nowait()
+            except queue.Empty:
+                break
+                
+            if kind == 'message':
+                messages.append(payload)
+            elif kind == 'clear':
+                clear = True
+                # Wiadomości sprzed wyczyszczenia nie trafią już do okna, ale należą do logu sesji
+                for timestamp, sender, message in messages:
+                    self.session_logger.log_message(sender, message)
+                messages = []
+            elif kind == 'status':
+                status = payload
+            elif kind == 'activity':
+                activity = payload
+            elif kind == 'corrections':
+                corrections.append(payload)
+                
+        if clear or messages:
+            self._write_messages(messages, clear)
+            
+        for original, corrected, words in corrections:
+            self.session_logger.log_corrections(original, corrected, words)
+            
+        # Liczy się tylko ostatni status i stan wskaźnika
+        if status is not None:
+            self.status_var.set(f"Status: {status}")
+            
+        if activity is not None:
+            text, color, reset_after = activity
+            self.activity_label.config(text=text, foreground=color)
+            if self._activity_reset_id is not None:
+                self.root.after_cancel(self._activity_reset_id)
+                self._activity_reset_id = None
+            if reset_after:
+                self._activity_reset_id = self.root.after(
+                    reset_after, self._reset_activity
+                )
+        
+    def _flush_traces(self):
+        """Przepisuje czasy zakończonych tur i podsumowanie histogramów do logu sesji"""
+        records = TRACER.drain_completed()
+        if records:
+            self.session_logger.log_traces(records)
+            self.session_logger.log_trace_summary(TRACER.summary(), TRACER.format_summary())
+        self.root.after(TRACE_FLUSH_INTERVAL_MS, self._flush_traces)
+        
+    def _reset_activity(self):
+        """Przywraca wskaźnik nasłuchiwania po animacji"""
+        self._activity_reset_id = None
+        if self.is_listening:
+            self.activity_label.config(text="🔴", foreground="red")
+            
+    def _write_messages(self, messages, clear=False):
+        """Wstawia wiadomości do obszaru dialogu w jednej operacji"""
+        # Czy użytkownik jest na końcu rozmowy (a nie czyta starszych wiadomości)
+        following = self.dialog_area.yview()[1] >= 1.0
         
         self.dialog_area.config(state=tk.NORMAL)
         
+        if clear:
+            self.dialog_area.delete(1.0, tk.END)
+            self.transcript_first = self.session_logger.message_count()
+            self.transcript_lines.clear()
+            self.transcript_line_count = 0
+        
+        for timestamp, sender, message in messages:
+            self.session_logger.log_message(sender, message)
+            self._insert_message(tk.END, timestamp, sender, message)
+            line_count = message.count("\n") + 1
+            self.transcript_lines.append(line_count)
+            self.transcript_line_count += line_count
+            
+        # Przytnij najstarsze wiadomości, ale nie w trakcie czytania historii
+        # (chyba że okno urosło do dwukrotności limitu)
+        limit = self.transcript_max_lines
+        if self.transcript_line_count > limit and (following or self.transcript_line_count > 2 * limit):
+            self._trim_transcript(limit - TRANSCRIPT_TRIM_BATCH)
+            
+        self.dialog_area.config(state=tk.DISABLED)
+        if following:
+            self.dialog_area.see(tk.END)  # Przewiń do końca
+            
+        self._update_load_older_button()
+        
+    def _insert_message(self, index, timestamp, sender, message):
+        """Wstawia jedną wiadomość w podanym miejscu obszaru dialogu"""
         # Dodaj timestamp
-        self.dialog_area.insert(tk.END, f"[{timestamp}] ", "timestamp")
+        self.dialog_area.insert(index, f"[{timestamp}] ", "timestamp")
         
-        # Dodaj nadawcę i wiadomość
+        # Dodaj nadawcę i wiadomość (przy wstawianiu w środek tekstu - zaraz za timestampem)
+        if index != tk.END:
+            index = f"{index} + {len(timestamp) + 3} chars"
         if sender == "Użytkownik":
-            self.dialog_area.insert(tk.END, f"{sender}: {message}\n", "user")
+            self.dialog_area.insert(index, f"{sender}: {message}\n", "user")
         elif sender == "System":
-            self.dialog_area.insert(tk.END, f"{sender}: {message}\n", "system")
+            self.dialog_area.insert(index, f"{sender}: {message}\n", "system")
         else:
-            self.dialog_area.insert(tk.END, f"{sender}: {message}\n")
+            self.dialog_area.insert(index, f"{sender}: {message}\n")
+            
+    def _trim_transcript(self, target_lines):
+        """Usuwa najstarsze wiadomości aż okno będzie miało najwyżej target_lines linii"""
+        removed_lines = 0
+        while self.transcript_lines and self.transcript_line_count - removed_lines > target_lines:
+            removed_lines += self.transcript_lines.popleft()
+            self.transcript_first += 1
+            
+        if removed_lines:
+            self.dialog_area.delete(1.0, f"{removed_lines + 1}.0")
+            self.transcript_line_count -= removed_lines
+            
+    def load_older_messages(self):
+        """Wczytuje z logu sesji wiadomości starsze niż widoczne w oknie"""
+        start = max(0, self.transcript_first - TRANSCRIPT_PAGE_SIZE)
+        older = self.session_logger.get_messages(start, self.transcript_first)
+        if not older:
+            return
             
-        self.dialog_area.config(state=tk.DISABLED)
-        self.dialog_area.see(tk.END)  # Przewiń do końca
-        
-    def clear_dialog(self):
-        """Czyści obszar dialogu"""
         self.dialog_area.config(state=tk.NORMAL)
-        self.dialog_area.delete(1.0, tk.END)
+        
+        # Wstawiamy od najnowszej do najstarszej, zawsze na początek
+        for entry in reversed(older):
+            timestamp = datetime.fromisoformat(entry['timestamp']).strftime("%H:%M:%S")
+            self._insert_message("1.0", timestamp, entry['sender'], entry['message'])
+            line_count = entry['message'].count("\n") + 1
+            self.transcript_lines.appendleft(line_count)
+            self.transcript_line_count += line_count
+            
         self.dialog_area.config(state=tk.DISABLED)
-        self.update_status("Historia wyczyszczona")
+        self.dialog_area.see("1.0")
         
-    def update_status(self, message):
-        """Aktualizuje pasek statusu"""
-        self.status_var.set(f"Status: {message}")
+        self.transcript_first = start
+        self._update_load_older_button()
+        
+    def _update_load_older_button(self):
+        """Włącza przycisk "Wczytaj starsze" tylko gdy jest co wczytać"""
+        state = tk.NORMAL if self.transcript_first > 0 else tk.DISABLED
+        self.load_older_button.config(state=state)
         
     def on_system_message(self, message):
         """Callback wywoływany gdy system generuje wiadomość"""
         self.add_message("System", message)
-        # Wypowiedz wiadomość
-        self.tts.speak(message)
+        # Wypowiedz wiadomość (jeśli syntezator już się załadował)
+        if self.tts:
+            self.tts.speak(message)
+        
+    def on_corrections(self, original, corrected, corrections):
+        """Callback z poprawkami rozpoznania mowy - zapis do logu sesji w wątku Tk"""
+        self.ui_queue.put(('corrections', (original, corrected, corrections)))
         
     def simulate_user_input(self, text):
         """Symuluje input użytkownika (do testów)"""
@@ -310,17 +669,16 @@ class MathTutorApp:
         text = self.test_entry.get()
         self.simulate_user_input(text)
 
-    def on_speech_result(self, text):
-        """Callback gdy rozpoznano pełną wypowiedź"""
+    def on_speech_result(self, text, alternatives=None):
+        """Callback gdy rozpoznano pełną wypowiedź (z hipotezami N-best)"""
         if text and self.is_listening:
             self.add_message("Użytkownik", text)
             # Przetwórz przez dialog manager
-            response = self.dialog_manager.process_user_input(text)
+            response = self.dialog_manager.process_user_input(text, alternatives)
             
     def on_speech_partial(self, text):
         """Callback dla częściowych wyników"""
         if text:
             self.update_status(f"Słyszę: {text}...")
             # Animuj wskaźnik
-            self.activity_label.config(text="🎤", foreground="green")
-            self.root.after(100, lambda: self.activity_label.config(text="🔴", foreground="red"))
\ No newline at end of file
+            self.set_activity("🎤", "green", reset_after=100)
\ No newline at end of file
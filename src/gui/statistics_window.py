@@ -4,11 +4,116 @@ Okno statystyk z wykresami
 
 import tkinter as tk
 from tkinter import ttk
-import json
-from datetime import datetime
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from matplotlib.figure import Figure
+import base64
+import io
+import queue
+import threading
+from typing import Dict, List, Tuple
+
+# Maksymalna liczba punktów na wykresie postępów (dłuższa historia jest uśredniana)
+MAX_TREND_POINTS = 100
+
+# Liczba odpowiedzi doładowywanych naraz do listy historii
+HISTORY_PAGE_SIZE = 100
+
+# Wyrenderowane wykresy: (uczeń, sygnatura statystyk, rozmiar) -> obraz PNG
+_chart_cache: Dict[tuple, bytes] = {}
+
+
+def stats_signature(all_stats: dict) -> tuple:
+    """Zwraca sygnaturę statystyk - zmienia się tylko po zapisaniu nowej sesji"""
+    return (
+        all_stats.get('total_sessions', 0),
+        all_stats.get('total_questions', 0),
+        all_stats.get('total_correct', 0),
+        len(all_stats.get('sessions', [])),
+    )
+
+
+def decimate(values: List[float], max_points: int = MAX_TREND_POINTS) -> Tuple[List[float], List[float]]:
+    """
+    Zmniejsza liczbę punktów serii uśredniając kolejne przedziały
+    
+    Returns:
+        Krotka (pozycje x, wartości) - pozycja to środek przedziału (numer sesji)
+    """
+    n = len(values)
+    if n <= max_points:
+        return [i + 1 for i in range(n)], list(values)
+        
+    xs, ys = [], []
+    for bucket in range(max_points):
+        start = bucket * n // max_points
+        end = (bucket + 1) * n // max_points
+        chunk = values[start:end]
+        xs.append((start + end + 1) / 2)
+        ys.append(sum(chunk) / len(chunk))
+    return xs, ys
+
+
+def aggregate_chart_data(all_stats: dict) -> dict:
+    """Przygotowuje dane do wykresów (wywoływane poza wątkiem Tk)"""
+    topics_data = all_stats.get('topics_performance', {})
+    topics = list(topics_data.keys())
+    correct_counts = [data['correct'] for data in topics_data.values()]
+    accuracies = [
+        data['correct'] / data['total'] * 100 if data['total'] > 0 else 0
+        for data in topics_data.values()
+    ]
+    
+    session_accuracies = [s.get('accuracy', 0) for s in all_stats.get('sessions', [])]
+    trend_x, trend_y = decimate(session_accuracies)
+    
+    return {
+        'topics': topics,
+        'correct_counts': correct_counts,
+        'accuracies': accuracies,
+        'trend_x': trend_x,
+        'trend_y': trend_y,
+        'sessions_total': len(session_accuracies),
+    }
+
+
+def render_charts(chart_data: dict, width: int, height: int, dpi: int = 80) -> bytes:
+    """Rysuje wykresy do obrazu PNG (bez pyplot, można wywołać z dowolnego wątku)"""
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    
+    fig = Figure(figsize=(width / dpi, height / dpi), dpi=dpi)
+    FigureCanvasAgg(fig)
+    
+    # Wykres kołowy - tematy
+    ax1 = fig.add_subplot(221)
+    if chart_data['topics'] and sum(chart_data['correct_counts']) > 0:
+        ax1.pie(chart_data['correct_counts'], labels=chart_data['topics'], autopct='%1.1f%%')
+        ax1.set_title('Rozkład poprawnych odpowiedzi')
+        
+    # Wykres słupkowy - skuteczność w tematach
+    ax2 = fig.add_subplot(222)
+    if chart_data['topics']:
+        ax2.bar(chart_data['topics'], chart_data['accuracies'])
+        ax2.set_title('Skuteczność w poszczególnych tematach (%)')
+        ax2.set_ylim(0, 100)
+        
+    # Wykres liniowy - postępy w czasie
+    ax3 = fig.add_subplot(212)
+    if chart_data['trend_y']:
+        marker = 'o' if len(chart_data['trend_y']) <= 30 else None
+        ax3.plot(chart_data['trend_x'], chart_data['trend_y'], marker=marker)
+        title = 'Postępy w kolejnych sesjach'
+        if chart_data['sessions_total'] > len(chart_data['trend_y']):
+            title += f" (uśrednione, {chart_data['sessions_total']} sesji)"
+        ax3.set_title(title)
+        ax3.set_xlabel('Numer sesji')
+        ax3.set_ylabel('Skuteczność (%)')
+        ax3.set_ylim(0, 100)
+        ax3.grid(True, alpha=0.3)
+        
+    fig.tight_layout()
+    
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png')
+    return buffer.getvalue()
 
 
 class StatisticsWindow:
@@ -18,6 +123,19 @@ class StatisticsWindow:
         self.window.geometry("800x600")
         self.stats_manager = stats_manager
         
+        # Stan wykresów - rysowane dopiero po otwarciu zakładki "Wykresy"
+        self.charts_requested = False
+        self.chart_queue = queue.Queue()
+        self.chart_image = None
+        self.chart_label = None
+        
+        # Stan historii - lista wypełniana stronami przy przewijaniu
+        self.history_ready = False
+        self.history_filter = {}
+        self.history_loaded = 0
+        self.history_total = 0
+        self.history_pending = False
+        
         self.setup_ui()
         self.load_statistics()
         
@@ -39,6 +157,8 @@ class StatisticsWindow:
         self.history_frame = ttk.Frame(self.notebook)
         self.notebook.add(self.history_frame, text="Historia")
         
+        self.notebook.bind('<<NotebookTabChanged>>', self.on_tab_changed)
+        
     def load_statistics(self):
         """Ładuje i wyświetla statystyki"""
         # Podsumowanie
@@ -51,52 +171,191 @@ class StatisticsWindow:
         summary_text.insert('1.0', summary + "\n\n**Rekomendacje:**\n" + recommendations)
         summary_text.config(state='disabled')
         
-        # Wykresy
-        self.create_charts()
+    def on_tab_changed(self, event=None):
+        """Przygotowuje zawartość zakładki przy jej pierwszym otwarciu"""
+        selected = self.notebook.select()
+        if selected == str(self.charts_frame) and not self.charts_requested:
+            self.create_charts()
+        elif selected == str(self.history_frame) and not self.history_ready:
+            self.create_history()
+            
+    def show_history_tab(self):
+        """Przełącza okno na zakładkę historii"""
+        self.notebook.select(self.history_frame)
+        if not self.history_ready:
+            self.create_history()
+            
+    def create_history(self):
+        """Tworzy listę historii odpowiedzi z filtrami"""
+        self.history_ready = True
+        index = self.stats_manager.get_answer_index()
+        
+        # Filtry
+        filter_frame = ttk.Frame(self.history_frame)
+        filter_frame.pack(fill='x', padx=10, pady=(10, 5))
+        
+        ttk.Label(filter_frame, text="Temat:").pack(side='left')
+        self.topic_filter = tk.StringVar(value="Wszystkie")
+        ttk.Combobox(
+            filter_frame,
+            textvariable=self.topic_filter,
+            values=["Wszystkie"] + index.topics(),
+            state="readonly",
+            width=15
+        ).pack(side='left', padx=5)
+        
+        ttk.Label(filter_frame, text="Od (RRRR-MM-DD):").pack(side='left', padx=(10, 0))
+        self.date_from_entry = ttk.Entry(filter_frame, width=12)
+        self.date_from_entry.pack(side='left', padx=5)
+        
+        ttk.Label(filter_frame, text="Do:").pack(side='left')
+        self.date_to_entry = ttk.Entry(filter_frame, width=12)
+        self.date_to_entry.pack(side='left', padx=5)
+        
+        ttk.Button(filter_frame, text="Filtruj", command=self.apply_history_filter).pack(side='left', padx=5)
+        
+        self.history_count_var = tk.StringVar()
+        ttk.Label(filter_frame, textvariable=self.history_count_var).pack(side='right')
+        
+        # Lista odpowiedzi
+        tree_frame = ttk.Frame(self.history_frame)
+        tree_frame.pack(fill='both', expand=True, padx=10, pady=(0, 10))
+        
+        columns = ('date', 'session', 'topic', 'question', 'answer', 'result', 'time')
+        self.history_tree = ttk.Treeview(tree_frame, columns=columns, show='headings')
+        headings = {
+            'date': ("Data", 130),
+            'session': ("Sesja", 50),
+            'topic': ("Temat", 90),
+            'question': ("Zadanie", 250),
+            'answer': ("Odpowiedź", 90),
+            'result': ("Wynik", 50),
+            'time': ("Czas", 60),
+        }
+        for column, (title, width) in headings.items():
+            self.history_tree.heading(column, text=title)
+            self.history_tree.column(column, width=width, stretch=(column == 'question'))
+            
+        scrollbar = ttk.Scrollbar(tree_frame, orient='vertical', command=self.history_tree.yview)
+        self.history_tree.configure(yscrollcommand=lambda first, last: self._on_history_scroll(scrollbar, first, last))
+        
+        self.history_tree.pack(side='left', fill='both', expand=True)
+        scrollbar.pack(side='right', fill='y')
+        
+        self.apply_history_filter()
+        
+    def apply_history_filter(self):
+        """Ustawia filtr historii i ładuje pierwszą stronę wyników"""
+        topic = self.topic_filter.get()
+        self.history_filter = {
+            'topic': None if topic == "Wszystkie" else topic,
+            'date_from': self.date_from_entry.get().strip() or None,
+            'date_to': self.date_to_entry.get().strip() or None,
+        }
+        
+        self.history_tree.delete(*self.history_tree.get_children())
+        self.history_loaded = 0
+        self.history_total = self.stats_manager.get_answer_index().count(**self.history_filter)
+        self.load_history_page()
+        
+    def load_history_page(self):
+        """Doładowuje kolejną stronę odpowiedzi do listy"""
+        self.history_pending = False
+        if self.history_loaded >= self.history_total:
+            return
+            
+        records = self.stats_manager.get_answer_index().query(
+            offset=self.history_loaded,
+            limit=HISTORY_PAGE_SIZE,
+            **self.history_filter
+        )
+        
+        for session_number, answer in records:
+            self.history_tree.insert('', 'end', values=(
+                answer.get('timestamp', '')[:19].replace('T', ' '),
+                session_number,
+                answer.get('topic', ''),
+                answer.get('question', ''),
+                answer.get('answer', ''),
+                "✅" if answer.get('correct') else "❌",
+                f"{answer.get('time_seconds', 0):.1f} s"
+            ))
+            
+        self.history_loaded += len(records)
+        self.history_count_var.set(f"Wyświetlono {self.history_loaded} z {self.history_total}")
+        
+    def _on_history_scroll(self, scrollbar, first, last):
+        """Aktualizuje pasek przewijania i doładowuje dane przy końcu listy"""
+        scrollbar.set(first, last)
+        if float(last) > 0.95 and self.history_loaded < self.history_total and not self.history_pending:
+            # after_idle - nie modyfikujemy listy w trakcie jej przewijania
+            self.history_pending = True
+            self.window.after_idle(self.load_history_page)
         
     def create_charts(self):
-        """Tworzy wykresy postępów"""
-        fig = Figure(figsize=(10, 8))
-        
-        # Wykres kołowy - tematy
-        ax1 = fig.add_subplot(221)
-        topics_data = self.stats_manager.all_stats['topics_performance']
-        if topics_data:
-            topics = list(topics_data.keys())
-            correct_counts = [data['correct'] for data in topics_data.values()]
+        """Tworzy wykresy postępów w tle (lub pokazuje obraz z cache)"""
+        self.charts_requested = True
+        
+        self.window.update_idletasks()
+        width = max(self.charts_frame.winfo_width(), 400)
+        height = max(self.charts_frame.winfo_height(), 300)
             
-            ax1.pie(correct_counts, labels=topics, autopct='%1.1f%%')
-            ax1.set_title('Rozkład poprawnych odpowiedzi')
+        all_stats = self.stats_manager.all_stats
+        cache_key = (all_stats.get('student'), stats_signature(all_stats), width, height)
             
-        # Wykres słupkowy - skuteczność w tematach
-        ax2 = fig.add_subplot(222)
-        if topics_data:
-            accuracies = []
-            for topic, data in topics_data.items():
-                if data['total'] > 0:
-                    accuracies.append(data['correct'] / data['total'] * 100)
-                else:
-                    accuracies.append(0)
+        if cache_key in _chart_cache:
+            self.show_chart_image(_chart_cache[cache_key])
+            return
                     
-            ax2.bar(topics, accuracies)
-            ax2.set_title('Skuteczność w poszczególnych tematach (%)')
-            ax2.set_ylim(0, 100)
+        self.chart_label = ttk.Label(self.charts_frame, text="⏳ Przygotowywanie wykresów...")
+        self.chart_label.pack(fill='both', expand=True)
+            
+        # Kopie kontenerów, które zapis statystyk zmienia w trakcie rysowania (słownik tematów
+        # i ich liczniki, lista sesji) - wątek tylko czyta, więc głęboka kopia nie jest potrzebna
+        snapshot = {
+            'topics_performance': {topic: dict(counts)
+                                   for topic, counts in all_stats.get('topics_performance', {}).items()},
+            'sessions': list(all_stats.get('sessions', [])),
+        }
+            
+        thread = threading.Thread(
+            target=self._render_worker,
+            args=(snapshot, cache_key, width, height),
+            daemon=True
+        )
+        thread.start()
+        self.window.after(50, self._poll_charts)
+            
+    def _render_worker(self, all_stats, cache_key, width, height):
+        """Wątek agregujący dane i rysujący wykresy"""
+        try:
+            png = render_charts(aggregate_chart_data(all_stats), width, height)
+            _chart_cache[cache_key] = png
+            self.chart_queue.put(png)
+        except Exception as e:
+            self.chart_queue.put(e)
+            
+    def _poll_charts(self):
+        """Sprawdza (w wątku Tk) czy wykresy są gotowe"""
+        try:
+            result = self.chart_queue.get_nowait()
+        except queue.Empty:
+            if self.window.winfo_exists():
+                self.window.after(50, self._poll_charts)
+            return
             
-        # Wykres liniowy - postępy w czasie
-        ax3 = fig.add_subplot(212)
-        sessions = self.stats_manager.all_stats['sessions'][-10:]  # Ostatnie 10 sesji
-        if sessions:
-            session_nums = range(1, len(sessions) + 1)
-            accuracies = [s.get('accuracy', 0) for s in sessions]
+        if not self.window.winfo_exists():
+            return
             
-            ax3.plot(session_nums, accuracies, marker='o')
-            ax3.set_title('Postępy w ostatnich sesjach')
-            ax3.set_xlabel('Numer sesji')
-            ax3.set_ylabel('Skuteczność (%)')
-            ax3.set_ylim(0, 100)
-            ax3.grid(True, alpha=0.3)
+        if isinstance(result, Exception):
+            self.chart_label.config(text=f"❌ Nie udało się narysować wykresów: {result}")
+        else:
+            self.show_chart_image(result)
             
-        # Dodaj do GUI
-        canvas = FigureCanvasTkAgg(fig, master=self.charts_frame)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill='both', expand=True)
\ No newline at end of file
+    def show_chart_image(self, png: bytes):
+        """Wyświetla gotowy obraz wykresów"""
+        self.chart_image = tk.PhotoImage(data=base64.b64encode(png))
+        if self.chart_label is None:
+            self.chart_label = ttk.Label(self.charts_frame)
+            self.chart_label.pack(fill='both', expand=True)
+        self.chart_label.config(image=self.chart_image, text="")
\ No newline at end of file
@@ -0,0 +1,243 @@
+"""
+Interfejsy backendów mowy i ich domyślne implementacje
+
+SpeechRecognizer i TextToSpeech korzystają z trzech wymiennych elementów:
+- AudioSource - źródło dźwięku (mikrofon, plik WAV...),
+- RecognitionBackend - rozpoznawanie mowy (VOSK, skrypt...),
+- SynthesisBackend - synteza mowy (pyttsx3, nagrywanie czasów...).
+
+Biblioteki (sounddevice, vosk, pyttsx3) są importowane dopiero przy
+tworzeniu konkretnego backendu. Interfejsy są klasami abstrakcyjnymi -
+backend bez którejś z wymaganych metod zgłasza TypeError już przy tworzeniu,
+a nie dopiero w wątku audio.
+"""
+
+import json
+import logging
+import math
+from abc import ABC, abstractmethod
+from typing import Callable, List, NamedTuple
+
+logger = logging.getLogger(__name__)
+
+
+class Hypothesis(NamedTuple):
+    """Jedna hipoteza rozpoznania wypowiedzi"""
+    text: str
+    confidence: float = 1.0
+
+
+class AudioSource(ABC):
+    """Źródło dźwięku - przekazuje bloki PCM 16-bit do callbacku"""
+
+    sample_rate = 16000
+    channels = 1
+
+    @abstractmethod
+    def start(self, callback: Callable[[bytes], None]):
+        """Rozpoczyna przekazywanie bloków audio do callbacku"""
+
+    @abstractmethod
+    def stop(self):
+        """Zatrzymuje źródło dźwięku"""
+
+
+class RecognitionBackend(ABC):
+    """Silnik rozpoznawania mowy (interfejs wzorowany na KaldiRecognizer)"""
+
+    @abstractmethod
+    def accept_waveform(self, data: bytes) -> bool:
+        """Przyjmuje blok audio; zwraca True gdy wypowiedź została zakończona"""
+
+    @abstractmethod
+    def result(self) -> str:
+        """Zwraca tekst zakończonej wypowiedzi"""
+        
+    def results(self) -> List[Hypothesis]:
+        """
+        Zwraca hipotezy zakończonej wypowiedzi (N-best), najlepsza pierwsza
+        
+        Domyślnie jedna hipoteza z tekstem z `result()`. Wywoływać zamiast
+        `result()`, nie obok - obie metody odbierają ten sam wynik.
+        """
+        text = self.result()
+        return [Hypothesis(text)] if text else []
+
+    @abstractmethod
+    def partial_result(self) -> str:
+        """Zwraca częściowy wynik bieżącej wypowiedzi"""
+
+    @abstractmethod
+    def final_result(self) -> str:
+        """Kończy bieżącą wypowiedź i zwraca jej tekst"""
+
+
+class SynthesisBackend(ABC):
+    """Silnik syntezy mowy"""
+
+    @abstractmethod
+    def say(self, text: str):
+        """Wypowiada tekst (blokuje do końca wypowiedzi)"""
+
+    def stop(self):
+        """Przerywa bieżącą wypowiedź"""
+
+    def set_property(self, name: str, value):
+        """Ustawia parametr silnika (rate, volume, voice)"""
+
+    def get_voices(self) -> List:
+        """Zwraca listę dostępnych głosów"""
+        return []
+
+
+class SoundDeviceAudioSource(AudioSource):
+    """Mikrofon przez sounddevice"""
+
+    def __init__(self, sample_rate: int = 16000, channels: int = 1, blocksize: int = 8000):
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.blocksize = blocksize
+        self.stream = None
+
+    def start(self, callback: Callable[[bytes], None]):
+        import sounddevice as sd
+
+        def _callback(indata, frames, time, status):
+            if status:
+                logger.warning("Status audio: %s", status)
+            callback(bytes(indata))
+
+        self.stream = sd.RawInputStream(
+            samplerate=self.sample_rate,
+            channels=self.channels,
+            dtype='int16',
+            callback=_callback,
+            blocksize=self.blocksize
+        )
+        self.stream.start()
+
+    def stop(self):
+        if self.stream is not None:
+            self.stream.stop()
+            self.stream.close()
+            self.stream = None
+
+
+def parse_vosk_result(result: dict) -> List[Hypothesis]:
+    """
+    Zamienia wynik KaldiRecognizer na listę hipotez z pewnością w [0, 1]
+    
+    - z SetMaxAlternatives: {"alternatives": [{"text", "confidence"}, ...]},
+      gdzie confidence to wynik kraty (log) - normalizowany softmaksem,
+    - z SetWords: {"text", "result": [{"word", "conf"}, ...]} - średnia pewność słów,
+    - bez opcji: {"text"} - pewność 1.0.
+    """
+    alternatives = result.get('alternatives')
+    if alternatives is not None:
+        scored = [(alt.get('text', '').strip(), float(alt.get('confidence', 0.0))) for alt in alternatives]
+        scored = [(text, score) for text, score in scored if text]
+        if not scored:
+            return []
+        best = max(score for _, score in scored)
+        weights = [math.exp(score - best) for _, score in scored]
+        total = sum(weights)
+        hypotheses = [Hypothesis(text, weight / total) for (text, _), weight in zip(scored, weights)]
+        return sorted(hypotheses, key=lambda hypothesis: -hypothesis.confidence)
+        
+    text = result.get('text', '').strip()
+    if not text:
+        return []
+    words = result.get('result')
+    if words:
+        return [Hypothesis(text, sum(word.get('conf', 1.0) for word in words) / len(words))]
+    return [Hypothesis(text)]
+
+
+class VoskRecognitionBackend(RecognitionBackend):
+    """Rozpoznawanie mowy modelem VOSK"""
+
+    def __init__(self, model_path: str, sample_rate: int = 16000, max_alternatives: int = 0,
+                 words: bool = False, model=None):
+        """
+        Args:
+            model_path: Katalog modelu VOSK
+            sample_rate: Częstotliwość próbkowania
+            max_alternatives: Liczba hipotez N-best (0 - tylko najlepsza)
+            words: Czy zwracać pewność poszczególnych słów
+            model: Już wczytany vosk.Model (np. współdzielony przez procesy robocze) -
+                   wtedy model_path nie jest wczytywany
+        """
+        import vosk
+
+        if model is None:
+            logger.info("Ładowanie modelu VOSK z: %s", model_path)
+            model = vosk.Model(model_path)
+        self.model = model
+        self.recognizer = vosk.KaldiRecognizer(self.model, sample_rate)
+        if max_alternatives:
+            self.recognizer.SetMaxAlternatives(max_alternatives)
+        if words:
+            self.recognizer.SetWords(True)
+        logger.info("Model VOSK załadowany pomyślnie")
+
+    def accept_waveform(self, data: bytes) -> bool:
+        return self.recognizer.AcceptWaveform(data)
+
+    def result(self) -> str:
+        hypotheses = self.results()
+        return hypotheses[0].text if hypotheses else ""
+        
+    def results(self) -> List[Hypothesis]:
+        return parse_vosk_result(json.loads(self.recognizer.Result()))
+
+    def partial_result(self) -> str:
+        return json.loads(self.recognizer.PartialResult()).get('partial', '').strip()
+
+    def final_result(self) -> str:
+        hypotheses = parse_vosk_result(json.loads(self.recognizer.FinalResult()))
+        return hypotheses[0].text if hypotheses else ""
+
+
+class Pyttsx3SynthesisBackend(SynthesisBackend):
+    """Synteza mowy przez pyttsx3 (z wyborem polskiego głosu)"""
+
+    def __init__(self):
+        import pyttsx3
+
+        self.engine = pyttsx3.init()
+
+        # Konfiguracja głosu
+        voices = self.engine.getProperty('voices')
+
+        # Wybierz polski głos jeśli dostępny
+        polish_voice = None
+        for voice in voices:
+            if 'polish' in voice.name.lower() or 'pl' in voice.id.lower():
+                polish_voice = voice
+                break
+
+        if polish_voice:
+            self.engine.setProperty('voice', polish_voice.id)
+            logger.info("Używam polskiego głosu: %s", polish_voice.name)
+        else:
+            # Użyj pierwszego dostępnego głosu
+            if voices:
+                self.engine.setProperty('voice', voices[0].id)
+            logger.warning("Nie znaleziono polskiego głosu, używam domyślnego")
+
+        # Ustaw parametry mowy
+        self.engine.setProperty('rate', 150)    # Szybkość mowy
+        self.engine.setProperty('volume', 0.9)  # Głośność (0.0 - 1.0)
+
+    def say(self, text: str):
+        self.engine.say(text)
+        self.engine.runAndWait()
+
+    def stop(self):
+        self.engine.stop()
+
+    def set_property(self, name: str, value):
+        self.engine.setProperty(name, value)
+
+    def get_voices(self) -> List:
+        return self.engine.getProperty('voices')
\ No newline at end of file
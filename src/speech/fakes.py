@@ -0,0 +1,232 @@
+"""
+Zastępcze backendy mowy do testów obciążeniowych bez urządzeń audio
+
+- WavFileAudioSource - odtwarza pliki WAV w czasie rzeczywistym lub przyspieszonym,
+- SilentAudioSource - generuje ciszę w zadanym tempie,
+- ScriptedRecognitionBackend - "rozpoznaje" kolejne teksty ze skryptu,
+- RecordingSynthesisBackend - zamiast mówić zapisuje szacowany czas wypowiedzi.
+"""
+
+import threading
+import time
+import wave
+from abc import abstractmethod
+from typing import Callable, List, Optional, Sequence, Tuple, Union
+
+from speech.backends import AudioSource, Hypothesis, RecognitionBackend, SynthesisBackend
+
+# Bajty na próbkę (PCM 16-bit)
+SAMPLE_WIDTH = 2
+
+# Co ile sekund źródło wstrzymane warunkiem wait_while sprawdza go ponownie
+WAIT_POLL_SECONDS = 0.002
+
+
+class _PacedAudioSource(AudioSource):
+    """Wspólna część źródeł odtwarzających bloki audio w zadanym tempie"""
+
+    def __init__(self, sample_rate: int = 16000, block_frames: int = 8000, speed: float = 1.0,
+                 stop_when: Optional[Callable[[], bool]] = None,
+                 wait_while: Optional[Callable[[], bool]] = None):
+        """
+        Args:
+            sample_rate: Częstotliwość próbkowania
+            block_frames: Liczba próbek w bloku (jak blocksize w sounddevice)
+            speed: 1.0 - czas rzeczywisty, 10.0 - dziesięć razy szybciej, 0 - bez czekania
+            stop_when: Opcjonalny warunek końca strumienia, sprawdzany przed każdym blokiem
+                       (np. wyczerpany skrypt rozpoznawania - przy speed=0 źródło bez końca
+                       zalewałoby rozpoznawanie blokami)
+            wait_while: Opcjonalny warunek wstrzymania przed wysłaniem bloku (np. pełna
+                        kolejka odbiorcy) - przy speed=0 tempo wyznacza wtedy odbiorca
+        """
+        self.sample_rate = sample_rate
+        self.block_frames = block_frames
+        self.speed = speed
+        self.stop_when = stop_when
+        self.wait_while = wait_while
+        self.running = False
+        self.thread = None
+        self.finished = threading.Event()
+
+    @abstractmethod
+    def _blocks(self):
+        """Generator kolejnych bloków audio"""
+
+    def start(self, callback: Callable[[bytes], None]):
+        self.running = True
+        self.finished.clear()
+        self.thread = threading.Thread(target=self._run, args=(callback,), daemon=True)
+        self.thread.start()
+
+    def _run(self, callback):
+        block_seconds = self.block_frames / self.sample_rate
+        next_time = time.monotonic()
+        for block in self._blocks():
+            if not self.running or (self.stop_when and self.stop_when()):
+                break
+            if self.speed > 0:
+                next_time += block_seconds / self.speed
+                delay = next_time - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+            if self.wait_while:
+                while self.running and self.wait_while():
+                    time.sleep(WAIT_POLL_SECONDS)
+            callback(block)
+        self.finished.set()
+
+    def stop(self):
+        self.running = False
+        if self.thread and self.thread is not threading.current_thread():
+            self.thread.join(timeout=2)
+
+
+class WavFileAudioSource(_PacedAudioSource):
+    """Odtwarza pliki WAV (mono, 16-bit) jako strumień z mikrofonu"""
+
+    def __init__(self, paths: Sequence[str], speed: float = 1.0, block_frames: int = 8000,
+                 loop: bool = False, stop_when: Optional[Callable[[], bool]] = None,
+                 wait_while: Optional[Callable[[], bool]] = None):
+        with wave.open(paths[0], 'rb') as wav:
+            sample_rate = wav.getframerate()
+        super().__init__(sample_rate, block_frames, speed, stop_when, wait_while)
+        self.paths = list(paths)
+        self.loop = loop
+
+    def _blocks(self):
+        while True:
+            for path in self.paths:
+                with wave.open(path, 'rb') as wav:
+                    if wav.getnchannels() != 1 or wav.getsampwidth() != SAMPLE_WIDTH:
+                        raise ValueError(f"Plik {path} musi być mono, 16-bit PCM")
+                    while True:
+                        block = wav.readframes(self.block_frames)
+                        if not block:
+                            break
+                        yield block
+            if not self.loop:
+                return
+
+
+class SilentAudioSource(_PacedAudioSource):
+    """Generuje ciszę (np. dla skryptowego rozpoznawania, które ignoruje treść audio)"""
+
+    def __init__(self, seconds: Optional[float] = None, sample_rate: int = 16000,
+                 block_frames: int = 8000, speed: float = 1.0,
+                 stop_when: Optional[Callable[[], bool]] = None,
+                 wait_while: Optional[Callable[[], bool]] = None):
+        super().__init__(sample_rate, block_frames, speed, stop_when, wait_while)
+        self.seconds = seconds
+
+    def _blocks(self):
+        block = bytes(self.block_frames * SAMPLE_WIDTH)
+        remaining = None if self.seconds is None else int(self.seconds * self.sample_rate / self.block_frames)
+        while remaining is None or remaining > 0:
+            yield block
+            if remaining is not None:
+                remaining -= 1
+
+
+class ScriptedRecognitionBackend(RecognitionBackend):
+    """
+    Rozpoznawanie "ze skryptu" - każda wypowiedź kończy się po zadanej długości audio
+
+    Skrypt to lista tekstów, par (tekst, długość wypowiedzi w sekundach)
+    lub trójek (tekst, długość, [(hipoteza, pewność), ...]) - wtedy
+    `results()` zwraca tekst z pewnością 1 - suma pewności pozostałych
+    i dalsze hipotezy N-best. Po wyczerpaniu skryptu backend nie zwraca
+    już żadnych wyników.
+    """
+
+    def __init__(self, script: Sequence[Union[str, tuple]], sample_rate: int = 16000,
+                 default_seconds: float = 1.5):
+        self.script = [
+            (item, default_seconds) if isinstance(item, str) else (item[0], item[1])
+            for item in script
+        ]
+        self.alternatives = [
+            [] if isinstance(item, str) or len(item) < 3 else [Hypothesis(*alt) for alt in item[2]]
+            for item in script
+        ]
+        self.bytes_per_second = sample_rate * SAMPLE_WIDTH
+        self.position = 0
+        self.received = 0
+        self.last_text = ""
+
+    @property
+    def exhausted(self) -> bool:
+        """Czy wszystkie wypowiedzi ze skryptu zostały już "rozpoznane" """
+        return self.position >= len(self.script)
+
+    def accept_waveform(self, data: bytes) -> bool:
+        if self.exhausted:
+            return False
+        self.received += len(data)
+        text, seconds = self.script[self.position]
+        if self.received >= seconds * self.bytes_per_second:
+            self.last_text = text
+            self.position += 1
+            self.received = 0
+            return True
+        return False
+
+    def result(self) -> str:
+        return self.last_text
+        
+    def results(self) -> List[Hypothesis]:
+        if not self.last_text:
+            return []
+        alternatives = self.alternatives[self.position - 1]
+        best = Hypothesis(self.last_text, 1.0 - sum(alt.confidence for alt in alternatives))
+        return [best] + alternatives
+
+    def partial_result(self) -> str:
+        if self.exhausted:
+            return ""
+        text, seconds = self.script[self.position]
+        words = text.split()
+        heard = int(len(words) * min(1.0, self.received / (seconds * self.bytes_per_second)))
+        return " ".join(words[:heard])
+
+    def final_result(self) -> str:
+        if self.exhausted or self.received == 0:
+            return ""
+        self.received = 0
+        self.last_text = self.script[self.position][0]
+        self.position += 1
+        return self.last_text
+
+
+class RecordingSynthesisBackend(SynthesisBackend):
+    """Synteza, która tylko zapisuje teksty i szacowany czas ich wypowiedzenia"""
+
+    def __init__(self, words_per_minute: int = 150, speed: float = 0):
+        """
+        Args:
+            words_per_minute: Tempo mowy użyte do oszacowania czasu wypowiedzi
+            speed: 0 - nie czekaj, 1.0 - czekaj tyle ile trwałaby mowa, 10.0 - 10x krócej
+        """
+        self.words_per_minute = words_per_minute
+        self.speed = speed
+        self.spoken: List[Tuple[str, float]] = []
+        self.lock = threading.Lock()
+
+    def estimate_duration(self, text: str) -> float:
+        """Szacuje czas wypowiedzi w sekundach"""
+        return len(text.split()) / self.words_per_minute * 60
+
+    def say(self, text: str):
+        duration = self.estimate_duration(text)
+        with self.lock:
+            self.spoken.append((text, duration))
+        if self.speed > 0:
+            time.sleep(duration / self.speed)
+
+    def set_property(self, name: str, value):
+        if name == 'rate':
+            self.words_per_minute = value
+
+    def total_duration(self) -> float:
+        """Łączny szacowany czas wszystkich wypowiedzi"""
+        with self.lock:
+            return sum(duration for _, duration in self.spoken)
\ No newline at end of file
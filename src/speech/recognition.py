@@ -2,63 +2,94 @@
 Moduł rozpoznawania mowy używający VOSK
 """
 
-import json
 import queue
-import sounddevice as sd
-import vosk
 import logging
 import threading
 import os
-from typing import Callable, Optional
+import time
+import weakref
+from typing import Callable, List, Optional
+
+from speech.backends import (AudioSource, Hypothesis, RecognitionBackend, SoundDeviceAudioSource,
+                             VoskRecognitionBackend)
+from utils.metrics import METRICS
+from utils.profiling import PROFILER
+from utils.tracing import TRACER
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Maksymalna liczba bloków audio czekających na rozpoznawanie (~20 s przy blokach 0.5 s);
+# gdy rozpoznawanie nie nadąża, nowe bloki są porzucane zamiast rosnąć bez końca
+AUDIO_QUEUE_MAX_BLOCKS = 40
+
+# Wszystkie instancje - do metryki głębokości kolejek audio
+_instances = weakref.WeakSet()
+METRICS.register_gauge(
+    'tutor_audio_queue_depth',
+    lambda: sum(instance.audio_queue.qsize() for instance in list(_instances))
+)
+
 
 class SpeechRecognizer:
-    def __init__(self, on_result: Callable[[str], None], on_partial: Optional[Callable[[str], None]] = None):
+    def __init__(self, on_result: Callable[[str, List[Hypothesis]], None],
+                 on_partial: Optional[Callable[[str], None]] = None,
+                 backend: Optional[RecognitionBackend] = None, audio_source: Optional[AudioSource] = None,
+                 max_alternatives: int = 0, word_confidence: bool = False):
         """
         Inicjalizacja rozpoznawania mowy
         
         Args:
-            on_result: Callback wywoływany gdy rozpoznano pełną wypowiedź
+            on_result: Callback (tekst, hipotezy N-best) wywoływany gdy rozpoznano pełną wypowiedź;
+                       pierwsza hipoteza to tekst, bez N-best lista ma jeden element
             on_partial: Opcjonalny callback dla częściowych wyników
+            backend: Silnik rozpoznawania (domyślnie VOSK z assets/models/vosk-model-pl)
+            audio_source: Źródło dźwięku (domyślnie mikrofon przez sounddevice)
+            max_alternatives: Liczba hipotez N-best domyślnego backendu VOSK (0 - tylko najlepsza)
+            word_confidence: Pewność hipotezy z pewności słów (VOSK SetWords, bez N-best)
         """
         self.on_result = on_result
         self.on_partial = on_partial
         self.is_listening = False
-        self.audio_queue = queue.Queue()
+        self.audio_queue = queue.Queue(maxsize=AUDIO_QUEUE_MAX_BLOCKS)
+        self.dropped_frames = 0
+        _instances.add(self)
         
         # Parametry audio
         self.sample_rate = 16000
         self.channels = 1
         
-        # Ścieżka do modelu
-        model_path = os.path.join("assets", "models", "vosk-model-pl")
+        self.audio_source = audio_source or SoundDeviceAudioSource(self.sample_rate, self.channels)
         
-        # Inicjalizacja modelu VOSK
-        try:
-            if not os.path.exists(model_path):
-                raise FileNotFoundError(f"Model VOSK nie znaleziony w: {model_path}")
+        if backend is None:
+            # Ścieżka do modelu
+            model_path = os.path.join("assets", "models", "vosk-model-pl")
                 
-            logger.info(f"Ładowanie modelu VOSK z: {model_path}")
-            self.model = vosk.Model(model_path)
-            self.recognizer = vosk.KaldiRecognizer(self.model, self.sample_rate)
-            logger.info("Model VOSK załadowany pomyślnie")
+            # Inicjalizacja modelu VOSK
+            try:
+                if not os.path.exists(model_path):
+                    raise FileNotFoundError(f"Model VOSK nie znaleziony w: {model_path}")
+                backend = VoskRecognitionBackend(model_path, self.sample_rate,
+                                                 max_alternatives=max_alternatives,
+                                                 words=word_confidence)
             
-        except Exception as e:
-            logger.error(f"Błąd podczas ładowania modelu VOSK: {e}")
-            self.model = None
-            self.recognizer = None
+            except Exception as e:
+                logger.error("Błąd podczas ładowania modelu VOSK: %s", e)
+                backend = None
+                
+        self.recognizer = backend
             
         # Wątek przetwarzania
         self.processing_thread = None
         
-    def _audio_callback(self, indata, frames, time, status):
+    def _audio_callback(self, data: bytes):
         """Callback dla strumienia audio"""
-        if status:
-            logger.warning(f"Status audio: {status}")
-        self.audio_queue.put(bytes(indata))
+        # Moment odebrania bloku - koniec wypowiedzi dla śledzenia tur
+        received_at = time.monotonic() if TRACER.enabled else None
+        try:
+            self.audio_queue.put_nowait((data, received_at))
+        except queue.Full:
+            self.dropped_frames += 1
+            METRICS.inc('tutor_audio_dropped_frames_total')
         
     def _process_audio(self):
         """Wątek przetwarzający audio"""
@@ -66,35 +97,43 @@ class SpeechRecognizer:
         
         while self.is_listening:
             try:
+                PROFILER.checkpoint()
                 # Pobierz dane audio z kolejki
-                data = self.audio_queue.get(timeout=0.5)
+                data, received_at = self.audio_queue.get(timeout=0.5)
                 
-                if self.recognizer.AcceptWaveform(data):
-                    # Pełny wynik
-                    result = json.loads(self.recognizer.Result())
-                    text = result.get('text', '').strip()
+                with PROFILER.timer('accept_waveform'):
+                    finished = self.recognizer.accept_waveform(data)
                     
-                    if text:
-                        logger.info(f"Rozpoznano: {text}")
-                        self.on_result(text)
+                if finished:
+                    # Pełny wynik (z hipotezami N-best, jeśli backend je zwraca)
+                    hypotheses = self.recognizer.results()
+                    
+                    if hypotheses:
+                        text = hypotheses[0].text
+                        if TRACER.enabled:
+                            TRACER.start_turn(audio_end=received_at)
+                            TRACER.stamp('recognition_final')
+                        logger.info("Rozpoznano: %s", text)
+                        if len(hypotheses) > 1:
+                            logger.debug("Hipotezy: %s", hypotheses)
+                        self.on_result(text, hypotheses)
                 else:
                     # Częściowy wynik
                     if self.on_partial:
-                        partial = json.loads(self.recognizer.PartialResult())
-                        partial_text = partial.get('partial', '').strip()
+                        partial_text = self.recognizer.partial_result()
                         if partial_text:
                             self.on_partial(partial_text)
                             
             except queue.Empty:
                 continue
             except Exception as e:
-                logger.error(f"Błąd podczas przetwarzania audio: {e}")
+                logger.error("Błąd podczas przetwarzania audio: %s", e)
                 
         logger.info("Zakończono przetwarzanie audio")
         
     def start_listening(self):
         """Rozpoczyna nasłuchiwanie"""
-        if not self.model or not self.recognizer:
+        if not self.recognizer:
             logger.error("Model VOSK nie jest zainicjalizowany")
             return False
             
@@ -111,25 +150,18 @@ class SpeechRecognizer:
             self.is_listening = True
             
             # Uruchom wątek przetwarzania
-            self.processing_thread = threading.Thread(target=self._process_audio)
+            self.processing_thread = threading.Thread(target=self._process_audio, name="speech-recognition")
             self.processing_thread.daemon = True
             self.processing_thread.start()
             
             # Uruchom strumień audio
-            self.stream = sd.RawInputStream(
-                samplerate=self.sample_rate,
-                channels=self.channels,
-                dtype='int16',
-                callback=self._audio_callback,
-                blocksize=8000
-            )
-            self.stream.start()
+            self.audio_source.start(self._audio_callback)
             
             logger.info("Rozpoczęto nasłuchiwanie")
             return True
             
         except Exception as e:
-            logger.error(f"Błąd podczas uruchamiania nasłuchiwania: {e}")
+            logger.error("Błąd podczas uruchamiania nasłuchiwania: %s", e)
             self.is_listening = False
             return False
             
@@ -141,9 +173,7 @@ class SpeechRecognizer:
         self.is_listening = False
         
         # Zatrzymaj strumień
-        if hasattr(self, 'stream'):
-            self.stream.stop()
-            self.stream.close()
+        self.audio_source.stop()
             
         # Poczekaj na zakończenie wątku
         if self.processing_thread:
@@ -154,8 +184,7 @@ class SpeechRecognizer:
     def get_final_result(self):
         """Pobiera ostatni wynik"""
         if self.recognizer:
-            result = json.loads(self.recognizer.FinalResult())
-            return result.get('text', '').strip()
+            return self.recognizer.final_result()
         return ""
 
 
@@ -163,12 +192,14 @@ class SpeechRecognizer:
 def test_microphone():
     """Testuje czy mikrofon działa"""
     try:
+        import sounddevice as sd
+        
         # Sprawdź urządzenia audio
         devices = sd.query_devices()
         logger.info("Dostępne urządzenia audio:")
         for i, device in enumerate(devices):
             if device['max_input_channels'] > 0:
-                logger.info(f"  [{i}] {device['name']} (wejście)")
+                logger.info("  [%d] %s (wejście)", i, device['name'])
                 
         # Test nagrywania
         logger.info("Test nagrywania 1 sekundy...")
@@ -178,5 +209,5 @@ def test_microphone():
         return True
         
     except Exception as e:
-        logger.error(f"Błąd podczas testu mikrofonu: {e}")
+        logger.error("Błąd podczas testu mikrofonu: %s", e)
         return False
\ No newline at end of file
@@ -3,59 +3,52 @@ Moduł syntezy mowy (Text-to-Speech)
 Używa pyttsx3 do generowania mowy
 """
 
-import pyttsx3
 import threading
 import queue
 import logging
+import weakref
+from typing import Optional
+
+from speech.backends import Pyttsx3SynthesisBackend, SynthesisBackend
+from utils.metrics import METRICS
+from utils.tracing import TRACER
 
-# Konfiguracja loggera
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Wszystkie instancje - do metryki głębokości kolejek syntezy
+_instances = weakref.WeakSet()
+METRICS.register_gauge(
+    'tutor_tts_queue_depth',
+    lambda: sum(instance.speech_queue.qsize() for instance in list(_instances))
+)
+
 
 class TextToSpeech:
-    def __init__(self):
-        """Inicjalizacja silnika TTS"""
-        self.engine = None
+    def __init__(self, backend: Optional[SynthesisBackend] = None):
+        """
+        Inicjalizacja silnika TTS
+        
+        Args:
+            backend: Silnik syntezy (domyślnie pyttsx3)
+        """
+        self.engine = backend
         self.speech_queue = queue.Queue()
         self.is_speaking = False
         self.speech_thread = None
+        _instances.add(self)
         
         # Inicjalizuj silnik
-        self._init_engine()
+        if self.engine is None:
+            self._init_engine()
         
     def _init_engine(self):
         """Inicjalizuje silnik pyttsx3"""
         try:
-            self.engine = pyttsx3.init()
-            
-            # Konfiguracja głosu
-            voices = self.engine.getProperty('voices')
-            
-            # Wybierz polski głos jeśli dostępny
-            polish_voice = None
-            for voice in voices:
-                if 'polish' in voice.name.lower() or 'pl' in voice.id.lower():
-                    polish_voice = voice
-                    break
-                    
-            if polish_voice:
-                self.engine.setProperty('voice', polish_voice.id)
-                logger.info(f"Używam polskiego głosu: {polish_voice.name}")
-            else:
-                # Użyj pierwszego dostępnego głosu
-                if voices:
-                    self.engine.setProperty('voice', voices[0].id)
-                logger.warning("Nie znaleziono polskiego głosu, używam domyślnego")
-            
-            # Ustaw parametry mowy
-            self.engine.setProperty('rate', 150)    # Szybkość mowy
-            self.engine.setProperty('volume', 0.9)  # Głośność (0.0 - 1.0)
-            
+            self.engine = Pyttsx3SynthesisBackend()
             logger.info("Silnik TTS zainicjalizowany pomyślnie")
             
         except Exception as e:
-            logger.error(f"Błąd podczas inicjalizacji TTS: {e}")
+            logger.error("Błąd podczas inicjalizacji TTS: %s", e)
             self.engine = None
             
     def speak(self, text, callback=None):
@@ -72,8 +65,13 @@ class TextToSpeech:
                 callback()
             return
             
+        # Tura dialogu, której odpowiedzią jest ten tekst (jeśli śledzenie włączone)
+        turn_id = TRACER.current_turn() if TRACER.enabled else None
+        if turn_id is not None:
+            TRACER.stamp('tts_enqueue', turn_id)
+            
         # Dodaj do kolejki
-        self.speech_queue.put((text, callback))
+        self.speech_queue.put((text, callback, turn_id))
         
         # Uruchom wątek mowy jeśli nie działa
         if not self.is_speaking:
@@ -87,17 +85,23 @@ class TextToSpeech:
         
         while not self.speech_queue.empty():
             try:
-                text, callback = self.speech_queue.get()
+                text, callback, turn_id = self.speech_queue.get()
+                
+                if turn_id is not None:
+                    TRACER.stamp('tts_start', turn_id)
                 
-                logger.info(f"Wypowiadam: {text}")
+                logger.info("Wypowiadam: %s", text)
                 self.engine.say(text)
-                self.engine.runAndWait()
+                
+                if turn_id is not None:
+                    TRACER.stamp('tts_end', turn_id)
+                    TRACER.finish_turn(turn_id)
                 
                 if callback:
                     callback()
                     
             except Exception as e:
-                logger.error(f"Błąd podczas syntezy mowy: {e}")
+                logger.error("Błąd podczas syntezy mowy: %s", e)
                 
         self.is_speaking = False
         
@@ -116,17 +120,17 @@ class TextToSpeech:
     def set_rate(self, rate):
         """Ustawia szybkość mowy (50-300)"""
         if self.engine:
-            self.engine.setProperty('rate', max(50, min(300, rate)))
+            self.engine.set_property('rate', max(50, min(300, rate)))
             
     def set_volume(self, volume):
         """Ustawia głośność (0.0-1.0)"""
         if self.engine:
-            self.engine.setProperty('volume', max(0.0, min(1.0, volume)))
+            self.engine.set_property('volume', max(0.0, min(1.0, volume)))
             
     def get_voices(self):
         """Zwraca listę dostępnych głosów"""
         if self.engine:
-            return self.engine.getProperty('voices')
+            return self.engine.get_voices()
         return []
 
 
@@ -0,0 +1,118 @@
+"""
+Konfiguracja logowania aplikacji
+
+Moduły tylko pobierają logger (`logging.getLogger(__name__)`) i logują
+z leniwym formatowaniem (`logger.debug("Wynik: %s", wynik)`), więc
+wyłączony poziom kosztuje jedno sprawdzenie. Handlery konfiguruje
+wyłącznie `setup_logging` wywoływane w punkcie wejścia aplikacji:
+
+- rekordy trafiają przez QueueHandler do kolejki, a zapisem na stderr
+  i do pliku zajmuje się wątek QueueListener - wątki dialogu i audio
+  nigdy nie czekają na I/O,
+- poziom globalny i poziomy poszczególnych modułów pochodzą z pliku
+  konfiguracyjnego JSON, np.:
+
+    {
+        "level": "INFO",
+        "modules": {"dialog.manager": "DEBUG", "speech": "WARNING"},
+        "file": "tutor.log",
+        "format": "json"
+    }
+
+Dodatkowe pola strukturalne przekazuje się przez `extra={'fields': {...}}`
+- w formacie tekstowym są dopisywane jako klucz=wartość, w JSON jako pola.
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+from typing import Dict, Optional
+
+# Plik konfiguracji szukany w katalogu roboczym, jeśli nie podano innego
+DEFAULT_CONFIG_FILE = "logging.json"
+
+DEFAULT_LEVEL = "INFO"
+
+TEXT_FORMAT = "%(asctime)s %(levelname)-7s [%(threadName)s] %(name)s: %(message)s"
+
+
+class StructuredFormatter(logging.Formatter):
+    """Formatter tekstowy lub JSON z polami strukturalnymi z `extra={'fields': ...}`"""
+
+    def __init__(self, output_format: str = "text"):
+        super().__init__(TEXT_FORMAT)
+        self.output_format = output_format
+
+    def format(self, record: logging.LogRecord) -> str:
+        fields = getattr(record, 'fields', None) or {}
+        if self.output_format == "json":
+            data = {
+                'time': self.formatTime(record),
+                'level': record.levelname,
+                'logger': record.name,
+                'thread': record.threadName,
+                'message': record.getMessage(),
+            }
+            data.update(fields)
+            if record.exc_info:
+                data['exception'] = self.formatException(record.exc_info)
+            return json.dumps(data, ensure_ascii=False, default=str)
+
+        text = super().format(record)
+        if fields:
+            text += " " + " ".join(f"{key}={value!r}" for key, value in fields.items())
+        return text
+
+
+def load_config(path: Optional[str] = None) -> dict:
+    """Wczytuje konfigurację logowania (brak pliku domyślnego = pusta konfiguracja)"""
+    path = path or DEFAULT_CONFIG_FILE
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def setup_logging(config_path: Optional[str] = None, level: Optional[str] = None,
+                  module_levels: Optional[Dict[str, str]] = None) -> logging.handlers.QueueListener:
+    """
+    Konfiguruje logowanie całego procesu
+
+    Args:
+        config_path: Plik konfiguracji JSON (domyślnie logging.json, jeśli istnieje)
+        level: Poziom globalny (nadpisuje wartość z pliku)
+        module_levels: Poziomy modułów (uzupełniają/nadpisują wartości z pliku)
+
+    Returns:
+        Uruchomiony QueueListener (zatrzymywany automatycznie przy wyjściu)
+    """
+    config = load_config(config_path)
+    output_format = config.get('format', 'text')
+
+    handlers = [logging.StreamHandler()]
+    if config.get('file'):
+        handlers.append(logging.FileHandler(config['file'], encoding='utf-8'))
+    formatter = StructuredFormatter(output_format)
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel((level or config.get('level') or DEFAULT_LEVEL).upper())
+
+    levels = dict(config.get('modules', {}))
+    levels.update(module_levels or {})
+    for name, module_level in levels.items():
+        logging.getLogger(name).setLevel(module_level.upper())
+
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
\ No newline at end of file
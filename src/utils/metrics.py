@@ -0,0 +1,286 @@
+"""
+Liczniki i wskaźniki pracy korepetytora (aktywne sesje, tury, kolejki, zapisy)
+
+Metryki są domyślnie wyłączone - wtedy `inc`, `observe` i `timer` kończą
+się na sprawdzeniu `METRICS.enabled`. Po włączeniu można je udostępnić:
+- jako endpoint HTTP w formacie tekstowym Prometheusa (MetricsServer),
+- jako okresowy zrzut JSON do pliku (JsonMetricsDumper).
+
+Nazwy metryk:
+    tutor_active_sessions                       sesje rozpoczęte i niezakończone
+    tutor_turns_total{state}                    tury dialogu wg stanu DialogState
+    tutor_turns_per_second                      tury/s w ostatnim oknie TURN_RATE_WINDOW
+    tutor_grading_lookups_total{result}         hit - zadanie znalezione w kluczu odpowiedzi,
+                                                solver - odpowiedź wyprowadzona przez dialog.solver, miss - brak
+    tutor_quiz_answers_total{correct}           ocenione odpowiedzi w quizie
+    tutor_quiz_alternative_accepts_total        poprawne odpowiedzi znalezione w dalszej hipotezie N-best
+    tutor_audio_queue_depth                     bloki audio czekające na rozpoznawanie
+    tutor_audio_dropped_frames_total            porzucone bloki audio (przepełniona kolejka)
+    tutor_tts_queue_depth                       teksty czekające na syntezę
+    tutor_storage_write_seconds{store}          czas zapisu logu sesji / statystyk / dziennika i migawki sesji
+"""
+
+import contextlib
+import json
+import os
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Optional, Tuple
+
+# Okno (w sekundach), z którego liczona jest liczba tur na sekundę
+TURN_RATE_WINDOW = 60
+
+# Opisy metryk (linie HELP w formacie Prometheusa)
+HELP = {
+    'tutor_active_sessions': "Aktywne sesje dialogu",
+    'tutor_turns_total': "Tury dialogu wg stanu",
+    'tutor_turns_per_second': "Tury na sekundę w ostatnim oknie",
+    'tutor_grading_lookups_total': "Wyszukania zadania w kluczu odpowiedzi",
+    'tutor_quiz_answers_total': "Ocenione odpowiedzi w quizie",
+    'tutor_quiz_alternative_accepts_total': "Poprawne odpowiedzi z dalszej hipotezy rozpoznawania",
+    'tutor_audio_queue_depth': "Bloki audio w kolejce rozpoznawania",
+    'tutor_audio_dropped_frames_total': "Porzucone bloki audio",
+    'tutor_tts_queue_depth': "Teksty w kolejce syntezy mowy",
+    'tutor_storage_write_seconds': "Czas zapisu na dysk",
+}
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, object]) -> LabelKey:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _format_labels(key: LabelKey) -> str:
+    if not key:
+        return ""
+    return "{" + ",".join(f'{name}="{value}"' for name, value in key) + "}"
+
+
+class Metrics:
+    def __init__(self):
+        self.enabled = False
+        self.lock = threading.Lock()
+        self.counters: Dict[str, Dict[LabelKey, float]] = {}
+        self.gauges: Dict[str, Dict[LabelKey, float]] = {}
+        self.gauge_callbacks: Dict[str, Callable[[], float]] = {}
+        # Podsumowania czasów: nazwa -> etykiety -> [liczba, suma, maksimum]
+        self.summaries: Dict[str, Dict[LabelKey, list]] = {}
+        self.turn_times = deque()
+
+    def enable(self, enabled: bool = True):
+        """Włącza lub wyłącza zbieranie metryk"""
+        self.enabled = enabled
+
+    def inc(self, name: str, value: float = 1, **labels):
+        """Zwiększa licznik"""
+        if not self.enabled:
+            return
+        key = _label_key(labels)
+        with self.lock:
+            series = self.counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def add_gauge(self, name: str, delta: float, **labels):
+        """Zmienia wartość wskaźnika o delta"""
+        if not self.enabled:
+            return
+        key = _label_key(labels)
+        with self.lock:
+            series = self.gauges.setdefault(name, {})
+            series[key] = series.get(key, 0) + delta
+
+    def register_gauge(self, name: str, callback: Callable[[], float]):
+        """Rejestruje wskaźnik odczytywany w chwili eksportu (np. głębokość kolejki)"""
+        self.gauge_callbacks[name] = callback
+
+    def observe(self, name: str, seconds: float, **labels):
+        """Dodaje pomiar czasu do podsumowania"""
+        if not self.enabled:
+            return
+        key = _label_key(labels)
+        with self.lock:
+            stats = self.summaries.setdefault(name, {}).setdefault(key, [0, 0.0, 0.0])
+            stats[0] += 1
+            stats[1] += seconds
+            stats[2] = max(stats[2], seconds)
+
+    @contextlib.contextmanager
+    def _timed(self, name: str, labels: dict):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def timer(self, name: str, **labels):
+        """Context manager mierzący czas bloku (przy wyłączonych metrykach - pusty)"""
+        if not self.enabled:
+            return contextlib.nullcontext()
+        return self._timed(name, labels)
+
+    def record_turn(self, state: str):
+        """Liczy turę dialogu w danym stanie"""
+        if not self.enabled:
+            return
+        self.inc('tutor_turns_total', state=state)
+        now = time.monotonic()
+        with self.lock:
+            self.turn_times.append(now)
+            self._expire_turns(now)
+
+    def _expire_turns(self, now: float):
+        while self.turn_times and self.turn_times[0] < now - TURN_RATE_WINDOW:
+            self.turn_times.popleft()
+
+    def turns_per_second(self) -> float:
+        with self.lock:
+            self._expire_turns(time.monotonic())
+            return len(self.turn_times) / TURN_RATE_WINDOW
+
+    def snapshot(self) -> dict:
+        """Zwraca bieżące wartości wszystkich metryk"""
+        gauges = {name: callback() for name, callback in self.gauge_callbacks.items()}
+        gauges['tutor_turns_per_second'] = round(self.turns_per_second(), 3)
+        with self.lock:
+            def series(values):
+                return {name: {_format_labels(key): value for key, value in data.items()}
+                        for name, data in values.items()}
+
+            result = {
+                'timestamp': time.time(),
+                'counters': series(self.counters),
+                'gauges': dict(series(self.gauges), **gauges),
+                'summaries': {
+                    name: {
+                        _format_labels(key): {'count': count, 'sum': round(total, 6), 'max': round(peak, 6)}
+                        for key, (count, total, peak) in data.items()
+                    }
+                    for name, data in self.summaries.items()
+                },
+            }
+        return result
+
+    def render_prometheus(self) -> str:
+        """Zwraca metryki w formacie tekstowym Prometheusa"""
+        lines = []
+
+        def header(name, kind):
+            if name in HELP:
+                lines.append(f"# HELP {name} {HELP[name]}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        callback_values = {name: callback() for name, callback in self.gauge_callbacks.items()}
+        rate = self.turns_per_second()
+        with self.lock:
+            for name, data in sorted(self.counters.items()):
+                header(name, 'counter')
+                for key, value in data.items():
+                    lines.append(f"{name}{_format_labels(key)} {value}")
+            for name, data in sorted(self.gauges.items()):
+                header(name, 'gauge')
+                for key, value in data.items():
+                    lines.append(f"{name}{_format_labels(key)} {value}")
+            for name, data in sorted(self.summaries.items()):
+                header(name, 'summary')
+                for key, (count, total, _) in data.items():
+                    labels = _format_labels(key)
+                    lines.append(f"{name}_count{labels} {count}")
+                    lines.append(f"{name}_sum{labels} {total:.6f}")
+                # Maksimum jako osobny wskaźnik (typ summary nie ma próbki _max)
+                header(f"{name}_max", 'gauge')
+                for key, (_, _, peak) in data.items():
+                    lines.append(f"{name}_max{_format_labels(key)} {peak:.6f}")
+        for name, value in sorted(callback_values.items()):
+            header(name, 'gauge')
+            lines.append(f"{name} {value}")
+        header('tutor_turns_per_second', 'gauge')
+        lines.append(f"tutor_turns_per_second {rate:.3f}")
+        return "\n".join(lines) + "\n"
+
+
+# Wspólny rejestr metryk aplikacji
+METRICS = Metrics()
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0] not in ('/', '/metrics'):
+            self.send_error(404)
+            return
+        body = METRICS.render_prometheus().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Bez wpisu na stderr dla każdego odpytania
+        pass
+
+
+class MetricsServer:
+    """Endpoint HTTP z metrykami (domyślnie tylko localhost)"""
+
+    def __init__(self, port: int, host: str = '127.0.0.1'):
+        self.server = ThreadingHTTPServer((host, port), _MetricsHandler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def port(self) -> int:
+        return self.server.server_address[1]
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class JsonMetricsDumper:
+    """Okresowo zapisuje migawkę metryk do pliku JSON"""
+
+    def __init__(self, path: str, interval: float = 10.0):
+        self.path = path
+        self.interval = interval
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def _run(self):
+        while not self.stopped.wait(self.interval):
+            self.dump()
+
+    def dump(self):
+        """Zapisuje migawkę (atomowo - przez plik tymczasowy)"""
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(METRICS.snapshot(), f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def stop(self):
+        self.stopped.set()
+        self.dump()
+
+
+def start_exporters(port: Optional[int] = None, json_path: Optional[str] = None,
+                    interval: float = 10.0) -> list:
+    """Włącza metryki i uruchamia wybrane eksportery; zwraca listę uruchomionych"""
+    exporters = []
+    if port is None and not json_path:
+        return exporters
+    METRICS.enable()
+    if port is not None:
+        exporters.append(MetricsServer(port))
+    if json_path:
+        exporters.append(JsonMetricsDumper(json_path, interval))
+    for exporter in exporters:
+        exporter.start()
+    return exporters
\ No newline at end of file
@@ -0,0 +1,250 @@
+"""
+Profilowanie gorących ścieżek w działającej aplikacji
+
+Sesję profilowania (menu Narzędzia albo sygnał SIGUSR1) uruchamia się na
+N sekund. W tym czasie:
+- wątki rozpoznawania mowy i Tk (w nich działa DialogManager) włączają
+  u siebie cProfile przy najbliższym `PROFILER.checkpoint()` - cProfile
+  działa tylko w wątku, który go włączył, więc wątki robią to same
+  (od Pythona 3.12 aktywny może być tylko jeden profiler na proces -
+  wtedy cProfile ma pierwszy wątek, a pozostałe widać tylko w próbkach),
+- osobny wątek próbkuje stosy wszystkich wątków (sys._current_frames),
+- funkcje oznaczone `@timed` i bloki `PROFILER.timer(...)` zbierają czasy.
+
+Wyniki trafiają do katalogu profiles/:
+    profile_<czas>.pstats     - do `python -m pstats` / snakeviz
+    profile_<czas>.collapsed  - stosy w formacie flamegraph.pl / speedscope
+    profile_<czas>.txt        - czasy funkcji i najdroższe wywołania
+
+Poza sesją każdy punkt pomiarowy to jedno sprawdzenie `PROFILER.active`.
+"""
+
+import cProfile
+import contextlib
+import functools
+import io
+import logging
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+PROFILE_DIR = "profiles"
+
+# Domyślny czas sesji profilowania w sekundach
+DEFAULT_DURATION = 10
+
+# Odstęp między próbkami stosów w sekundach
+SAMPLE_INTERVAL = 0.005
+
+# Ile czekać po końcu sesji, aż wątki oddadzą swoje profile (wątek audio
+# budzi się najpóźniej po 0.5 s oczekiwania na kolejkę)
+COLLECT_GRACE = 1.0
+
+# Ile najdroższych funkcji (czas skumulowany) wypisać w raporcie tekstowym
+REPORT_TOP = 30
+
+
+class HotPathProfiler:
+    def __init__(self):
+        self.active = False
+        self.collecting = False
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.session = 0
+        self.stats: Optional[pstats.Stats] = None
+        self.samples: Counter = Counter()
+        self.timers: Dict[str, list] = {}
+        self.profiled_threads = set()
+
+    def start(self, duration: float = DEFAULT_DURATION,
+              on_done: Optional[Callable[[Optional[str]], None]] = None) -> bool:
+        """
+        Rozpoczyna sesję profilowania
+
+        Args:
+            duration: Czas sesji w sekundach
+            on_done: Callback z prefiksem ścieżki zapisanych plików (lub None przy błędzie),
+                     wywoływany z wątku profilera
+
+        Returns:
+            False jeśli sesja już trwa
+        """
+        with self.lock:
+            if self.active:
+                return False
+            self.session += 1
+            self.stats = None
+            self.samples = Counter()
+            self.timers = {}
+            self.profiled_threads = set()
+            self.collecting = True
+            self.active = True
+
+        logger.info("Profilowanie przez %s s", duration)
+        threading.Thread(target=self._run, args=(self.session, duration, on_done),
+                         name="hot-path-profiler", daemon=True).start()
+        return True
+
+    def checkpoint(self):
+        """
+        Punkt kontrolny w pętli gorącego wątku
+
+        Włącza cProfile w bieżącym wątku na czas sesji i oddaje zebrane
+        dane po jej zakończeniu. Nigdy nie zgłasza wyjątku - wątek, w którym
+        nie da się włączyć profilera, jest w tej sesji pomijany.
+        """
+        profile = getattr(self.local, 'profile', None)
+        if self.active:
+            if getattr(self.local, 'session', None) != self.session:
+                if profile is not None:
+                    profile.disable()
+                self.local.profile = None
+                self.local.session = self.session
+                profile = cProfile.Profile()
+                try:
+                    profile.enable()
+                except ValueError:
+                    # Python 3.12+: profiler włączył już inny wątek
+                    logger.debug("cProfile zajęty - wątek %s tylko w próbkach stosów",
+                                 threading.current_thread().name)
+                else:
+                    self.local.profile = profile
+        elif profile is not None:
+            self._hand_in()
+
+    def _hand_in(self):
+        """Wyłącza profil bieżącego wątku i dołącza go do wyników sesji"""
+        profile = self.local.profile
+        profile.disable()
+        self.local.profile = None
+        with self.lock:
+            if self.local.session != self.session or not self.collecting:
+                # Sesja już zapisana - dane spóźnionego wątku są pomijane
+                return
+            try:
+                if self.stats is None:
+                    self.stats = pstats.Stats(profile)
+                else:
+                    self.stats.add(profile)
+                self.profiled_threads.add(threading.current_thread().name)
+            except TypeError:
+                # Profil bez żadnych wywołań
+                pass
+
+    def record(self, name: str, seconds: float):
+        """Dodaje czas wykonania funkcji"""
+        with self.lock:
+            stats = self.timers.setdefault(name, [0, 0.0, 0.0])
+            stats[0] += 1
+            stats[1] += seconds
+            stats[2] = max(stats[2], seconds)
+
+    @contextlib.contextmanager
+    def _timed(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def timer(self, name: str):
+        """Context manager mierzący czas bloku w trakcie sesji"""
+        if not self.active:
+            return contextlib.nullcontext()
+        return self._timed(name)
+
+    def _run(self, session: int, duration: float, on_done):
+        own_id = threading.get_ident()
+        deadline = time.monotonic() + duration
+        while time.monotonic() < deadline:
+            self._sample(own_id)
+            time.sleep(SAMPLE_INTERVAL)
+
+        self.active = False
+        # Wątek profilera nie jest gorącym wątkiem - czekamy aż tamte oddadzą profile
+        time.sleep(COLLECT_GRACE)
+
+        try:
+            path = self._write(session)
+            logger.info("Profil zapisany: %s.*", path)
+        except OSError as e:
+            logger.error("Błąd zapisu profilu: %s", e)
+            path = None
+
+        if on_done:
+            on_done(path)
+
+    def _sample(self, own_id: int):
+        """Zapisuje jedną próbkę stosów wszystkich wątków"""
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_id:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            stack.append(names.get(thread_id, str(thread_id)))
+            self.samples[";".join(reversed(stack))] += 1
+
+    def _write(self, session: int) -> str:
+        """Zapisuje wyniki sesji i zwraca wspólny prefiks ścieżek"""
+        with self.lock:
+            self.collecting = False
+            stats = self.stats
+            samples = self.samples
+            timers = dict(self.timers)
+            threads = sorted(self.profiled_threads)
+
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        prefix = os.path.join(PROFILE_DIR, f"profile_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+
+        if stats:
+            stats.dump_stats(prefix + ".pstats")
+
+        with open(prefix + ".collapsed", 'w', encoding='utf-8') as f:
+            for stack, count in samples.most_common():
+                f.write(f"{stack} {count}\n")
+
+        with open(prefix + ".txt", 'w', encoding='utf-8') as f:
+            f.write(f"Sesja profilowania #{session}\n")
+            f.write(f"Wątki z cProfile: {', '.join(threads) or 'brak'}\n")
+            f.write(f"Próbki stosów: {sum(samples.values())}\n\n")
+            f.write("Czasy funkcji [ms]:\n")
+            for name, (count, total, peak) in sorted(timers.items(), key=lambda item: -item[1][1]):
+                f.write(f"  {name:<30} n={count:<6} suma={total * 1000:<10.2f} "
+                        f"śr={total / count * 1000:<8.3f} max={peak * 1000:.3f}\n")
+            if stats:
+                output = io.StringIO()
+                stats.stream = output
+                stats.sort_stats('cumulative').print_stats(REPORT_TOP)
+                f.write("\n" + output.getvalue())
+        return prefix
+
+
+# Wspólny profiler aplikacji
+PROFILER = HotPathProfiler()
+
+
+def timed(name: str):
+    """Dekorator mierzący czas funkcji w trakcie sesji profilowania"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not PROFILER.active:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                PROFILER.record(name, time.perf_counter() - start)
+        return wrapper
+    return decorator
\ No newline at end of file
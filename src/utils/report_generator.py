@@ -2,22 +2,181 @@
 Generator raportów PDF z postępów ucznia
 """
 
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
+import csv
+import hashlib
+import heapq
+import html
+import json
+import os
 from datetime import datetime
+from typing import Dict, List, Optional
+
+# Wersja szablonu raportu - zmiana unieważnia wszystkie zapisane raporty
+TEMPLATE_VERSION = 2
+
+# Liczba najwolniej rozwiązanych zadań pokazywanych w raporcie
+SLOWEST_PROBLEMS = 5
+
+# Plik z indeksem wygenerowanych raportów (hash danych -> nazwa pliku)
+CACHE_FILE = "report_cache.json"
+
+# Obsługiwane formaty raportu
+REPORT_FORMATS = ('pdf', 'html', 'csv')
 
 
 class ReportGenerator:
-    def __init__(self, student_name: str, stats_data: dict):
+    def __init__(self, student_name: str, stats_data: dict, report_format: str = 'pdf'):
+        if report_format not in REPORT_FORMATS:
+            raise ValueError(f"Nieobsługiwany format raportu: {report_format}")
+            
         self.student_name = student_name
         self.stats_data = stats_data
-        self.filename = f"raport_{student_name}_{datetime.now().strftime('%Y%m%d')}.pdf"
+        self.report_format = report_format
+        self.filename = f"raport_{student_name}_{datetime.now().strftime('%Y%m%d')}.{report_format}"
+        self._aggregates = None
+        
+    @property
+    def aggregates(self) -> dict:
+        """Zagregowane dane z historii sesji (liczone raz, przy pierwszym użyciu)"""
+        if self._aggregates is None:
+            self._aggregates = aggregate_sessions(self.stats_data.get('sessions', []))
+        return self._aggregates
+        
+    def content_hash(self) -> str:
+        """Zwraca hash danych wejściowych raportu (razem z wersją szablonu)"""
+        payload = json.dumps(
+            {
+                'template': TEMPLATE_VERSION,
+                'format': self.report_format,
+                'student': self.student_name,
+                'stats': self.stats_data,
+            },
+            ensure_ascii=False,
+            sort_keys=True,
+            default=str
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+        
+    def generate_report(self, force: bool = False, cache: Optional[dict] = None):
+        """
+        Generuje raport w wybranym formacie
+        
+        Jeśli dane ucznia nie zmieniły się od ostatniego raportu, a plik
+        nadal istnieje, zwracana jest nazwa istniejącego pliku.
+        
+        Args:
+            force: Wymusza ponowne wygenerowanie raportu
+            cache: Wczytany indeks raportów - jest tylko aktualizowany, zapis należy
+                   do wywołującego (bez niego indeks jest wczytywany i zapisywany tutaj)
+            
+        Returns:
+            Nazwa pliku z raportem
+        """
+        digest = self.content_hash()
+        cache_key = f"{self.student_name}:{self.report_format}"
+        own_cache = cache is None
+        if own_cache:
+            cache = _load_cache()
         
-    def generate_report(self):
+        cached = cache.get(cache_key)
+        if not force and cached and cached['hash'] == digest and os.path.exists(cached['filename']):
+            self.filename = cached['filename']
+            return self.filename
+            
+        renderers = {
+            'pdf': self._generate_pdf,
+            'html': self._generate_html,
+            'csv': self._generate_csv,
+        }
+        renderers[self.report_format]()
+        
+        cache[cache_key] = {
+            'hash': digest,
+            'filename': self.filename,
+            'generated': datetime.now().isoformat()
+        }
+        if own_cache:
+            _save_cache(cache)
+        return self.filename
+        
+    def is_up_to_date(self, cache: Optional[dict] = None) -> bool:
+        """Sprawdza czy istnieje aktualny raport dla tych danych (w podanym lub wczytanym indeksie)"""
+        if cache is None:
+            cache = _load_cache()
+        cached = cache.get(f"{self.student_name}:{self.report_format}")
+        return bool(
+            cached
+            and cached['hash'] == self.content_hash()
+            and os.path.exists(cached['filename'])
+        )
+        
+    def _topic_rows(self):
+        """Zwraca wiersze tabeli wyników według tematów"""
+        rows = []
+        for topic, stats in self.stats_data['topics_performance'].items():
+            accuracy = (stats['correct'] / stats['total'] * 100) if stats['total'] > 0 else 0
+            rows.append([
+                topic.capitalize(),
+                str(stats['total']),
+                str(stats['correct']),
+                f"{accuracy:.1f}%"
+            ])
+        return rows
+        
+    def _summary_rows(self):
+        """Zwraca wiersze tabeli podsumowania"""
+        return [
+            ['Liczba sesji', str(self.stats_data['total_sessions'])],
+            ['Łączna liczba zadań', str(self.stats_data['total_questions'])],
+            ['Poprawne odpowiedzi', str(self.stats_data['total_correct'])],
+            ['Skuteczność', f"{self._calculate_accuracy():.1f}%"],
+        ]
+        
+    def _session_rows(self):
+        """Zwraca wiersze tabeli postępów w kolejnych sesjach"""
+        rows = []
+        previous = None
+        for session in self.aggregates['sessions']:
+            accuracy = session['accuracy']
+            change = "-" if previous is None else f"{accuracy - previous:+.1f}"
+            rows.append([
+                str(session['number']),
+                session['date'],
+                str(session['questions']),
+                f"{accuracy:.1f}%",
+                change
+            ])
+            previous = accuracy
+        return rows
+        
+    def _topic_time_rows(self):
+        """Zwraca wiersze tabeli średniego czasu odpowiedzi według tematów"""
+        return [
+            [topic.capitalize(), str(data['count']), f"{data['avg_time']:.1f} s"]
+            for topic, data in self.aggregates['topic_times'].items()
+        ]
+        
+    def _slowest_rows(self):
+        """Zwraca wiersze tabeli najwolniej rozwiązanych zadań"""
+        return [
+            [
+                answer['question'],
+                answer['topic'].capitalize(),
+                f"{answer['time_seconds']:.1f} s",
+                "tak" if answer['correct'] else "nie"
+            ]
+            for answer in self.aggregates['slowest']
+        ]
+        
+    def _generate_pdf(self):
         """Generuje raport PDF"""
+        # reportlab jest ciężki - ładujemy go tylko gdy naprawdę potrzebny
+        from reportlab.lib import colors
+        from reportlab.lib.pagesizes import A4
+        from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+        from reportlab.lib.units import inch
+        
         doc = SimpleDocTemplate(
             self.filename,
             pagesize=A4,
@@ -54,13 +213,7 @@ class ReportGenerator:
         # Statystyki ogólne
         elements.append(Paragraph("Podsumowanie", styles['Heading2']))
         
-        summary_data = [
-            ['Wskaźnik', 'Wartość'],
-            ['Liczba sesji', str(self.stats_data['total_sessions'])],
-            ['Łączna liczba zadań', str(self.stats_data['total_questions'])],
-            ['Poprawne odpowiedzi', str(self.stats_data['total_correct'])],
-            ['Skuteczność', f"{self._calculate_accuracy():.1f}%"],
-        ]
+        summary_data = [['Wskaźnik', 'Wartość']] + self._summary_rows()
         
         summary_table = Table(summary_data, colWidths=[3*inch, 2*inch])
         summary_table.setStyle(TableStyle([
@@ -81,16 +234,7 @@ class ReportGenerator:
         if self.stats_data['topics_performance']:
             elements.append(Paragraph("Wyniki według tematów", styles['Heading2']))
             
-            topics_data = [['Temat', 'Zadania', 'Poprawne', 'Skuteczność']]
-            
-            for topic, stats in self.stats_data['topics_performance'].items():
-                accuracy = (stats['correct'] / stats['total'] * 100) if stats['total'] > 0 else 0
-                topics_data.append([
-                    topic.capitalize(),
-                    str(stats['total']),
-                    str(stats['correct']),
-                    f"{accuracy:.1f}%"
-                ])
+            topics_data = [['Temat', 'Zadania', 'Poprawne', 'Skuteczność']] + self._topic_rows()
                 
             topics_table = Table(topics_data, colWidths=[2*inch, 1.5*inch, 1.5*inch, 1.5*inch])
             topics_table.setStyle(TableStyle([
@@ -106,12 +250,279 @@ class ReportGenerator:
             
             elements.append(topics_table)
             
+        # Sekcje oparte na historii sesji
+        table_style = TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black),
+        ])
+        
+        if self.aggregates['sessions']:
+            elements.append(Spacer(1, 20))
+            elements.append(Paragraph("Postępy w kolejnych sesjach", styles['Heading2']))
+            elements.append(self._trend_chart())
+            elements.append(Spacer(1, 12))
+            
+            sessions_table = Table(
+                [['Sesja', 'Data', 'Zadania', 'Skuteczność', 'Zmiana']] + self._session_rows(),
+                colWidths=[0.8*inch, 1.5*inch, 1*inch, 1.2*inch, 1*inch]
+            )
+            sessions_table.setStyle(table_style)
+            elements.append(sessions_table)
+            
+        if self.aggregates['topic_times']:
+            elements.append(Spacer(1, 20))
+            elements.append(Paragraph("Średni czas odpowiedzi według tematów", styles['Heading2']))
+            elements.append(self._topic_time_chart())
+            elements.append(Spacer(1, 12))
+            
+            times_table = Table(
+                [['Temat', 'Odpowiedzi', 'Średni czas']] + self._topic_time_rows(),
+                colWidths=[2*inch, 1.5*inch, 1.5*inch]
+            )
+            times_table.setStyle(table_style)
+            elements.append(times_table)
+            
+        if self.aggregates['slowest']:
+            elements.append(Spacer(1, 20))
+            elements.append(Paragraph("Najwolniej rozwiązane zadania", styles['Heading2']))
+            
+            slowest_table = Table(
+                [['Zadanie', 'Temat', 'Czas', 'Poprawnie']] +
+                [[Paragraph(html.escape(row[0]), styles['Normal'])] + row[1:] for row in self._slowest_rows()],
+                colWidths=[3*inch, 1.2*inch, 0.9*inch, 0.9*inch]
+            )
+            slowest_table.setStyle(table_style)
+            elements.append(slowest_table)
+            
         # Buduj PDF
         doc.build(elements)
         return self.filename
         
+    def _trend_chart(self):
+        """Tworzy wykres liniowy skuteczności w kolejnych sesjach (grafika reportlab)"""
+        from reportlab.graphics.shapes import Drawing
+        from reportlab.graphics.charts.lineplots import LinePlot
+        from reportlab.graphics.widgets.markers import makeMarker
+        from reportlab.lib import colors
+        
+        points = [(s['number'], s['accuracy']) for s in self.aggregates['sessions']]
+        
+        drawing = Drawing(400, 180)
+        chart = LinePlot()
+        chart.x = 40
+        chart.y = 30
+        chart.width = 340
+        chart.height = 130
+        chart.data = [points]
+        chart.lines[0].strokeColor = colors.HexColor('#1f77b4')
+        chart.lines[0].symbol = makeMarker('FilledCircle')
+        chart.yValueAxis.valueMin = 0
+        chart.yValueAxis.valueMax = 100
+        chart.yValueAxis.valueStep = 20
+        chart.xValueAxis.valueMin = 1
+        chart.xValueAxis.valueMax = max(2, len(points))
+        chart.xValueAxis.valueStep = max(1, len(points) // 10)
+        drawing.add(chart)
+        return drawing
+        
+    def _topic_time_chart(self):
+        """Tworzy wykres słupkowy średniego czasu odpowiedzi (grafika reportlab)"""
+        from reportlab.graphics.shapes import Drawing
+        from reportlab.graphics.charts.barcharts import VerticalBarChart
+        from reportlab.lib import colors
+        
+        topic_times = self.aggregates['topic_times']
+        
+        drawing = Drawing(400, 180)
+        chart = VerticalBarChart()
+        chart.x = 40
+        chart.y = 30
+        chart.width = 340
+        chart.height = 130
+        chart.data = [[data['avg_time'] for data in topic_times.values()]]
+        chart.categoryAxis.categoryNames = [topic.capitalize() for topic in topic_times]
+        chart.bars[0].fillColor = colors.HexColor('#1f77b4')
+        chart.valueAxis.valueMin = 0
+        drawing.add(chart)
+        return drawing
+        
+    def _generate_html(self):
+        """Generuje lekki raport HTML (np. dla dashboardów)"""
+        def table(header, rows):
+            lines = ["<table>", "<tr>" + "".join(f"<th>{html.escape(h)}</th>" for h in header) + "</tr>"]
+            for row in rows:
+                lines.append("<tr>" + "".join(f"<td>{html.escape(cell)}</td>" for cell in row) + "</tr>")
+            lines.append("</table>")
+            return "\n".join(lines)
+            
+        name = html.escape(self.student_name)
+        parts = [
+            "<!DOCTYPE html>",
+            "<html lang=\"pl\"><head><meta charset=\"utf-8\">",
+            f"<title>Raport postępów - {name}</title>",
+            "<style>table{border-collapse:collapse}th,td{border:1px solid #000;padding:4px 8px;text-align:center}"
+            "th{background:#808080;color:#f5f5f5}</style>",
+            "</head><body>",
+            f"<h1>Raport postępów - {name}</h1>",
+            f"<p>Data wygenerowania: {datetime.now().strftime('%d.%m.%Y')}</p>",
+            "<h2>Podsumowanie</h2>",
+            table(['Wskaźnik', 'Wartość'], self._summary_rows()),
+        ]
+        
+        if self.stats_data['topics_performance']:
+            parts.append("<h2>Wyniki według tematów</h2>")
+            parts.append(table(['Temat', 'Zadania', 'Poprawne', 'Skuteczność'], self._topic_rows()))
+            
+        if self.aggregates['sessions']:
+            parts.append("<h2>Postępy w kolejnych sesjach</h2>")
+            parts.append(table(['Sesja', 'Data', 'Zadania', 'Skuteczność', 'Zmiana'], self._session_rows()))
+            
+        if self.aggregates['topic_times']:
+            parts.append("<h2>Średni czas odpowiedzi według tematów</h2>")
+            parts.append(table(['Temat', 'Odpowiedzi', 'Średni czas'], self._topic_time_rows()))
+            
+        if self.aggregates['slowest']:
+            parts.append("<h2>Najwolniej rozwiązane zadania</h2>")
+            parts.append(table(['Zadanie', 'Temat', 'Czas', 'Poprawnie'], self._slowest_rows()))
+            
+        parts.append("</body></html>")
+        
+        with open(self.filename, 'w', encoding='utf-8') as f:
+            f.write("\n".join(parts))
+        return self.filename
+        
+    def _generate_csv(self):
+        """Generuje raport CSV (jeden wiersz na temat + wiersz podsumowania)"""
+        with open(self.filename, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f, delimiter=';')
+            writer.writerow(['Temat', 'Zadania', 'Poprawne', 'Skuteczność'])
+            writer.writerows(self._topic_rows())
+            writer.writerow([
+                'RAZEM',
+                str(self.stats_data['total_questions']),
+                str(self.stats_data['total_correct']),
+                f"{self._calculate_accuracy():.1f}%"
+            ])
+        return self.filename
+        
     def _calculate_accuracy(self):
         """Oblicza ogólną skuteczność"""
         if self.stats_data['total_questions'] == 0:
             return 0
-        return (self.stats_data['total_correct'] / self.stats_data['total_questions']) * 100
\ No newline at end of file
+        return (self.stats_data['total_correct'] / self.stats_data['total_questions']) * 100
+
+
+def generate_reports(students: Dict[str, dict], report_format: str = 'pdf',
+                     force: bool = False) -> Dict[str, Optional[str]]:
+    """
+    Generuje raporty dla wielu uczniów (np. nocne przetwarzanie wsadowe)
+    
+    Args:
+        students: Słownik imię ucznia -> dane statystyk
+        report_format: Format raportów ('pdf', 'html', 'csv')
+        force: Wymusza ponowne wygenerowanie wszystkich raportów
+        
+    Returns:
+        Słownik imię ucznia -> nazwa nowego pliku lub None jeśli pominięto
+    """
+    # Indeks raportów wczytywany i zapisywany raz na całe przetwarzanie
+    cache = _load_cache()
+    results = {}
+    try:
+        for student_name, stats_data in students.items():
+            generator = ReportGenerator(student_name, stats_data, report_format)
+            if not force and generator.is_up_to_date(cache):
+                results[student_name] = None
+                continue
+            results[student_name] = generator.generate_report(force=True, cache=cache)
+    finally:
+        # Także po błędzie - raporty wygenerowane do tej pory zostają w indeksie
+        if any(results.values()):
+            _save_cache(cache)
+    return results
+
+
+def aggregate_sessions(sessions: List[dict], slowest: int = SLOWEST_PROBLEMS) -> dict:
+    """
+    Agreguje historię sesji w jednym przejściu
+    
+    Args:
+        sessions: Lista sesji ze statystyk ucznia
+        slowest: Liczba najwolniejszych zadań do zapamiętania
+        
+    Returns:
+        Słownik z kluczami 'sessions' (skuteczność kolejnych sesji),
+        'topic_times' (średni czas według tematów) i 'slowest' (najwolniejsze zadania)
+    """
+    session_rows = []
+    time_sums: Dict[str, List[float]] = {}
+    heap = []  # kopiec min o rozmiarze `slowest`
+    counter = 0
+    
+    for number, session in enumerate(sessions, 1):
+        answers = session.get('answers', [])
+        correct = 0
+        
+        for answer in answers:
+            if answer.get('correct'):
+                correct += 1
+                
+            time_taken = answer.get('time_seconds')
+            if time_taken is None:
+                continue
+                
+            topic = answer.get('topic', '')
+            sums = time_sums.setdefault(topic, [0.0, 0])
+            sums[0] += time_taken
+            sums[1] += 1
+            
+            # Licznik rozstrzyga remisy, żeby heapq nie porównywał słowników
+            counter += 1
+            item = (time_taken, counter, answer)
+            if len(heap) < slowest:
+                heapq.heappush(heap, item)
+            elif time_taken > heap[0][0]:
+                heapq.heapreplace(heap, item)
+                
+        if 'accuracy' in session:
+            accuracy = session['accuracy']
+        else:
+            accuracy = correct / len(answers) * 100 if answers else 0
+            
+        session_rows.append({
+            'number': number,
+            'date': session.get('start_time', '')[:10],
+            'questions': len(answers),
+            'accuracy': accuracy
+        })
+        
+    return {
+        'sessions': session_rows,
+        'topic_times': {
+            topic: {'count': count, 'avg_time': total / count}
+            for topic, (total, count) in time_sums.items()
+        },
+        'slowest': [answer for _, _, answer in sorted(heap, reverse=True)]
+    }
+
+
+def _load_cache() -> dict:
+    """Wczytuje indeks wygenerowanych raportów"""
+    if not os.path.exists(CACHE_FILE):
+        return {}
+    try:
+        with open(CACHE_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_cache(cache: dict):
+    """Zapisuje indeks wygenerowanych raportów"""
+    with open(CACHE_FILE, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, ensure_ascii=False, indent=2)
\ No newline at end of file
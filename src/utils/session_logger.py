@@ -6,6 +6,8 @@ import os
 from datetime import datetime
 import json
 
+from utils.metrics import METRICS
+
 
 class SessionLogger:
     def __init__(self):
@@ -48,8 +50,9 @@ class SessionLogger:
         timestamp = datetime.now()
         
         # Zapis do pliku tekstowego
-        with open(self.log_file, 'a', encoding='utf-8') as f:
-            f.write(f"[{timestamp.strftime('%H:%M:%S')}] {sender}: {message}\n")
+        with METRICS.timer('tutor_storage_write_seconds', store='session_log'):
+            with open(self.log_file, 'a', encoding='utf-8') as f:
+                f.write(f"[{timestamp.strftime('%H:%M:%S')}] {sender}: {message}\n")
             
         # Zapis do struktury JSON
         message_data = {
@@ -60,6 +63,43 @@ class SessionLogger:
         }
         self.conversation_data['messages'].append(message_data)
         
+    def message_count(self) -> int:
+        """Zwraca liczbę zalogowanych wiadomości"""
+        return len(self.conversation_data['messages'])
+        
+    def get_messages(self, start: int, end: int) -> list:
+        """Zwraca zalogowane wiadomości z zakresu [start, end)"""
+        return self.conversation_data['messages'][max(0, start):end]
+        
+    def log_corrections(self, original: str, corrected: str, corrections: list):
+        """Loguje poprawki błędów rozpoznawania mowy (dialog.fuzzy.Correction)"""
+        timestamp = datetime.now()
+        details = ", ".join(f"'{c.original}' -> '{c.corrected}' ({c.confidence:.2f})" for c in corrections)
+        with open(self.log_file, 'a', encoding='utf-8') as f:
+            f.write(f"[{timestamp.strftime('%H:%M:%S')}] KOREKTA ASR: {details}\n")
+        self.conversation_data.setdefault('corrections', []).append({
+            'timestamp': timestamp.isoformat(),
+            'original': original,
+            'corrected': corrected,
+            'words': [c._asdict() for c in corrections]
+        })
+        
+    def log_traces(self, records: list):
+        """Loguje czasy etapów zakończonych tur (z utils.tracing)"""
+        if not records:
+            return
+        with open(self.log_file, 'a', encoding='utf-8') as f:
+            for record in records:
+                spans = ", ".join(f"{span}={value:.1f}ms" for span, value in record['spans_ms'].items())
+                f.write(f"[TRACE] tura {record['turn']}: {spans}\n")
+        self.conversation_data.setdefault('traces', []).extend(records)
+        
+    def log_trace_summary(self, summary: dict, text: str):
+        """Loguje okresowe podsumowanie histogramów czasów tur"""
+        with open(self.log_file, 'a', encoding='utf-8') as f:
+            f.write(f"[{datetime.now().strftime('%H:%M:%S')}] {text}\n")
+        self.conversation_data['trace_summary'] = summary
+        
     def save_session(self, final_stats: dict = None):
         """Zapisuje pełną sesję do JSON"""
         self.conversation_data['end_time'] = datetime.now().isoformat()
@@ -67,8 +107,9 @@ class SessionLogger:
         if final_stats:
             self.conversation_data['statistics'] = final_stats
             
-        with open(self.json_file, 'w', encoding='utf-8') as f:
-            json.dump(self.conversation_data, f, ensure_ascii=False, indent=2)
+        with METRICS.timer('tutor_storage_write_seconds', store='session_json'):
+            with open(self.json_file, 'w', encoding='utf-8') as f:
+                json.dump(self.conversation_data, f, ensure_ascii=False, indent=2)
             
         # Dodaj podsumowanie do pliku tekstowego
         with open(self.log_file, 'a', encoding='utf-8') as f:
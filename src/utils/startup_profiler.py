@@ -0,0 +1,56 @@
+"""
+Pomiar czasu uruchamiania aplikacji (flaga --profile-startup)
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import List, Optional, Tuple
+
+
+class StartupProfiler:
+    def __init__(self, start: Optional[float] = None):
+        """
+        Args:
+            start: Moment startu procesu (time.perf_counter), domyślnie teraz
+        """
+        self.start = start if start is not None else time.perf_counter()
+        self.last_mark = self.start
+        self.phases: List[Tuple[str, float, float, str]] = []  # (nazwa, początek, koniec, wątek)
+        self.lock = threading.Lock()
+
+    def record(self, name: str, begin: float, end: float):
+        """Zapisuje fazę o znanym początku i końcu"""
+        with self.lock:
+            self.phases.append((name, begin, end, threading.current_thread().name))
+
+    def mark(self, name: str):
+        """Zapisuje fazę trwającą od poprzedniego znacznika (wątek główny)"""
+        now = time.perf_counter()
+        self.record(name, self.last_mark, now)
+        self.last_mark = now
+
+    @contextmanager
+    def phase(self, name: str):
+        """Mierzy czas bloku kodu (można używać w wątkach w tle)"""
+        begin = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, begin, time.perf_counter())
+
+    def report(self) -> str:
+        """Zwraca tabelę z czasami poszczególnych faz"""
+        with self.lock:
+            phases = sorted(self.phases, key=lambda p: p[1])
+
+        lines = ["Czas uruchamiania (ms od startu procesu):"]
+        lines.append(f"  {'start':>8}  {'czas':>8}  faza")
+        for name, begin, end, thread in phases:
+            lines.append(
+                f"  {(begin - self.start) * 1000:8.1f}  {(end - begin) * 1000:8.1f}  {name} [{thread}]"
+            )
+        if phases:
+            total = max(end for _, _, end, _ in phases) - self.start
+            lines.append(f"  Razem: {total * 1000:.1f} ms")
+        return "\n".join(lines)
\ No newline at end of file
@@ -0,0 +1,171 @@
+"""
+Śledzenie czasu tur dialogu (rozpoznawanie -> dialog -> synteza mowy)
+
+Każda tura dostaje identyfikator i znaczniki czasu (time.monotonic) na
+kolejnych etapach. Po zakończeniu tury czasy etapów trafiają do
+histogramów w pamięci, a pełny rekord tury do kolejki, z której
+aplikacja przepisuje je do logu sesji.
+
+Śledzenie jest domyślnie wyłączone - każdy punkt pomiarowy sprawdza
+najpierw `TRACER.enabled`, więc koszt przy wyłączonym śledzeniu to
+jedno odczytanie atrybutu.
+"""
+
+import itertools
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Dict, List, Optional
+
+# Kolejność znaczników w turze
+STAGES = (
+    'audio_end',
+    'recognition_final',
+    'dialog_start',
+    'dialog_end',
+    'tts_enqueue',
+    'tts_start',
+    'tts_end',
+)
+
+# Mierzone odcinki: nazwa -> (znacznik początkowy, znacznik końcowy)
+SPANS = OrderedDict([
+    ('recognition', ('audio_end', 'recognition_final')),
+    ('handoff', ('recognition_final', 'dialog_start')),
+    ('dialog', ('dialog_start', 'dialog_end')),
+    ('tts_queue', ('tts_enqueue', 'tts_start')),
+    ('tts_speech', ('tts_start', 'tts_end')),
+    ('response_latency', ('audio_end', 'tts_start')),
+])
+
+# Górne granice przedziałów histogramu w ms (ostatni przedział - bez ograniczenia)
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+
+# Ile niezakończonych tur trzymamy (tury bez odpowiedzi TTS są w końcu porzucane)
+MAX_OPEN_TURNS = 1000
+
+
+class Histogram:
+    """Histogram czasów w przedziałach logarytmicznych"""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, value_ms: float):
+        index = 0
+        while index < len(BUCKETS_MS) and value_ms > BUCKETS_MS[index]:
+            index += 1
+        self.counts[index] += 1
+        self.count += 1
+        self.total += value_ms
+        self.max = max(self.max, value_ms)
+
+    def percentile(self, fraction: float) -> float:
+        """Szacuje percentyl jako górną granicę przedziału"""
+        if not self.count:
+            return 0.0
+        target = fraction * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= target:
+                return BUCKETS_MS[index] if index < len(BUCKETS_MS) else self.max
+        return self.max
+
+    def to_dict(self) -> dict:
+        return {
+            'count': self.count,
+            'mean_ms': round(self.total / self.count, 2) if self.count else 0,
+            'p50_ms': self.percentile(0.5),
+            'p95_ms': self.percentile(0.95),
+            'max_ms': round(self.max, 2),
+            'buckets': self.counts,
+        }
+
+
+class TurnTracer:
+    def __init__(self):
+        self.enabled = False
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.ids = itertools.count(1)
+        self.open_turns: "OrderedDict[int, Dict[str, float]]" = OrderedDict()
+        self.completed = deque(maxlen=MAX_OPEN_TURNS)
+        self.histograms = {span: Histogram() for span in SPANS}
+
+    def enable(self, enabled: bool = True):
+        """Włącza lub wyłącza śledzenie"""
+        self.enabled = enabled
+
+    def start_turn(self, audio_end: Optional[float] = None) -> int:
+        """Rozpoczyna nową turę w bieżącym wątku i zwraca jej identyfikator"""
+        turn_id = next(self.ids)
+        stamps = {'audio_end': audio_end} if audio_end is not None else {}
+        with self.lock:
+            self.open_turns[turn_id] = stamps
+            while len(self.open_turns) > MAX_OPEN_TURNS:
+                self.open_turns.popitem(last=False)
+        self.local.turn_id = turn_id
+        return turn_id
+
+    def current_turn(self) -> Optional[int]:
+        """Zwraca identyfikator tury bieżącego wątku"""
+        return getattr(self.local, 'turn_id', None)
+
+    def stamp(self, stage: str, turn_id: Optional[int] = None):
+        """Zapisuje znacznik czasu etapu (domyślnie dla tury bieżącego wątku)"""
+        now = time.monotonic()
+        if turn_id is None:
+            turn_id = self.current_turn()
+        with self.lock:
+            stamps = self.open_turns.get(turn_id)
+            if stamps is not None:
+                stamps.setdefault(stage, now)
+
+    def detach(self):
+        """Odłącza turę od bieżącego wątku (dalsze etapy dzieją się w innych wątkach)"""
+        self.local.turn_id = None
+
+    def finish_turn(self, turn_id: Optional[int]):
+        """Zamyka turę i dodaje jej czasy do histogramów"""
+        with self.lock:
+            stamps = self.open_turns.pop(turn_id, None)
+            if stamps is None:
+                return
+            spans = {}
+            for span, (begin, end) in SPANS.items():
+                if begin in stamps and end in stamps:
+                    value = (stamps[end] - stamps[begin]) * 1000
+                    spans[span] = round(value, 3)
+                    self.histograms[span].add(value)
+            self.completed.append({'turn': turn_id, 'spans_ms': spans})
+
+    def drain_completed(self) -> List[dict]:
+        """Zwraca i usuwa rekordy zakończonych tur (do zapisania w logu sesji)"""
+        with self.lock:
+            records = list(self.completed)
+            self.completed.clear()
+        return records
+
+    def summary(self) -> Dict[str, dict]:
+        """Zwraca podsumowanie histogramów wszystkich odcinków"""
+        with self.lock:
+            return {span: histogram.to_dict() for span, histogram in self.histograms.items()}
+
+    def format_summary(self) -> str:
+        """Zwraca podsumowanie w formie czytelnej tabeli"""
+        lines = ["Czasy etapów tury [ms]:"]
+        for span, data in self.summary().items():
+            if data['count']:
+                lines.append(
+                    f"  {span:<17} n={data['count']:<6} śr={data['mean_ms']:<8} "
+                    f"p50≤{data['p50_ms']:<6} p95≤{data['p95_ms']:<6} max={data['max_ms']}"
+                )
+        return "\n".join(lines)
+
+
+# Wspólny tracer aplikacji
+TRACER = TurnTracer()
\ No newline at end of file
@@ -0,0 +1,8 @@
+"""
+Wspólna konfiguracja testów - pakiety z src (jak w main.py)
+"""
+
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
\ No newline at end of file
@@ -0,0 +1,31 @@
+"""
+Testy interfejsów backendów mowy (speech.backends, speech.fakes)
+"""
+
+import pytest
+
+from speech.backends import AudioSource, RecognitionBackend, SynthesisBackend
+from speech.fakes import RecordingSynthesisBackend, ScriptedRecognitionBackend, SilentAudioSource, _PacedAudioSource
+
+
+@pytest.mark.parametrize("interface", [AudioSource, RecognitionBackend, SynthesisBackend, _PacedAudioSource])
+def test_interfaces_cannot_be_created(interface):
+    with pytest.raises(TypeError):
+        interface()
+
+
+def test_incomplete_backend_fails_on_creation():
+    class Incomplete(RecognitionBackend):
+        def accept_waveform(self, data):
+            return False
+            
+    with pytest.raises(TypeError, match="partial_result"):
+        Incomplete()
+
+
+def test_fakes_implement_interfaces():
+    backend = ScriptedRecognitionBackend([("cztery", 0.5)])
+    assert backend.accept_waveform(bytes(16000))
+    assert backend.results()[0].text == "cztery"
+    assert SilentAudioSource(seconds=1).sample_rate == 16000
+    RecordingSynthesisBackend().say("dwa plus dwa")
\ No newline at end of file
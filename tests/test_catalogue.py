@@ -0,0 +1,98 @@
+"""
+Testy skompilowanego katalogu zadań (dialog.catalogue)
+"""
+
+import json
+
+import pytest
+
+from dialog.catalogue import (SOURCE_FILE, Catalogue, CatalogueError, _load_catalogue, build,
+                              compile_catalogue, generated_problems, load_source, validate)
+
+ROWS = [
+    {'topic': 'ułamki', 'level': 'klasa_4', 'difficulty': -1.0, 'text': "Oblicz: 1/2 + 1/2",
+     'answers': ["1"], 'hint': "Dodaj liczniki."},
+    {'topic': 'ułamki', 'level': 'klasa_7', 'difficulty': 0.5, 'text': "Oblicz: 1/2 + 1/3",
+     'answers': ["5/6"], 'hint': ""},
+    {'topic': 'procenty', 'level': 'klasa_5', 'difficulty': 0.25, 'text': "Oblicz 10% z liczby 450.",
+     'answers': ["45", "45.0"], 'hint': "10% to jedna dziesiąta."},
+]
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "problems.json"
+    path.write_text(json.dumps(ROWS, ensure_ascii=False), encoding='utf-8')
+    return str(path)
+
+
+def test_compile_round_trip(source, tmp_path):
+    output = str(tmp_path / "problems.cat")
+    assert compile_catalogue(source, output) == len(ROWS)
+    
+    catalogue = Catalogue.open(output)
+    assert catalogue.verify()
+    assert len(catalogue) == len(ROWS)
+    for index, row in enumerate(ROWS):
+        problem = catalogue.problem(index)
+        assert (problem.topic, problem.level, problem.text, problem.answers, problem.hint) == (
+            row['topic'], row['level'], row['text'], row['answers'], row['hint'])
+        assert problem.difficulty == pytest.approx(row['difficulty'])
+        assert catalogue.find(row['text']) == index
+    assert catalogue.find("Oblicz: 2/3 + 1/3") is None
+    
+    
+def test_ids_by_topic_and_level(source):
+    catalogue = Catalogue(build(validate(load_source(source))))
+    assert catalogue.ids('ułamki') == [0, 1]
+    assert catalogue.ids('ułamki', 'klasa_5') == [0]
+    assert catalogue.ids('ułamki', 'matura') == [0, 1]
+    assert catalogue.ids(None, 'klasa_5') == [0, 2]
+    assert catalogue.ids('funkcje') == []
+    
+    
+def test_corrupted_file_is_rejected(source, tmp_path):
+    output = tmp_path / "problems.cat"
+    compile_catalogue(source, str(output))
+    data = output.read_bytes()
+    
+    output.write_bytes(data[:-1] + bytes([data[-1] ^ 0xFF]))
+    with pytest.raises(CatalogueError):
+        Catalogue.open(str(output))
+    output.write_bytes(data[:40])
+    with pytest.raises(CatalogueError):
+        Catalogue.open(str(output))
+    output.write_bytes(b"")
+    with pytest.raises(CatalogueError):
+        Catalogue.open(str(output))
+        
+        
+def test_corrupted_file_is_rebuilt(source, tmp_path):
+    output = tmp_path / "problems.cat"
+    output.write_bytes(b"MTCATLG\x00 to nie jest katalog")
+    catalogue = _load_catalogue(source, str(output))
+    assert len(catalogue) == len(ROWS)
+    assert Catalogue.open(str(output)).verify()
+    
+    
+def test_missing_files_fall_back_to_generated_problems(tmp_path):
+    catalogue = _load_catalogue(str(tmp_path / "brak.json"), str(tmp_path / "brak.cat"))
+    assert len(catalogue) > 0
+    assert {problem.topic for problem in catalogue.problems()} == {
+        'równania', 'funkcje', 'geometria', 'ułamki', 'procenty'}
+    assert all(problem.answers for problem in generated_problems())
+    
+    
+def test_validate_reports_all_errors():
+    rows = [dict(ROWS[0]), dict(ROWS[0]), dict(ROWS[1], topic='algebra', difficulty='trudne', answers=[])]
+    with pytest.raises(CatalogueError) as error:
+        validate(rows)
+    message = str(error.value)
+    assert "wiersz 2: treść powtórzona (wiersz 1)" in message
+    assert "nieznany temat 'algebra'" in message
+    assert "nie jest liczbą" in message
+    assert "brak poprawnych odpowiedzi" in message
+    
+    
+def test_shipped_source_is_valid():
+    assert len(validate(load_source(SOURCE_FILE))) > 0
\ No newline at end of file
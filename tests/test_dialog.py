@@ -0,0 +1,55 @@
+"""
+Testy oceny odpowiedzi w quizie (dialog.manager)
+"""
+
+import pytest
+
+from dialog.manager import DialogManager, DialogState, answer_matches
+
+PROBLEM = "Rozwiąż równanie: 2x + 5 = 13. Ile wynosi x?"
+ANSWERS = ['4', 'x=4', 'x = 4', 'cztery']
+
+
+def quiz_manager():
+    manager = DialogManager(lambda message: None)
+    manager.current_state = DialogState.QUIZ
+    manager.current_topic = 'równania'
+    manager.context['current_problem'] = PROBLEM
+    return manager
+
+
+@pytest.mark.parametrize("math_text, expected", [
+    ("4", True),
+    ("x = 4", True),
+    ("x=4", True),
+    ("to 4.", True),
+    ("8/2", True),
+    ("40", False),
+    ("400", False),
+    ("1/4", False),
+    ("-4", False),
+    ("4.5", False),
+    ("14", False),
+])
+def test_answer_matches_whole_tokens_and_values(math_text, expected):
+    assert answer_matches(ANSWERS, "", math_text) is expected
+
+
+def test_answer_matches_equal_fractions():
+    assert answer_matches(['0.5', '1/2'], "", "2/4")
+    assert answer_matches(['0.5'], "", "0,5")
+    assert not answer_matches(['0.5'], "", "0,55")
+
+
+@pytest.mark.parametrize("best, alternatives, correct", [
+    ("cztery", [], True),
+    ("sto", [("cztery", 0.3)], True),
+    ("sto", [("czterdzieści", 0.3)], False),
+    ("czterdzieści", [("sto", 0.3)], False),
+    ("czterysta", [("czternaście", 0.3), ("jedna czwarta", 0.2)], False),
+    ("sto", [("cztery", 0.1)], False),
+])
+def test_n_best_grading(best, alternatives, correct):
+    manager = quiz_manager()
+    response = manager.process_user_input(best, alternatives)
+    assert response.startswith("Świetnie!") is correct
\ No newline at end of file
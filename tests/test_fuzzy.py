@@ -0,0 +1,92 @@
+"""
+Testy poprawiania błędów rozpoznawania mowy (dialog.fuzzy)
+"""
+
+import pytest
+
+from dialog.fuzzy import FuzzyVocabulary, edit_distance, fold
+from dialog.manager import ANSWER_ANCHORS, VOCABULARY, DialogManager, DialogState
+
+
+@pytest.mark.parametrize("text, corrected", [
+    ("piec", "pięć"),
+    ("dwanascie", "dwanaście"),
+    ("czteri", "cztery"),
+    ("rownania", "równania"),
+    ("sedem plus dwa", "siedem plus dwa"),
+    ("pienciu", "pięciu"),
+    # Słowa poprawne i spoza słownika zostają
+    ("równania", "równania"),
+    ("ala ma kota", "ala ma kota"),
+])
+def test_dialog_vocabulary(text, corrected):
+    assert VOCABULARY.correct(text)[0] == corrected
+    
+    
+@pytest.mark.parametrize("word", ["pole", "pies", "zera", "pomoc", "pomocy"])
+def test_short_words_differing_in_ending_are_not_corrected(word):
+    assert VOCABULARY.lookup(word) is None
+    
+    
+@pytest.mark.parametrize("text", [
+    "trzeba policzyć pole kwadratu",
+    "pole kwadratu to szesnaście",
+    "nie wiem ile to jest",
+])
+def test_answer_typos_corrected_only_next_to_numbers(text):
+    assert VOCABULARY.correct(text, anchors=ANSWER_ANCHORS)[0] == text
+    
+    
+@pytest.mark.parametrize("text, corrected", [
+    ("czteri", "cztery"),
+    ("czteri plus sedem", "cztery plus siedem"),
+    ("x równa sie czteri", "x równa się cztery"),
+    ("wynik to 12 sedem", "wynik to 12 siedem"),
+])
+def test_answer_typos_next_to_numbers(text, corrected):
+    assert VOCABULARY.correct(text, anchors=ANSWER_ANCHORS)[0] == corrected
+    
+    
+@pytest.mark.parametrize("state, text, corrected", [
+    (DialogState.TOPIC_SELECTION, "trzeba kwadratu", "trzeba kwadratu"),
+    (DialogState.TOPIC_SELECTION, "rownania", "równania"),
+    (DialogState.QUIZ, "pole kwadratu", "pole kwadratu"),
+    (DialogState.QUIZ, "czteri", "cztery"),
+])
+def test_manager_corrections(state, text, corrected):
+    seen = []
+    manager = DialogManager(lambda message: None,
+                            on_corrections=lambda original, fixed, corrections: seen.append(fixed))
+    manager.current_state = state
+    manager.process_user_input(text)
+    assert (seen[0] if seen else text) == corrected
+    
+    
+def test_correction_details():
+    text, corrections = VOCABULARY.correct("x równa sie piec")
+    assert text == "x równa się pięć"
+    assert [(c.original, c.corrected, c.start, c.end) for c in corrections] == [
+        ("sie", "się", 8, 11), ("piec", "pięć", 12, 16)]
+    assert all(c.confidence == 0.95 for c in corrections)
+    
+    
+def test_ambiguous_and_short_words_are_not_corrected():
+    # Dwóch równie bliskich kandydatów
+    assert FuzzyVocabulary(['domek', 'dymek']).lookup('damek') is None
+    # Krótkie słowa - tylko brakujące ogonki
+    vocabulary = FuzzyVocabulary(['kąt'])
+    assert vocabulary.lookup('kat') == ('kąt', 0.95)
+    assert vocabulary.lookup('kot') is None
+    
+    
+def test_min_confidence():
+    assert FuzzyVocabulary(['cztery']).correct('czteri')[0] == 'cztery'
+    assert FuzzyVocabulary(['cztery'], min_confidence=0.9).correct('czteri')[0] == 'czteri'
+    
+    
+def test_edit_distance():
+    assert edit_distance("ab", "ba", 2) == 1
+    assert edit_distance("kitten", "sitting", 5) == 3
+    # Wynik obcięty do limit + 1
+    assert edit_distance("abc", "xyzabc", 1) == 2
+    assert fold("Źdźbło") == "zdzblo"
\ No newline at end of file
@@ -0,0 +1,54 @@
+"""
+Testy rozpoznawania intencji (dialog.intents)
+"""
+
+import pytest
+
+from dialog.intents import INTENTS, IntentEngine, first
+
+
+def intent_value(text, intent):
+    match = first(INTENTS.find_all(text), intent)
+    return match.value if match else None
+
+
+@pytest.mark.parametrize("text, topic", [
+    ("równania", 'równania'),
+    ("chcę ćwiczyć równaniami", 'równania'),
+    ("może funkcje", 'funkcje'),
+    ("pole prostokąta", 'geometria'),
+    ("prostokąt", 'geometria'),
+    ("kąty w trójkącie", 'geometria'),
+    ("czworokąty i wielokąty", 'geometria'),
+    ("dodawanie ułamków", 'ułamki'),
+    ("ile to 20%", 'procenty'),
+    ("najpierw ułamki, potem procenty", 'ułamki'),
+    ("nie wiem", None),
+])
+def test_topic(text, topic):
+    assert intent_value(text, 'topic') == topic
+    
+    
+@pytest.mark.parametrize("text, level", [
+    ("jestem w 7 klasie", 'klasa_7'),
+    ("czwarta klasa", 'klasa_4'),
+    ("chodzę do liceum", 'liceum'),
+    ("przygotowuję się do matury", 'matura'),
+    # Całe słowa - "v" nie pasuje do "vosk", "lo" do "lody"
+    ("lubię lody i vosk", None),
+])
+def test_level(text, level):
+    assert intent_value(text, 'level') == level
+    
+    
+def test_farewell_and_positions():
+    text = "dzięki, do widzenia"
+    match = first(INTENTS.find_all(text), 'farewell')
+    assert match is not None
+    assert text[match.start:match.end] == "do widzenia"
+    
+    
+def test_longer_pattern_wins_and_shared_patterns():
+    engine = IntentEngine({'a': {'krótki': ['kot*'], 'długi': ['kotlet']}, 'b': {None: ['kotlet']}})
+    matches = engine.find_all("kotlet")
+    assert [(m.intent, m.value) for m in matches] == [('a', 'długi'), ('b', None)]
\ No newline at end of file
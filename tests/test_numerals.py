@@ -0,0 +1,102 @@
+"""
+Testy zamiany liczebników na zapis matematyczny (dialog.numerals)
+"""
+
+import pytest
+
+from dialog.manager import convert_speech_to_math
+from dialog.numerals import VOCABULARY, words_to_math
+
+CASES = [
+    # Liczby całkowite
+    ("zero", "0"),
+    ("czterdzieści osiem", "48"),
+    ("sto jedenaście", "111"),
+    ("tysiąc", "1000"),
+    ("dwa tysiące sto dwadzieścia trzy", "2123"),
+    ("dwadzieścia pięć tysięcy", "25000"),
+    ("dziewięćset dziewięćdziesiąt dziewięć tysięcy dziewięćset", "999900"),
+    ("pięć sześć", "5 6"),
+    ("dwadzieścia dwanaście", "20 12"),
+    ("sto zero", "100 0"),
+    ("tysiąc tysiąc", "1000 1000"),
+    # Przypadki zależne
+    ("dwóch", "2"),
+    ("dwu", "2"),
+    ("trzech", "3"),
+    ("pięciu", "5"),
+    ("dwunastu", "12"),
+    ("dwudziestu pięciu", "25"),
+    ("stu dwudziestu", "120"),
+    ("pięciuset", "500"),
+    ("dwóch tysięcy", "2000"),
+    ("pięcioma", "5"),
+    ("trzech czwartych", "3/4"),
+    ("jednej trzeciej", "1/3"),
+    ("dwiema piątymi", "2/5"),
+    # Ułamki dziesiętne
+    ("trzy przecinek zero pięć", "3.05"),
+    ("zero przecinek dwadzieścia pięć", "0.25"),
+    ("przecinek pięć", "0.5"),
+    ("minus przecinek pięć", "-0.5"),
+    ("x równa się przecinek dwadzieścia pięć", "x = 0.25"),
+    ("pięć przecinek", "5 ."),
+    # Połowy
+    ("trzy i pół", "3.5"),
+    ("dwie i pół", "2.5"),
+    ("dwa i ćwierć", "2.25"),
+    ("półtora", "1.5"),
+    ("połowa", "1/2"),
+    ("ćwierć", "1/4"),
+    ("minus pół", "-1/2"),
+    # Ułamki zwykłe
+    ("pięć szóstych", "5/6"),
+    ("trzy czwarte", "3/4"),
+    ("cztery ósme", "4/8"),
+    ("jedna dwudziesta piąta", "1/25"),
+    ("jedna setna", "1/100"),
+    ("trzy tysięczne", "3/1000"),
+    ("minus jedna druga", "-1/2"),
+    ("jedna pierwsza", "1 pierwsza"),
+    # Liczby mieszane
+    ("dwa i jedna czwarta", "9/4"),
+    ("jeden i trzy czwarte", "7/4"),
+    ("dwa i dwie czwarte", "5/2"),
+    ("minus dwa i jedna czwarta", "-9/4"),
+    ("dwa i jedna czwarta plus trzy", "9/4 + 3"),
+    ("dwa i trzy", "2 i 3"),
+    ("dwa i trzy i jedna czwarta", "2 i 13/4"),
+    ("dwa i trzy i pół", "2 i 3.5"),
+    # Znaki i operatory
+    ("x równa się minus dwa", "x = -2"),
+    ("osiem minus trzy", "8 - 3"),
+    ("minus pięć minus dwa", "-5 - 2"),
+    ("2 minus 3", "2 - 3"),
+    ("minus tysiąc", "-1000"),
+    ("minus", "-"),
+    ("minus x", "- x"),
+    ("dwa razy trzy", "2 × 3"),
+    ("sześć podzielić przez dwa", "6 ÷ 2"),
+    ("dwie trzecie plus jedna szósta", "2/3 + 1/6"),
+    # Pozostałe słowa bez zmian
+    ("to jest cztery", "to jest 4"),
+    ("wynik to dwadzieścia pięć procent", "wynik to 25 procent"),
+    ("klasa czwarta", "klasa czwarta"),
+    ("x=4", "x=4"),
+    ("3/4", "3/4"),
+    ("Trzy", "3"),
+]
+
+
+@pytest.mark.parametrize("text, expected", CASES)
+def test_words_to_math(text, expected):
+    assert words_to_math(text) == expected
+    
+    
+def test_convert_speech_to_math_normalizes_input():
+    assert convert_speech_to_math("  Trzech Czwartych ") == "3/4"
+    
+    
+def test_vocabulary_contains_case_forms():
+    for word in ("dwóch", "dwunastu", "tysiąca", "czwartych", "przecinek", "półtora"):
+        assert word in VOCABULARY
\ No newline at end of file
@@ -0,0 +1,92 @@
+"""
+Testy indeksu wyboru zadań (dialog.problem_bank, dialog.adaptive_manager)
+"""
+
+import pytest
+
+from dialog.adaptive_manager import TARGET_SUCCESS, AdaptiveDifficultyManager
+from dialog.problem_bank import Problem, SelectionIndex, UsedProblems
+from dialog.skill_model import SkillModel
+
+DIFFICULTIES = [-2.0, -1.0, -0.5, 0.0, 0.5, 1.0, 2.0]
+
+
+def problem(difficulty, topic='ułamki'):
+    return Problem(topic, difficulty, f"{topic} {difficulty:+.1f}", [str(difficulty)])
+
+
+@pytest.fixture
+def index():
+    return SelectionIndex([problem(d) for d in reversed(DIFFICULTIES)] + [problem(0.0, 'procenty')])
+
+
+@pytest.mark.parametrize("target, expected", [
+    (0.1, 0.0),
+    (0.25, 0.0),   # remis - łatwiejsze zadanie
+    (0.3, 0.5),
+    (-10.0, -2.0),
+    (10.0, 2.0),
+])
+def test_select_closest_difficulty(index, target, expected):
+    assert index.select('ułamki', target).difficulty == expected
+    
+    
+def test_sorted_positions_and_calibration(index):
+    assert [index.position(problem(d).text) for d in DIFFICULTIES] == list(range(len(DIFFICULTIES)))
+    calibrated = SelectionIndex([problem(d) for d in DIFFICULTIES], calibrated={problem(2.0).text: -3.0})
+    assert calibrated.position(problem(2.0).text) == 0
+    assert calibrated.difficulty(problem(2.0).text) == -3.0
+    assert calibrated.difficulty("spoza katalogu", default=0.7) == 0.7
+    assert index.select('brak', 0.0) is None
+    
+    
+def test_used_problems_are_skipped(index):
+    used = UsedProblems(index)
+    used.add(problem(0.0).text)
+    used.add(problem(0.5).text)
+    assert problem(0.0).text in used and used.count('ułamki') == 2
+    # Najbliższe wolne po obu stronach celu: -0.5 (o 0.6) i 1.0 (o 0.9)
+    assert index.select('ułamki', 0.1, used).difficulty == -0.5
+    # Inny temat ma własne użyte zadania
+    assert index.select('procenty', 0.0, used).difficulty == 0.0
+    
+    
+def test_skip_links_jump_over_used_runs(index):
+    used = UsedProblems(index)
+    for d in DIFFICULTIES[1:-1]:
+        used.add(problem(d).text)
+    assert used.next_free('ułamki', 1, 1) == 6
+    assert used.next_free('ułamki', 5, -1) == 0
+    # Kompresja ścieżki - każda pozycja ciągu wskazuje od razu na wolną
+    assert all(used.links[('ułamki', 1)][position] == 6 for position in range(1, 6))
+    assert index.select('ułamki', 0.0, used).difficulty == -2.0
+    
+    used.add(problem(2.0).text)
+    used.add(problem(-2.0).text)
+    assert used.next_free('ułamki', 0, 1) == len(DIFFICULTIES)
+    assert used.next_free('ułamki', 6, -1) == -1
+    assert index.select('ułamki', 0.0, used) is None
+    
+    used.clear('ułamki')
+    assert used.count('ułamki') == 0
+    assert index.select('ułamki', 0.0, used).difficulty == 0.0
+    
+    
+def test_adaptive_problem_closest_to_target_probability(index):
+    model = SkillModel(skills={'ułamki': 0.3})
+    manager = AdaptiveDifficultyManager(model, index)
+    text, answers = manager.generate_adaptive_problem('ułamki', 'liceum')
+    chosen = index.problems[text].difficulty
+    best = min(DIFFICULTIES, key=lambda d: abs(model.probability('ułamki', d) - TARGET_SUCCESS))
+    assert chosen == best == -0.5
+    assert answers == ['-0.5']
+    
+    
+def test_adaptive_problems_do_not_repeat_until_reset(index):
+    manager = AdaptiveDifficultyManager(SkillModel(), index)
+    first_round = [manager.generate_adaptive_problem('ułamki', 'liceum')[0] for _ in DIFFICULTIES]
+    assert sorted(first_round) == sorted(problem(d).text for d in DIFFICULTIES)
+    # Wszystkie użyte - lista jest czyszczona i wybór zaczyna się od nowa
+    assert manager.generate_adaptive_problem('ułamki', 'liceum')[0] == first_round[0]
+    assert manager.used_problems.count('ułamki') == 1
+    assert manager.generate_adaptive_problem('brak', 'liceum') is None
\ No newline at end of file
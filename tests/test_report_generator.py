@@ -0,0 +1,55 @@
+"""
+Testy wsadowego generowania raportów (utils.report_generator)
+"""
+
+import os
+
+import pytest
+
+from utils import report_generator
+from utils.report_generator import generate_reports
+
+
+def stats(correct):
+    return {
+        'total_questions': 10, 'total_correct': correct, 'total_sessions': 1,
+        'topics_performance': {'ułamki': {'correct': correct, 'total': 10}},
+        'sessions': [],
+    }
+
+
+@pytest.fixture
+def cache_io(tmp_path, monkeypatch):
+    """Liczniki wczytań i zapisów indeksu raportów (w katalogu tymczasowym)"""
+    monkeypatch.chdir(tmp_path)
+    counts = {'load': 0, 'save': 0}
+    load, save = report_generator._load_cache, report_generator._save_cache
+    
+    def counted_load():
+        counts['load'] += 1
+        return load()
+        
+    def counted_save(cache):
+        counts['save'] += 1
+        save(cache)
+        
+    monkeypatch.setattr(report_generator, '_load_cache', counted_load)
+    monkeypatch.setattr(report_generator, '_save_cache', counted_save)
+    return counts
+
+
+def test_batch_reads_and_writes_cache_once(cache_io):
+    students = {f"uczen{i}": stats(i) for i in range(5)}
+    results = generate_reports(students, 'csv')
+    assert all(results.values()) and all(os.path.exists(name) for name in results.values())
+    assert cache_io == {'load': 1, 'save': 1}
+    
+    # Dane bez zmian - wszystko pominięte, indeks nie jest zapisywany
+    assert generate_reports(students, 'csv') == {name: None for name in students}
+    assert cache_io == {'load': 2, 'save': 1}
+    
+    # Zmiana danych jednego ucznia
+    students['uczen3'] = stats(9)
+    results = generate_reports(students, 'csv')
+    assert [name for name, filename in results.items() if filename] == ['uczen3']
+    assert cache_io == {'load': 3, 'save': 2}
\ No newline at end of file
@@ -0,0 +1,89 @@
+"""
+Testy harmonogramu powtórek (dialog.review)
+"""
+
+import pytest
+
+from dialog.manager import DialogManager, DialogState
+from dialog.review import DAY, DEFAULT_EASE, RELEARN_DELAY, ReviewScheduler, answer_quality, review_load
+from dialog.student_stats import StudentStatistics
+
+PROBLEM = "Oblicz: 2/5 + 1/5"
+NOW = 1_700_000_000.0
+
+
+@pytest.fixture
+def statistics(tmp_path):
+    stats = StudentStatistics("Test")
+    stats.stats_file = str(tmp_path / "stats_test.json")
+    return stats
+
+
+def quiz_manager(statistics):
+    """Manager podłączony do statystyk tak, jak w oknie aplikacji"""
+    manager = DialogManager(lambda message: None, on_answer=statistics.record_answer)
+    manager.review = statistics.review
+    manager.current_state = DialogState.QUIZ
+    manager.current_topic = 'ułamki'
+    manager.context['current_problem'] = PROBLEM
+    return manager
+
+
+def test_answer_quality():
+    assert answer_quality(False) == 1
+    assert answer_quality(True) == 5
+    assert answer_quality(True, 1000) == 3
+
+
+def test_wrong_answer_through_manager_is_recorded_once(statistics):
+    manager = quiz_manager(statistics)
+    manager.process_user_input("siedem")
+    
+    item = statistics.review.items[PROBLEM]
+    assert item['interval'] == 0
+    assert item['repetitions'] == 0
+    assert item['lapses'] == 1
+    assert item['ease'] == pytest.approx(DEFAULT_EASE - 0.54)
+    assert len(statistics.current_session['answers']) == 1
+    
+    # Poprawna odpowiedź - pierwszy odstęp SM-2
+    manager.process_user_input("trzy piąte")
+    item = statistics.review.items[PROBLEM]
+    assert item['interval'] == 1
+    assert item['repetitions'] == 1
+    assert item['ease'] == pytest.approx(DEFAULT_EASE - 0.44)
+    
+    
+def test_sm2_intervals_and_graduation():
+    review = ReviewScheduler(clock=lambda: NOW)
+    assert review.record('ułamki', PROBLEM, True) is None
+    assert review.record('ułamki', PROBLEM, False) == NOW + RELEARN_DELAY
+    assert review.next_due('ułamki') is None
+    assert review.next_due('ułamki', NOW + RELEARN_DELAY) == PROBLEM
+    
+    intervals = []
+    while PROBLEM in review:
+        review.record('ułamki', PROBLEM, True)
+        if PROBLEM in review:
+            intervals.append(review.items[PROBLEM]['interval'])
+    assert intervals[:2] == [1, 6]
+    assert intervals == sorted(intervals)
+    assert review.next_due('ułamki', NOW + 365 * DAY) is None
+    
+    
+def test_saved_schedule_round_trip():
+    review = ReviewScheduler(clock=lambda: NOW)
+    review.record('ułamki', PROBLEM, False)
+    review.record('procenty', "Oblicz 10% z 50", False, now=NOW - 60)
+    
+    restored = ReviewScheduler.from_stats({'review': review.to_list()}, clock=lambda: NOW + RELEARN_DELAY)
+    assert restored.items == review.items
+    assert restored.due_count() == 2
+    assert restored.next_due('procenty') == "Oblicz 10% z 50"
+    
+    
+def test_review_load_counts_until_end_of_day():
+    review = ReviewScheduler(clock=lambda: NOW)
+    review.record('ułamki', PROBLEM, False)
+    stats = {'student': 'Ola', 'review': review.to_list()}
+    assert review_load([stats]) == {'ola': {'ułamki': 1}}
\ No newline at end of file
@@ -0,0 +1,122 @@
+"""
+Testy zapisu i odtwarzania stanu sesji (dialog.session_state)
+"""
+
+import pytest
+
+from dialog.manager import DialogManager
+from dialog.session_state import SessionJournal, decode, diff, hand_off, patch, take_over
+from dialog.student_stats import StudentStatistics
+
+TURNS = ["Ania", "liceum", "ułamki", "dalej", "dalej"]
+
+
+def run_session(manager, turns=TURNS):
+    manager.start_dialog()
+    for text in turns:
+        manager.process_user_input(text)
+
+
+def comparable(state: dict) -> dict:
+    """Stan managera z użytymi zadaniami jako zbiorami (kolejność list nie ma znaczenia)"""
+    return dict(state, used={topic: set(problems) for topic, problems in state['used'].items()})
+
+
+@pytest.fixture
+def statistics(tmp_path):
+    stats = StudentStatistics("Test")
+    stats.stats_file = str(tmp_path / "stats_test.json")
+    return stats
+
+
+@pytest.mark.parametrize("old, new", [
+    ({'a': 1}, {'a': 2}),
+    ({'a': [1, 2]}, {'a': [1, 2, 3]}),
+    ({'a': [1, 2]}, {'a': [2]}),
+    ({'a': {'b': 1, 'c': 2}}, {'a': {'b': 1, 'd': 3}}),
+    ({'a': 1, 'b': 2}, {'b': 2}),
+])
+def test_patch_reverses_diff(old, new):
+    assert patch(dict(old), diff(old, new)) == new
+
+
+def test_restore_from_snapshot_and_journal(tmp_path):
+    manager = DialogManager(lambda message: None)
+    journal = SessionJournal("s1", str(tmp_path), snapshot_interval=100)
+    journal.attach(manager)
+    run_session(manager)
+    journal.close()
+
+    restored = DialogManager(lambda message: None)
+    assert SessionJournal("s1", str(tmp_path)).restore(restored)
+    assert comparable(restored.export_state()) == comparable(manager.export_state())
+    assert restored.journal is not None
+
+
+def test_restore_after_snapshot_interval(tmp_path):
+    manager = DialogManager(lambda message: None)
+    journal = SessionJournal("s1", str(tmp_path), snapshot_interval=2)
+    journal.attach(manager)
+    run_session(manager)
+    journal.close()
+
+    restored = DialogManager(lambda message: None)
+    assert SessionJournal("s1", str(tmp_path)).restore(restored)
+    assert comparable(restored.export_state()) == comparable(manager.export_state())
+
+
+def test_torn_last_line_is_skipped(tmp_path):
+    manager = DialogManager(lambda message: None)
+    journal = SessionJournal("s1", str(tmp_path), snapshot_interval=100)
+    journal.attach(manager)
+    run_session(manager, TURNS[:3])
+    expected = comparable(manager.export_state())
+    manager.process_user_input("dalej")
+    journal.close()
+
+    # Awaria w trakcie dopisywania ostatniej tury
+    with open(journal.journal_file, 'r+', encoding='utf-8') as f:
+        content = f.read()
+        f.seek(0)
+        f.write(content[:len(content) - 10])
+        f.truncate()
+
+    state = SessionJournal("s1", str(tmp_path)).load()
+    assert state['seq'] == 4
+    assert comparable(state['dialog']) == expected
+
+
+def test_missing_session_is_not_restored(tmp_path):
+    assert not SessionJournal("brak", str(tmp_path)).restore(DialogManager(lambda message: None))
+
+
+def test_statistics_session_is_restored(tmp_path, statistics):
+    manager = DialogManager(lambda message: None, on_answer=statistics.record_answer)
+    journal = SessionJournal("s1", str(tmp_path), statistics=statistics, snapshot_interval=100)
+    journal.attach(manager)
+    run_session(manager, TURNS[:3] + ["siedem"])
+    journal.close()
+    assert len(statistics.current_session['answers']) == 1
+
+    restored_stats = StudentStatistics("Test")
+    restored_stats.stats_file = statistics.stats_file
+    assert SessionJournal("s1", str(tmp_path), statistics=restored_stats).restore(DialogManager(lambda message: None))
+    assert restored_stats.current_session == statistics.current_session
+
+
+def test_hand_off_and_take_over(statistics):
+    manager = DialogManager(lambda message: None, on_answer=statistics.record_answer)
+    run_session(manager, TURNS[:3] + ["siedem"])
+    data = hand_off(manager, statistics)
+    assert decode(data)['dialog']['context']['user_name'] == "Ania"
+
+    other = DialogManager(lambda message: None)
+    other_stats = StudentStatistics("Test")
+    take_over(data, other, other_stats)
+    assert comparable(other.export_state()) == comparable(manager.export_state())
+    assert other_stats.current_session == statistics.current_session
+
+
+def test_unknown_snapshot_version_is_rejected():
+    with pytest.raises(ValueError):
+        decode(b'{"v":99}')
\ No newline at end of file
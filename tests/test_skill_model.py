@@ -0,0 +1,121 @@
+"""
+Testy modelu umiejętności (dialog.skill_model)
+"""
+
+import pytest
+
+from dialog.skill_model import (DEFAULT_EXPECTED_TIME, SLOW_PENALTY, SkillModel, answer_score, answer_scores,
+                                fit_from_stats, fit_responses, sigmoid)
+
+TRUE_SKILLS = [-1.0, 0.0, 1.5]
+TRUE_DIFFICULTIES = [-1.5, -0.5, 0.0, 0.5, 1.0, 2.0]
+
+
+@pytest.mark.parametrize("x", [-1000.0, -20.0, -1.0, 0.0, 1.0, 20.0, 1000.0])
+def test_sigmoid_bounds(x):
+    value = sigmoid(x)
+    assert 0.0 <= value <= 1.0
+    assert sigmoid(-x) == pytest.approx(1.0 - value)
+    
+    
+def test_answer_score():
+    assert answer_score(False, 5) == 0.0
+    assert answer_score(True, None) == 1.0
+    assert answer_score(True, DEFAULT_EXPECTED_TIME) == 1.0
+    assert answer_score(True, 2 * DEFAULT_EXPECTED_TIME) == pytest.approx(1.0 - SLOW_PENALTY / 2)
+    # Pełna kara od czterokrotności oczekiwanego czasu
+    assert answer_score(True, 100 * DEFAULT_EXPECTED_TIME) == pytest.approx(1.0 - SLOW_PENALTY)
+    
+    
+def test_answer_scores_match_scalar_version():
+    pytest.importorskip("numpy")
+    cases = [(False, 10.0), (True, 10.0), (True, 45.0), (True, 60.0), (True, 500.0)]
+    scores = answer_scores([c for c, _ in cases], [t for _, t in cases], [DEFAULT_EXPECTED_TIME] * len(cases))
+    assert list(scores) == pytest.approx([answer_score(c, t) for c, t in cases])
+    
+    
+def test_probability_bounds_and_target_difficulty():
+    model = SkillModel(skills={'ułamki': 1.0})
+    probabilities = [model.probability('ułamki', difficulty) for difficulty in (-50, -1, 0, 1, 2, 50)]
+    assert all(0.0 <= p <= 1.0 for p in probabilities)
+    assert probabilities == sorted(probabilities, reverse=True)
+    assert model.probability('ułamki', 1.0) == pytest.approx(0.5)
+    
+    for target in (0.3, 0.5, 0.7, 0.9):
+        assert model.probability('ułamki', model.target_difficulty('ułamki', target)) == pytest.approx(target)
+        
+        
+def test_update_direction():
+    model = SkillModel()
+    assert model.update('ułamki', None, True) > 0.0
+    assert SkillModel().update('ułamki', None, False) < 0.0
+    
+    # Poprawna, ale wolna odpowiedź podnosi umiejętność mniej niż szybka
+    fast = SkillModel().update('ułamki', None, True, time_taken=10)
+    slow = SkillModel().update('ułamki', None, True, time_taken=200)
+    assert 0.0 < slow < fast
+    
+    # Poprawna odpowiedź na łatwe zadanie podnosi umiejętność mniej niż na trudne
+    easy = SkillModel().update('ułamki', None, True, difficulty=-2.0)
+    hard = SkillModel().update('ułamki', None, True, difficulty=2.0)
+    assert 0.0 < easy < hard
+    
+    
+def test_update_step_shrinks_and_topics_are_independent():
+    model = SkillModel()
+    steps = []
+    for _ in range(5):
+        before = model.skill('ułamki')
+        steps.append(model.update('ułamki', None, True, difficulty=before) - before)
+    assert steps == sorted(steps, reverse=True)
+    assert model.skill('procenty') == 0.0
+    assert model.answer_counts == {'ułamki': 5}
+    
+    
+def synthetic_responses():
+    """Wyniki równe oczekiwanym prawdopodobieństwom - dopasowanie bez szumu"""
+    groups, problems, scores = [], [], []
+    for group, skill in enumerate(TRUE_SKILLS):
+        for problem, difficulty in enumerate(TRUE_DIFFICULTIES):
+            groups.append(group)
+            problems.append(problem)
+            scores.append(sigmoid(skill - difficulty))
+    return groups, problems, scores, len(TRUE_SKILLS), len(TRUE_DIFFICULTIES)
+    
+    
+def test_fit_recovers_synthetic_parameters():
+    np = pytest.importorskip("numpy")
+    theta, beta = fit_responses(*synthetic_responses(), iterations=200, regularization=1e-6)
+    # Skala Rascha jest określona z dokładnością do przesunięcia
+    shift = np.mean(beta) - np.mean(TRUE_DIFFICULTIES)
+    assert theta - shift == pytest.approx(TRUE_SKILLS, abs=1e-3)
+    assert beta - shift == pytest.approx(TRUE_DIFFICULTIES, abs=1e-3)
+    
+    
+def test_fit_converges_with_default_regularization():
+    np = pytest.importorskip("numpy")
+    theta, beta = fit_responses(*synthetic_responses())
+    # Po domyślnej liczbie iteracji dalsze kroki Newtona już niczego nie zmieniają
+    theta_more, beta_more = fit_responses(*synthetic_responses(), iterations=100)
+    assert theta_more == pytest.approx(theta, abs=1e-6)
+    assert beta_more == pytest.approx(beta, abs=1e-6)
+    # Prior ściąga parametry ku zeru, ale zachowuje ich kolejność
+    assert list(np.argsort(theta)) == [0, 1, 2]
+    assert list(np.argsort(beta)) == list(range(len(TRUE_DIFFICULTIES)))
+    
+    
+def test_fit_from_stats():
+    pytest.importorskip("numpy")
+    
+    def student(name, correct):
+        answers = [{'topic': 'ułamki', 'question': f"zadanie {i}", 'correct': i < correct, 'time_seconds': 20}
+                   for i in range(6)]
+        return {'student': name, 'sessions': [{'answers': answers}]}
+        
+    params = fit_from_stats([student("Ala", 5), student("Ola", 1)])
+    assert params['students']['ala']['ułamki'] > params['students']['ola']['ułamki']
+    # Zadanie rozwiązane przez obu uczniów jest łatwiejsze od nierozwiązanego przez nikogo
+    assert params['problems']['zadanie 0'] < params['problems']['zadanie 5']
+    assert params['expected_time']['zadanie 0'] == 20
+    assert params['expected_time']['zadanie 5'] == DEFAULT_EXPECTED_TIME
+    assert fit_from_stats([]) == {'problems': {}, 'expected_time': {}, 'students': {}}
\ No newline at end of file
@@ -0,0 +1,65 @@
+"""
+Testy rozwiązywania zadań krok po kroku (dialog.solver)
+"""
+
+from fractions import Fraction
+
+import pytest
+
+from dialog.catalogue import get_catalogue
+from dialog.solver import SolverError, answer_forms, fmt, parse, polynomial, solve
+
+
+@pytest.mark.parametrize("text, kind, value, answer", [
+    ("Rozwiąż równanie: 2x + 5 = 13. Ile wynosi x?", 'równanie', 4, "x = 4"),
+    ("2(x + 3) = 4x - 2", 'równanie', 4, "4"),
+    ("Dla funkcji f(x) = x² - 1, oblicz f(3).", 'funkcja', 8, "8"),
+    ("Oblicz: 2/3 + 3/4 - 1/2", 'ułamki', Fraction(11, 12), "11/12"),
+    ("Oblicz: (3/4 × 2/3) + 1/2", 'ułamki', 1, "1"),
+    ("Oblicz 20% z liczby 150.", 'procenty', 30, "30"),
+    ("Oblicz obwód prostokąta o bokach 3 cm i 7 cm.", 'geometria', 20, "20"),
+    ("Oblicz pole trójkąta o podstawie 6 cm i wysokości 4 cm.", 'geometria', 12, "12"),
+    ("Oblicz pole koła o promieniu 2 cm (użyj π ≈ 3.14).", 'geometria', Fraction('12.56'), "12,56"),
+])
+def test_solve(text, kind, value, answer):
+    solution = solve(text)
+    assert solution is not None
+    assert solution.kind == kind
+    assert solution.value == value
+    assert answer in solution.answers
+    assert solution.hint
+    
+    
+def test_hint_shows_steps():
+    hint = solve("Rozwiąż równanie: 2x + 5 = 13").hint
+    assert "2x = 13 - 5 = 8" in hint
+    assert hint.endswith("x = 8/2 = 4")
+    
+    
+@pytest.mark.parametrize("text", [
+    "Rozwiąż równanie: x² - 5x + 6 = 0",  # tylko równania liniowe
+    "Oblicz: 1/0 + 1",
+    "Jak się masz?",
+])
+def test_unsupported_problems(text):
+    assert solve(text) is None
+    
+    
+def test_parse_and_polynomial():
+    assert polynomial(parse("2(x + 3) - x")) == {1: 1, 0: 6}
+    with pytest.raises(SolverError):
+        parse("2 + (")
+        
+        
+def test_formatting():
+    assert fmt(Fraction(5, 2)) == "5/2"
+    assert fmt(Fraction(5, 2), decimal=True) == "2.5"
+    assert answer_forms(Fraction(1, 2)) == ("1/2", "0.5", "0,5")
+    
+    
+def test_catalogue_answers_agree():
+    # Każde zadanie katalogu, które solver rozwiązuje, ma wśród odpowiedzi odpowiedź z katalogu
+    for problem in get_catalogue().problems():
+        solution = solve(problem.text)
+        if solution is not None:
+            assert set(problem.answers) & set(solution.answers), problem.text
\ No newline at end of file
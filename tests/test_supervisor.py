@@ -0,0 +1,116 @@
+"""
+Testy sesji w procesach roboczych (dialog.supervisor)
+"""
+
+import time
+
+import pytest
+
+from dialog.session_state import SessionJournal
+from dialog.supervisor import SessionSupervisor, shard_for
+
+
+def session_ids(workers, count=2):
+    """Identyfikatory sesji trafiające do kolejnych procesów roboczych"""
+    ids = {}
+    number = 0
+    while len(ids) < min(count, workers):
+        session_id = f"sesja-{number}"
+        ids.setdefault(shard_for(session_id, workers), session_id)
+        number += 1
+    return [ids[index] for index in sorted(ids)]
+
+
+def saved_context(state_dir, session_id):
+    """Kontekst sesji zapisany w dzienniku (np. imię ucznia)"""
+    return SessionJournal(session_id, str(state_dir)).load()['dialog']['context']
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "przekroczono czas oczekiwania"
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def supervisor(tmp_path):
+    supervisor = SessionSupervisor(workers=2, state_dir=str(tmp_path), model_path=None)
+    yield supervisor
+    supervisor.shutdown()
+
+
+def test_sessions_are_routed_to_their_shard(supervisor, tmp_path):
+    first, second = session_ids(2)
+    for number, session_id in enumerate((first, second)):
+        assert supervisor.start_session(session_id).result(10)[0].startswith("Cześć!")
+        assert supervisor.sessions[session_id] == number
+        
+    assert supervisor.turn(first, "Ania")[0].startswith("Miło cię poznać!")
+    assert supervisor.turn(second, "Ola")[0].startswith("Miło cię poznać!")
+    assert saved_context(tmp_path, first) == {'user_name': 'Ania'}
+    assert saved_context(tmp_path, second) == {'user_name': 'Ola'}
+    assert supervisor.workers[0].process.pid != supervisor.workers[1].process.pid
+    
+    
+def test_crashed_worker_is_respawned_and_restores_sessions(supervisor, tmp_path):
+    session_id = session_ids(2)[0]
+    supervisor.start_session(session_id).result(10)
+    supervisor.turn(session_id, "Ania")
+    
+    crashed = supervisor.workers[0]
+    crashed.process.kill()
+    wait_until(lambda: not crashed.alive)
+    
+    # Nowy proces wznawia sesję z dziennika - poziom trafia do tej samej rozmowy
+    supervisor.turn(session_id, "liceum")
+    assert supervisor.workers[0] is not crashed
+    assert supervisor.workers[0].process.pid != crashed.process.pid
+    state = SessionJournal(session_id, str(tmp_path)).load()['dialog']
+    assert state['context']['user_name'] == 'Ania'
+    assert state['level'] == 'liceum'
+    
+    
+def test_resize_moves_sessions_to_new_owners(supervisor, tmp_path):
+    names = {f"sesja-{number}": name for number, name in enumerate(["Ania", "Ola", "Ewa", "Jan", "Piotr", "Zosia"])}
+    ids = list(names)
+    for session_id, name in names.items():
+        supervisor.start_session(session_id).result(10)
+        supervisor.turn(session_id, name)
+        
+    owners = dict(supervisor.sessions)
+    supervisor.resize(3)
+    assert len(supervisor.workers) == 3
+    assert any(supervisor.sessions[session_id] != owner for session_id, owner in owners.items())
+    assert supervisor.sessions == {session_id: shard_for(session_id, 3) for session_id in ids}
+    for session_id in ids:
+        supervisor.turn(session_id, "liceum")
+        
+    supervisor.resize(1)
+    assert len(supervisor.workers) == 1 and set(supervisor.sessions.values()) == {0}
+    for session_id in ids:
+        supervisor.turn(session_id, "ułamki")
+        state = SessionJournal(session_id, str(tmp_path)).load()['dialog']
+        assert state['context']['user_name'] == names[session_id]
+        assert (state['level'], state['topic']) == ('liceum', 'ułamki')
+        
+        
+def test_worker_is_recycled_after_max_sessions(tmp_path):
+    supervisor = SessionSupervisor(workers=1, state_dir=str(tmp_path), model_path=None, max_sessions=2)
+    try:
+        supervisor.start_session("a").result(10)
+        supervisor.turn("a", "Ania")
+        supervisor.start_session("b").result(10)
+        original = supervisor.workers[0]
+        
+        # Trzecia sesja - proces wymieniony, sesje przeniesione migawkami
+        supervisor.start_session("c").result(10)
+        assert supervisor.workers[0] is not original
+        assert not original.process.is_alive()
+        assert supervisor.served == [1]
+        
+        supervisor.turn("a", "liceum")
+        assert saved_context(tmp_path, "a")['user_name'] == 'Ania'
+        assert SessionJournal("a", str(tmp_path)).load()['dialog']['level'] == 'liceum'
+    finally:
+        supervisor.shutdown()
\ No newline at end of file